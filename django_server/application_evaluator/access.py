@@ -0,0 +1,91 @@
+"""
+Maintenance of the denormalized ApplicationAccess table.
+
+The rows are recomputed from the round evaluators and admins and from the users of the evaluating organizations of
+applications whenever those change (see signals.py), so that checking whether a user may evaluate an application is a
+single indexed lookup.
+"""
+
+from django.db import transaction
+
+from application_evaluator.models import Application, ApplicationAccess, ApplicationRound
+
+
+def _sync(rows, expected):
+    """
+    Make the access rows of the given queryset match the expected (user id, round id, application id, reason) tuples.
+    """
+    with transaction.atomic():
+        existing = {
+            (user_id, round_id, application_id, reason): row_id
+            for row_id, user_id, round_id, application_id, reason in rows.values_list(
+                "id", "user_id", "application_round_id", "application_id", "reason"
+            )
+        }
+        rows.filter(id__in=[row_id for key, row_id in existing.items() if key not in expected]).delete()
+        ApplicationAccess.objects.bulk_create(
+            [
+                ApplicationAccess(user_id=user_id, application_round_id=round_id, application_id=app_id, reason=reason)
+                for user_id, round_id, app_id, reason in expected - existing.keys()
+            ]
+        )
+
+
+def refresh_round_access(round_ids=None, user_ids=None):
+    """
+    Recompute the round level access rows of the evaluators and admins of the given rounds (default: all), or only
+    of the given users.
+    """
+    rows = ApplicationAccess.objects.filter(application=None)
+    rounds = ApplicationRound.objects.all()
+    evaluators = ApplicationRound.evaluators.through.objects.all()
+    if round_ids is not None:
+        rows = rows.filter(application_round_id__in=round_ids)
+        rounds = rounds.filter(id__in=round_ids)
+        evaluators = evaluators.filter(applicationround_id__in=round_ids)
+    if user_ids is not None:
+        rows = rows.filter(user_id__in=user_ids)
+        rounds = rounds.filter(admin_id__in=user_ids)
+        evaluators = evaluators.filter(user_id__in=user_ids)
+
+    expected = {
+        (user_id, round_id, None, "evaluator")
+        for round_id, user_id in evaluators.values_list("applicationround_id", "user_id")
+    }
+    expected |= {
+        (user_id, round_id, None, "admin")
+        for round_id, user_id in rounds.exclude(admin=None).values_list("id", "admin_id")
+    }
+    _sync(rows, expected)
+
+
+def refresh_application_access(application_ids=None, user_ids=None):
+    """
+    Recompute the application level access rows of the users of the evaluating organizations of the given
+    applications (default: all), or only of the given users.
+    """
+    rows = ApplicationAccess.objects.exclude(application=None)
+    memberships = Application.evaluating_organizations.through.objects.all()
+    if application_ids is not None:
+        rows = rows.filter(application_id__in=application_ids)
+        memberships = memberships.filter(application_id__in=application_ids)
+    if user_ids is not None:
+        rows = rows.filter(user_id__in=user_ids)
+        memberships = memberships.filter(organization__users__in=user_ids)
+
+    expected = {
+        (user_id, round_id, application_id, "organization")
+        for application_id, round_id, user_id in memberships.values_list(
+            "application_id", "application__application_round_id", "organization__users"
+        )
+        if user_id is not None and (user_ids is None or user_id in user_ids)
+    }
+    _sync(rows, expected)
+
+
+def refresh_user_access(user_ids):
+    """
+    Recompute all access rows of the given users.
+    """
+    refresh_round_access(user_ids=user_ids)
+    refresh_application_access(user_ids=user_ids)
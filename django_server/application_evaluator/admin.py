@@ -1,9 +1,28 @@
+from collections import Counter
+import functools
+
 from django import forms
 from django.contrib import admin
 from django.contrib.admin.models import LogEntry
-from django.db.models import Count
-
-from application_evaluator import models
+from django.db import transaction
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from application_evaluator import counters, events, models, payloads, rest, summaries
+
+
+def count_for_application(model):
+    """
+    Return a subquery counting the rows of the given model related to each application.
+    """
+    counts = (
+        model.objects.filter(application=OuterRef("pk"))
+        .order_by()
+        .values("application")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
 
 
 class InlineForApplicationRound(admin.TabularInline):
@@ -75,11 +94,11 @@ class RoundAttachmentInline(admin.TabularInline):
 
 
 class BaseApplicationImportInline(admin.TabularInline):
-    readonly_fields = ["created_at", "error", "status"]
+    readonly_fields = ["created_at", "error", "status", "attempts", "processed_count", "total_count"]
     extra = 1
 
     def has_change_permission(self, request, obj):
-        # Imports cannot be changed; the import is attempted when created, then stays in Done or Error status.
+        # Imports cannot be changed; they are processed in the background after being created (see jobs.py).
         return False
 
 
@@ -106,24 +125,20 @@ class ApplicationRoundAdmin(admin.ModelAdmin):
         CriterionGroupInline,
         CriterionInline,
     ]
-    list_display = ["name", "applications_", "scores_", "published"]
+    # Stored counters (see counters.py), rather than counts across the applications and their scores:
+    list_display = [
+        "name",
+        "application_count",
+        "scored_application_count",
+        "score_count",
+        "comment_count",
+        "submittal_count",
+        "published",
+    ]
     actions = ["duplicate"]
     form = ApplicationRoundForm
     filter_horizontal = ["evaluators"]
 
-    def get_queryset(self, request):
-        return (
-            super()
-            .get_queryset(request)
-            .annotate(app_count=Count("applications", distinct=True), score_count=Count("applications__scores"))
-        )
-
-    def applications_(self, round):
-        return round.app_count
-
-    def scores_(self, round):
-        return round.score_count
-
     def duplicate(self, request, queryset):
         for round in queryset:
             round.clone()
@@ -178,8 +193,12 @@ class ApplicationAdmin(admin.ModelAdmin):
         self.actions = [add_evaluating_organization_action(o) for o in models.Organization.objects.order_by("name")]
         return super().get_actions(request)
 
+    @admin.display(ordering="total_score")
+    def score(self, app):
+        return app.total_score
+
     def scores_(self, app):
-        return len(app.scores.all())
+        return app.score_count
 
     def attachments_(self, app):
         return app.attachment_count
@@ -188,13 +207,14 @@ class ApplicationAdmin(admin.ModelAdmin):
         return ", ".join(o.name for o in app.evaluating_organizations.all())
 
     def get_queryset(self, request):
-        return (
+        return summaries.annotate_scores(
             super()
             .get_queryset(request)
-            .prefetch_related(
-                "scores__evaluator__organizations", "application_round__criteria", "evaluating_organizations"
+            .prefetch_related("evaluating_organizations")
+            .annotate(
+                score_count=count_for_application(models.Score),
+                attachment_count=count_for_application(models.ApplicationAttachment),
             )
-            .annotate(attachment_count=Count("attachments"))
         )
 
 
@@ -211,9 +231,26 @@ class CriterionAdmin(admin.ModelAdmin):
     actions = ["initialize_scores", "delete_my_scores"]
 
     def initialize_scores(self, request, queryset):
+        scores = []
+        score_counts = Counter()
         for criterion in queryset:
             for app in criterion.application_round.applications.exclude(scores__criterion=criterion).order_by("name"):
-                app.scores.create(criterion=criterion, evaluator=request.user)
+                scores.append(models.Score(application=app, criterion=criterion, evaluator=request.user))
+                score_counts[criterion.application_round_id] += 1
+        with transaction.atomic():
+            models.Score.objects.bulk_create(scores)
+            # Bulk operations do not send the signals that keep the counters, payload cache and event streams up to date:
+            counters.add_scores(score_counts, {score.application_id for score in scores})
+            payloads.invalidate_rounds(score_counts.keys())
+            for score, data in zip(scores, rest.ScoreSerializer(scores, many=True).data, strict=True):
+                events.publish(
+                    score.criterion.application_round_id,
+                    "score",
+                    functools.partial(dict, data),
+                    application_id=score.application_id,
+                    evaluator_id=score.evaluator_id,
+                )
+        summaries.refresh_applications({score.application_id for score in scores})
 
     def delete_my_scores(self, request, queryset):
         models.Score.objects.filter(evaluator=request.user, criterion__in=queryset).delete()
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class ApplicationEvaluatorConfig(AppConfig):
     name = "application_evaluator"
+
+    def ready(self):
+        from application_evaluator import signals  # noqa: F401
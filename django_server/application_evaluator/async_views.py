@@ -0,0 +1,234 @@
+"""
+Async implementations of the read-heavy REST endpoints and the live event streams of application rounds, for serving
+under an ASGI server (see asgi.py).
+
+The views answer conditional GET requests with 304 Not Modified and serve cached round payloads (see payloads.py)
+using the async ORM and cache APIs, so that a worker is not tied up by the many clients reloading unchanged rounds.
+Requests that need data to be serialized are passed on to the viewsets of rest.py.
+"""
+
+import json
+import logging
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.middleware.csrf import get_token
+from django.urls import re_path
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import NotAcceptable
+from rest_framework.negotiation import DefaultContentNegotiation
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from application_evaluator import events, models, payloads, rest
+
+logger = logging.getLogger(__name__)
+
+
+async def authenticate(request):
+    """
+    Return the active user authenticated by the token or the session of the request, as DRF would, or None.
+    """
+    keyword, _, key = request.headers.get("Authorization", "").partition(" ")
+    if keyword == "Token":
+        token = await Token.objects.select_related("user").filter(key=key.strip()).afirst()
+        user = token.user if token else None
+    else:
+        user = await sync_to_async(get_user)(request)
+    return user if user is not None and user.is_authenticated and user.is_active else None
+
+
+async def _allow(request, user):
+    # Throttles are checked only for requests answered here, so that passed on requests are not counted twice:
+    request.user = user
+    for throttle in api_settings.DEFAULT_THROTTLE_CLASSES:
+        if not await sync_to_async(throttle().allow_request)(request, None):
+            return False
+    return True
+
+
+async def _organization(user):
+    return await sync_to_async(models.organization)(user)
+
+
+async def _validators(queries):
+    return [(await queryset.aaggregate(latest=latest))["latest"] for queryset, latest in queries]
+
+
+async def application_rounds_etag(request, user, media_type, pk=None):
+    versions = [v async for v in rest.round_versions(user, pk)]
+    round_ids = [round_id for round_id, version in versions]
+    validators = await _validators(rest.round_validators(round_ids))
+    path = request.get_full_path()
+    return rest.user_etag(user, await _organization(user), path, media_type, (versions, *validators))
+
+
+async def application_etag(request, user, media_type, pk):
+    versions = [v async for v in rest.application_versions(pk)]
+    validators = await _validators(rest.application_validators(pk))
+    path = request.get_full_path()
+    return rest.user_etag(user, await _organization(user), path, media_type, (versions, *validators))
+
+
+async def cached_round_payload(request, user, media_type, pk):
+    if not payloads.enabled():
+        return None
+    key = payloads.payload_key(pk, await models.avisibility_class(user, pk), media_type, request.get_full_path())
+    _generation, payload = await payloads.aget(pk, key)
+    return payload and rest.payload_response(request, payload)
+
+
+async def conditional_response(request, user, media_type, etag_func, **kwargs):
+    response = get_conditional_response(request, etag=await etag_func(request, user, media_type, **kwargs))
+    if response is not None:
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ["Accept"])
+    return response
+
+
+def _ids(kwargs):
+    try:
+        return {name: int(value) for name, value in kwargs.items()}
+    except ValueError:
+        return None
+
+
+def async_view(view, answer):
+    """
+    Return an async view answering GET requests with answer(request, user, media_type, **kwargs) if it gives a
+    response, and passing them on to the DRF view otherwise, as well as all other requests.
+    """
+    negotiation = DefaultContentNegotiation()
+    renderers = [renderer() for renderer in api_settings.DEFAULT_RENDERER_CLASSES]
+    run_view = sync_to_async(view)
+
+    async def try_answer(request, kwargs):
+        drf_request = Request(request)
+        try:
+            renderer, media_type = negotiation.select_renderer(drf_request, renderers)
+        except NotAcceptable:
+            return None
+        ids = _ids(kwargs)
+        # The browsable API is always rendered by DRF:
+        if ids is None or renderer.format == "api":
+            return None
+        user = await authenticate(request)
+        if user is None:
+            return None
+        # As DRF does, e.g. for routing the reads of users who just wrote to the primary (see replicas.py):
+        request.user = user
+        response = await answer(request, user, media_type, **ids)
+        if response is None or not await _allow(drf_request, user):
+            return None
+        return response
+
+    async def wrapper(request, **kwargs):
+        if request.method in ["GET", "HEAD"]:
+            response = await try_answer(request, kwargs)
+            if response is not None:
+                return response
+        return await run_view(request, **kwargs)
+
+    # Like the DRF views, exempt from CsrfViewMiddleware; DRF checks CSRF for session authenticated requests:
+    wrapper.csrf_exempt = True
+    # For naming the view in request metrics:
+    wrapper.cls, wrapper.actions = view.cls, view.actions
+    return wrapper
+
+
+def _csrf_cookie(answer):
+    # The application rounds are requested first by the UI, so they set the CSRF cookie (see ApplicationRoundViewSet):
+    async def wrapper(request, *args, **kwargs):
+        get_token(request)
+        return await answer(request, *args, **kwargs)
+
+    return wrapper
+
+
+async def _round_list(request, user, media_type):
+    return await conditional_response(request, user, media_type, application_rounds_etag)
+
+
+async def _round_results(request, user, media_type, pk):
+    return await conditional_response(request, user, media_type, application_rounds_etag, pk=pk)
+
+
+async def _application(request, user, media_type, pk):
+    return await conditional_response(request, user, media_type, application_etag, pk=pk)
+
+
+application_round_list = async_view(rest.ApplicationRoundViewSet.as_view({"get": "list"}), _csrf_cookie(_round_list))
+application_round_detail = async_view(
+    rest.ApplicationRoundViewSet.as_view({"get": "retrieve"}), _csrf_cookie(cached_round_payload)
+)
+application_round_results = async_view(
+    rest.ApplicationRoundViewSet.as_view({"get": "results"}), _csrf_cookie(_round_results)
+)
+application_detail = async_view(rest.ApplicationViewSet.as_view({"get": "retrieve"}), _application)
+
+
+async def _event_stream(user, round_id):
+    subscription = await events.broker().subscribe(events.channel(round_id))
+    visible_to_user = sync_to_async(events.EventVisibility(user, round_id))
+    # Streams are closed after a while in case the client has gone away; clients reconnect after the retry time:
+    deadline = time.monotonic() + settings.EVENT_STREAM_DURATION
+    try:
+        yield "retry: 5000\n\n"
+        while time.monotonic() < deadline:
+            message = await subscription.get(timeout=settings.EVENT_STREAM_KEEPALIVE)
+            if message is None:
+                yield ": keepalive\n\n"
+                continue
+            event = json.loads(message)
+            visible = await visible_to_user(event)
+            if visible is None:
+                return
+            if visible:
+                yield f"event: {event['type']}\ndata: {json.dumps(event['data'])}\n\n"
+    finally:
+        await subscription.close()
+
+
+async def application_round_events(request, pk):
+    """
+    Stream of the score, comment, approval and submittal events of the round visible to the user, as Server-Sent
+    Events with the data serialized as in the REST API.
+    """
+    user = await authenticate(request)
+    if user is None:
+        return JsonResponse({"detail": "Authentication credentials were not provided."}, status=401)
+    ids = _ids({"pk": pk})
+    rounds = models.ApplicationRound.rounds_for_evaluator(user)
+    if ids is None or not await rounds.filter(id=ids["pk"]).aexists():
+        raise Http404
+    if not await _allow(Request(request), user):
+        return JsonResponse({"detail": "Request was throttled."}, status=429)
+    if not isinstance(request, ASGIRequest):
+        # A WSGI server reads the whole stream before sending any of it, tying up a worker for the duration of the
+        # stream (see gunicorn.conf.py for serving under ASGI):
+        logger.warning("Live events are not streamed, as the server is not an ASGI server.")
+        return JsonResponse({"detail": "Live events are not available."}, status=501)
+    if not events.broker().all_processes:
+        # The events published in the other server processes would not be streamed:
+        logger.error("Live events are not streamed, as the event broker does not reach all server processes.")
+        return JsonResponse({"detail": "Live events are not available."}, status=501)
+    response = StreamingHttpResponse(_event_stream(user, ids["pk"]), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    # Sent as they come, without buffering by nginx:
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+# Routed before the REST router (see urls.py), at the same paths as the viewset actions they implement:
+urlpatterns = [
+    re_path(r"^application_rounds/$", application_round_list),
+    re_path(r"^application_rounds/(?P<pk>[^/.]+)/$", application_round_detail),
+    re_path(r"^application_rounds/(?P<pk>[^/.]+)/results/$", application_round_results),
+    re_path(r"^application_rounds/(?P<pk>[^/.]+)/events/$", application_round_events, name="application_round-events"),
+    re_path(r"^applications/(?P<pk>[^/.]+)/$", application_detail),
+]
@@ -0,0 +1,30 @@
+"""
+Whether the default cache is shared between the server processes.
+
+Cache entries are invalidated by deleting them, which only reaches the other server processes (the workers of the web
+server and the import worker) when the cache is shared between them, i.e. when settings.CACHES points to e.g. Redis
+(see REDIS_URL). In a local memory cache, entries that other processes may need to invalidate are only kept briefly.
+"""
+
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+# Timeout of entries invalidated by other processes, when the cache is local to each process:
+LOCAL_TIMEOUT = 60
+
+
+def is_shared(alias="default"):
+    """
+    Return whether the cache is shared between processes, so that an entry deleted in one is gone in all of them.
+    """
+    return not isinstance(caches[alias], LocMemCache | DummyCache)
+
+
+def timeout(shared_timeout, alias="default"):
+    """
+    Return the given timeout (None for no expiry) if the cache is shared, and at most LOCAL_TIMEOUT otherwise.
+    """
+    if is_shared(alias):
+        return shared_timeout
+    return LOCAL_TIMEOUT if shared_timeout is None else min(shared_timeout, LOCAL_TIMEOUT)
@@ -0,0 +1,165 @@
+"""
+Maintenance of the denormalized counters of ApplicationRound.
+
+The numbers of applications, scores, comments and submittals of each round are incremented and decremented as those
+are created and deleted (see signals.py), in the same transaction. The number of fully scored applications, i.e. ones
+with scores for all criteria of their round, follows Application.fully_scored, which is recomputed per application
+whenever its scores change. Bulk operations on scores, which do not send signals, are counted with add_scores from
+the rows that they actually create or delete, rather than by counting the scores before and after them, which would
+also count the scores created concurrently by others.
+
+Counters that have drifted, e.g. after changes made directly in the database, are fixed with
+`manage.py reconcile_round_counters`.
+"""
+
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Count, F
+
+from application_evaluator.models import (
+    Application,
+    ApplicationRound,
+    ApplicationRoundSubmittal,
+    Comment,
+    Criterion,
+    Score,
+)
+
+COUNTER_FIELDS = ["application_count", "score_count", "comment_count", "submittal_count", "scored_application_count"]
+
+
+def add(round_id, **deltas):
+    """
+    Add the given deltas to the counters of the round, e.g. add(round_id, score_count=1).
+    """
+    deltas = {name: delta for name, delta in deltas.items() if delta}
+    if deltas:
+        ApplicationRound.objects.filter(id=round_id).update(**{name: F(name) + d for name, d in deltas.items()})
+
+
+def _grouped_counts(queryset, field):
+    return dict(queryset.order_by().values(field).annotate(n=Count("id")).values_list(field, "n"))
+
+
+def _fully_scored(applications):
+    """
+    Return a dict of application id -> whether the application has scores for all criteria of its round.
+    """
+    criterion_counts = _grouped_counts(
+        Criterion.objects.filter(application_round__in=applications.values("application_round")), "application_round"
+    )
+    scored_criteria = dict(
+        Score.objects.filter(application__in=applications)
+        .order_by()
+        .values("application")
+        .annotate(n=Count("criterion", distinct=True))
+        .values_list("application", "n")
+    )
+    return {
+        app_id: 0 < criterion_counts.get(round_id, 0) <= scored_criteria.get(app_id, 0)
+        for app_id, round_id in applications.values_list("id", "application_round_id")
+    }
+
+
+def _refresh_fully_scored(application_ids):
+    """
+    Recompute Application.fully_scored of the given applications, returning a Counter of round id -> change in the
+    number of fully scored applications of the round.
+    """
+    applications = Application.objects.filter(id__in=list(application_ids))
+    # Lock the applications so that concurrent refreshes of the same application are counted once:
+    current = {
+        app_id: (round_id, flag)
+        for app_id, round_id, flag in applications.select_for_update().values_list(
+            "id", "application_round_id", "fully_scored"
+        )
+    }
+    fully_scored = _fully_scored(applications)
+    changed = [app_id for app_id, (round_id, flag) in current.items() if fully_scored[app_id] != flag]
+    for flag in [True, False]:
+        Application.objects.filter(id__in=[app_id for app_id in changed if fully_scored[app_id] == flag]).update(
+            fully_scored=flag
+        )
+    deltas = Counter()
+    for app_id in changed:
+        deltas[current[app_id][0]] += 1 if fully_scored[app_id] else -1
+    return deltas
+
+
+def refresh_scored_applications(application_ids):
+    """
+    Recompute Application.fully_scored of the given applications, updating the counters of their rounds by the
+    changes.
+    """
+    add_scores({}, application_ids)
+
+
+def add_scores(score_counts, application_ids):
+    """
+    Add the numbers of scores created (negative for deleted) in each round, given as a dict of round id -> number, to
+    the counters of the rounds, and recompute Application.fully_scored of the given applications, the ones whose scores
+    were created or deleted. Each round is updated once, and after the applications are locked, in the same order as
+    by concurrent refreshes.
+    """
+    with transaction.atomic():
+        scored = _refresh_fully_scored(application_ids) if application_ids else Counter()
+        for round_id in score_counts.keys() | scored.keys():
+            add(round_id, score_count=score_counts.get(round_id, 0), scored_application_count=scored[round_id])
+
+
+def compute_counters(rounds):
+    """
+    Return a dict of round id -> counters computed from scratch for the given queryset of rounds.
+    """
+    applications = Application.objects.filter(application_round__in=rounds)
+    counts = {
+        "application_count": _grouped_counts(applications, "application_round"),
+        "score_count": _grouped_counts(
+            Score.objects.filter(application__in=applications), "application__application_round"
+        ),
+        "comment_count": _grouped_counts(
+            Comment.objects.filter(application__in=applications), "application__application_round"
+        ),
+        "submittal_count": _grouped_counts(
+            ApplicationRoundSubmittal.objects.filter(application_round__in=rounds), "application_round"
+        ),
+        "scored_application_count": _grouped_counts(
+            applications.filter(id__in=[app_id for app_id, flag in _fully_scored(applications).items() if flag]),
+            "application_round",
+        ),
+    }
+    return {
+        round_id: {name: counts[name].get(round_id, 0) for name in COUNTER_FIELDS}
+        for round_id in rounds.values_list("id", flat=True)
+    }
+
+
+def refresh_rounds(round_ids):
+    """
+    Recompute the counters of the given rounds and the fully scored flags of their applications from scratch.
+    """
+    with transaction.atomic():
+        rounds = ApplicationRound.objects.filter(id__in=list(round_ids))
+        # Lock the rounds so that concurrent changes are counted after the refresh:
+        list(rounds.select_for_update().values_list("id"))
+        applications = Application.objects.filter(application_round__in=rounds)
+        fully_scored = _fully_scored(applications)
+        for flag in [True, False]:
+            applications.filter(id__in=[app_id for app_id, f in fully_scored.items() if f == flag]).exclude(
+                fully_scored=flag
+            ).update(fully_scored=flag)
+        for round_id, counters in compute_counters(rounds).items():
+            ApplicationRound.objects.filter(id=round_id).update(**counters)
+
+
+def find_drift(rounds):
+    """
+    Return the ids of the rounds in the queryset whose counters differ from ones computed from scratch.
+    """
+    stored = {r["id"]: r for r in rounds.values("id", *COUNTER_FIELDS)}
+    return sorted(
+        round_id
+        for round_id, counters in compute_counters(rounds).items()
+        if any(stored[round_id][name] != value for name, value in counters.items())
+    )
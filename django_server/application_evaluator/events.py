@@ -0,0 +1,217 @@
+"""
+Live events of application rounds, streamed to clients as Server-Sent Events (see async_views.py).
+
+Scores, comments, approvals and submittals are published as events of their round when the transaction making the
+change commits (see signals.py), to the broker configured in settings.EVENT_BROKER: LocalBroker delivers them within
+the server process, RedisBroker between all the server processes. Events are only streamed when the broker reaches all
+the server processes, i.e. LocalBroker only when the server runs in a single process. The stream of each client only
+includes the events that the client's user is allowed to see (see EventVisibility).
+"""
+
+import asyncio
+import contextlib
+import json
+import logging
+import threading
+import time
+import types
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+from rest_framework.utils.encoders import JSONEncoder
+
+from application_evaluator.models import ApplicationAccess, ApplicationRound, EvaluationModel
+
+logger = logging.getLogger(__name__)
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+class LocalBroker:
+    """
+    Broker delivering events to the subscribers in the same process, e.g. in tests and single process deployments.
+    single_process tells whether the server runs in a single process, so that all subscribers are reached.
+    """
+
+    def __init__(self, single_process=False):
+        self.all_processes = single_process
+        self._subscriptions = {}
+        self._lock = threading.Lock()
+
+    def publish(self, channel, message):
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(channel, []))
+        for loop, queue in subscriptions:
+            # The event loop of the subscriber may have been closed:
+            with contextlib.suppress(RuntimeError):
+                loop.call_soon_threadsafe(queue.put_nowait, message)
+
+    async def subscribe(self, channel):
+        subscription = (asyncio.get_running_loop(), asyncio.Queue())
+        with self._lock:
+            self._subscriptions.setdefault(channel, set()).add(subscription)
+        return LocalSubscription(self, channel, subscription)
+
+    def _unsubscribe(self, channel, subscription):
+        with self._lock:
+            self._subscriptions[channel].discard(subscription)
+            if not self._subscriptions[channel]:
+                del self._subscriptions[channel]
+
+
+class LocalSubscription:
+    def __init__(self, broker, channel, subscription):
+        self._broker = broker
+        self._channel = channel
+        self._subscription = subscription
+
+    async def get(self, timeout):
+        """
+        Return the next message, or None if there was none within the timeout in seconds.
+        """
+        try:
+            return await asyncio.wait_for(self._subscription[1].get(), timeout)
+        except TimeoutError:
+            return None
+
+    async def close(self):
+        self._broker._unsubscribe(self._channel, self._subscription)
+
+
+class RedisBroker:
+    """
+    Broker delivering events to the subscribers in all server processes through Redis pub/sub.
+    """
+
+    all_processes = True
+
+    def __init__(self, url):
+        import redis
+
+        self._url = url
+        self._client = redis.Redis.from_url(url)
+        self._async_client = None
+
+    def publish(self, channel, message):
+        self._client.publish(channel, message)
+
+    async def subscribe(self, channel):
+        import redis.asyncio
+
+        if self._async_client is None:
+            self._async_client = redis.asyncio.Redis.from_url(self._url)
+        pubsub = self._async_client.pubsub()
+        await pubsub.subscribe(channel)
+        return RedisSubscription(pubsub)
+
+
+class RedisSubscription:
+    def __init__(self, pubsub):
+        self._pubsub = pubsub
+
+    async def get(self, timeout):
+        """
+        Return the next message, or None if there was none within the timeout in seconds.
+        """
+        message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=timeout)
+        return message["data"].decode() if message else None
+
+    async def close(self):
+        await self._pubsub.reset()
+
+
+def broker():
+    """
+    Return the broker configured in settings.EVENT_BROKER.
+    """
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            config = settings.EVENT_BROKER
+            _broker = import_string(config["BACKEND"])(**config.get("OPTIONS", {}))
+        return _broker
+
+
+def channel(round_id):
+    return f"application_evaluator:round_events:{round_id}"
+
+
+def publish(round_id, event_type, data_func, application_id=None, evaluator_id=None):
+    """
+    Publish an event of the round when the current transaction commits, with the data returned by data_func() then.
+    """
+
+    def send():
+        event = {
+            "type": event_type,
+            "application": application_id,
+            "evaluator": evaluator_id,
+            "data": data_func(),
+        }
+        try:
+            broker().publish(channel(round_id), json.dumps(event, cls=JSONEncoder))
+        except Exception:
+            # The change has been saved regardless; clients still get it when they next sync:
+            logger.exception("Publishing a %s event of round %s failed.", event_type, round_id)
+
+    transaction.on_commit(send)
+
+
+class EventVisibility:
+    """
+    Tells which events of a round a user is allowed to see, by the rules of the data of the round, for a stream of the
+    events. The user's access to the round is looked up once per settings.EVENT_STREAM_ACCESS_CHECK seconds and on
+    submittals, and whether the user may see an application once per application.
+    """
+
+    def __init__(self, user, round_id):
+        self.user = user
+        self.round_id = round_id
+        self._checked_at = None
+
+    def _check_access(self):
+        self._checked_at = time.monotonic()
+        self._round = (
+            ApplicationRound.rounds_for_evaluator(self.user)
+            .filter(id=self.round_id)
+            .prefetch_related("submitted_organizations")
+        ).first()
+        self._round_access = self._round is not None and (
+            self.user.is_staff
+            or ApplicationAccess.objects.filter(
+                user=self.user, application_round=self._round, application=None
+            ).exists()
+        )
+        self._applications = {}
+
+    def _application_visible(self, event):
+        application_id = event["application"]
+        visible = self._applications.get(application_id)
+        # Scores of submitted organizations may make their applications visible to the other submitted organizations:
+        if visible is None or (not visible and event["type"] == "score"):
+            applications = self._round.applications_for_evaluator(self.user, self._round_access)
+            visible = self._applications[application_id] = applications.filter(id=application_id).exists()
+        return visible
+
+    def __call__(self, event):
+        """
+        Return whether the user is allowed to see the event, or None if the user is no longer allowed to see the round.
+        """
+        if (
+            self._checked_at is None
+            or event["type"] == "submittal"
+            or time.monotonic() - self._checked_at > settings.EVENT_STREAM_ACCESS_CHECK
+        ):
+            self._check_access()
+        if self._round is None:
+            return None
+        if event["application"] is None:
+            return True
+        if not self._round_access and not self._application_visible(event):
+            return False
+        if event["evaluator"] is None:
+            return True
+        evaluation = types.SimpleNamespace(evaluator_id=event["evaluator"])
+        return bool(EvaluationModel.filter_for_evaluator([evaluation], self.user, self._round))
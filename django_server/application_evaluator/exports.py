@@ -0,0 +1,185 @@
+"""
+Server-side exports of application round scores as CSV or XLSX.
+
+Rows are read from the database through iterating cursors, ordered by application, and written out as they come;
+CSV is streamed to the client as it is produced and XLSX is written in constant-memory mode. Exporting a large round
+thus never needs all of its scores and comments in memory at once.
+"""
+
+import csv
+from itertools import groupby, islice
+from operator import itemgetter
+import tempfile
+
+from django.db.models import OuterRef, Subquery
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils.http import content_disposition_header
+import numpy as np
+import xlsxwriter
+
+from application_evaluator.models import Comment, Organization, Score
+from application_evaluator.scoring import RoundScores
+
+CHUNK_SIZE = 2000
+
+SCORE_COLUMNS = [
+    "Application",
+    "Criterion group",
+    "Criterion",
+    "Organization",
+    "First name",
+    "Last name",
+    "Score",
+    "Comment",
+]
+
+
+def _organization_name(user_field):
+    return Subquery(Organization.objects.filter(users=OuterRef(user_field)).order_by("id").values("name")[:1])
+
+
+def _visible_scores(application_round, user, applications):
+    return Score.for_evaluator(user, application_round).filter(
+        application__in=applications, criterion__in=application_round.criteria_for_evaluator(user)
+    )
+
+
+def _visible_comments(application_round, user, applications):
+    return Comment.for_evaluator(user, application_round).filter(application__in=applications)
+
+
+def _by_application(queryset, *fields):
+    """
+    Iterate over the given fields of the queryset, prefixed with the application id and in the same order as
+    _applications, using a server-side cursor where available.
+    """
+    return (
+        queryset.annotate(organization_name=_organization_name("evaluator_id"))
+        .order_by("application__name", "application_id", "id")
+        .values_list("application_id", *fields)
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+
+
+def _applications(applications, *fields):
+    return applications.order_by("name", "id").values_list("id", *fields).iterator(chunk_size=CHUNK_SIZE)
+
+
+def _join(applications, *row_iterators):
+    """
+    Yield (application, [rows of the application from each row iterator]) for each of the given application tuples.
+    The applications and rows must start with the application id and be ordered the same way.
+    """
+    groups = [groupby(rows, key=itemgetter(0)) for rows in row_iterators]
+    current = [next(g, (None, None)) for g in groups]
+    for application in applications:
+        application_rows = []
+        for i, (application_id, rows) in enumerate(current):
+            if application_id == application[0]:
+                application_rows.append([row[1:] for row in rows])
+                current[i] = next(groups[i], (None, None))
+            else:
+                application_rows.append([])
+        yield application, application_rows
+
+
+def score_rows(application_round, user, applications):
+    """
+    Yield the header and then one row for each score and comment on the given applications that the user is allowed
+    to see, grouped by application as in the raw scores export of the UI.
+    """
+    scores = _by_application(
+        _visible_scores(application_round, user, applications),
+        "criterion__group__name",
+        "criterion__name",
+        "organization_name",
+        "evaluator__first_name",
+        "evaluator__last_name",
+        "score",
+    )
+    comments = _by_application(
+        _visible_comments(application_round, user, applications),
+        "criterion_group__name",
+        "organization_name",
+        "evaluator__first_name",
+        "evaluator__last_name",
+        "comment",
+    )
+
+    yield SCORE_COLUMNS
+    for (_id, name), (app_scores, app_comments) in _join(_applications(applications, "name"), scores, comments):
+        for group, criterion, organization, first_name, last_name, score in app_scores:
+            yield [name, group, criterion, organization, first_name, last_name, score, None]
+        for group, organization, first_name, last_name, comment in app_comments:
+            yield [name, group, None, organization, first_name, last_name, None, comment]
+
+
+def _value(x):
+    return None if np.isnan(x) else float(x)
+
+
+def summary_rows(application_round, user, applications, score_multiplier=1):
+    """
+    Yield the header and then one row for each of the given applications with its criterion group scores, total
+    score and comments, as in the summary export of the UI. The total score is multiplied by score_multiplier and
+    rounded to 3 significant digits. The scores are computed for CHUNK_SIZE applications at a time.
+    """
+    groups = list(application_round.criterion_groups.values_list("id", "name"))
+    comments = _by_application(
+        _visible_comments(application_round, user, applications),
+        "evaluator__first_name",
+        "evaluator__last_name",
+        "criterion_group__name",
+        "comment",
+    )
+    rows = _join(_applications(applications, "name", "application_id", "approved"), comments)
+
+    yield ["Application number", "Id", *[name for group_id, name in groups], "Total score", "Approved", "Comments"]
+    while batch := list(islice(rows, CHUNK_SIZE)):
+        application_ids = [application[0] for application, _comments in batch]
+        round_scores = RoundScores.for_round(
+            application_round,
+            applications=applications.filter(id__in=application_ids),
+            scores=_visible_scores(application_round, user, applications).filter(application_id__in=application_ids),
+        )
+        group_index = [int(np.searchsorted(round_scores.group_ids, group_id)) for group_id, name in groups]
+        for (app_id, name, application_id, approved), (app_comments,) in batch:
+            i = round_scores.application_index(app_id)
+            group_scores = [_value(round_scores.group_scores[i, g]) for g in group_index]
+            total = _value(round_scores.average_scores[i])
+            total = None if total is None else float(f"{total * score_multiplier:.3g}")
+            comment_text = "\n".join(
+                f"{first} {last} - {group}: {comment}" for first, last, group, comment in app_comments
+            )
+            yield [name, application_id, *group_scores, total, approved, comment_text]
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def csv_response(rows, filename):
+    writer = csv.writer(_Echo())
+    response = StreamingHttpResponse((writer.writerow(row) for row in rows), content_type="text/csv; charset=utf-8")
+    response["Content-Disposition"] = content_disposition_header(True, filename)
+    return response
+
+
+def xlsx_response(rows, filename):
+    file = tempfile.TemporaryFile()  # noqa: SIM115 - closed by the FileResponse
+    workbook = xlsxwriter.Workbook(
+        file, {"constant_memory": True, "strings_to_formulas": False, "strings_to_urls": False}
+    )
+    worksheet = workbook.add_worksheet("Scores")
+    for i, row in enumerate(rows):
+        worksheet.write_row(i, 0, row)
+    workbook.close()
+    file.seek(0)
+    return FileResponse(file, as_attachment=True, filename=filename)
+
+
+def export_response(rows, filename, file_format):
+    if file_format == "xlsx":
+        return xlsx_response(rows, f"{filename}.xlsx")
+    return csv_response(rows, f"{filename}.csv")
@@ -0,0 +1,158 @@
+"""
+Bulk import of applications and their attachments from Salesforce CSV and zip exports.
+
+The CSV file is read as a stream, in batches of settings.APPLICATION_IMPORT_BATCH_SIZE rows. The applications of each
+batch are inserted with one bulk_create, and the progress of the import stored on the ApplicationImport, in a
+transaction of their own, so that a retried import (see jobs.py) resumes after the rows already imported.
+Application rounds referenced by name are looked up or created once per import.
+
+The attachments in a zip file are matched to the applications of the round by name, all before importing any of
+them, failing the import without retries (see jobs.py) if any are not found. The files are then streamed from the zip
+to storage by a pool of settings.ATTACHMENT_IMPORT_THREADS threads, each reading the zip through a file of its own, in
+batches of settings.ATTACHMENT_IMPORT_BATCH_SIZE files, whose attachments are then created with one bulk_create in the
+same way as applications. The files stored for a batch that fails are deleted.
+
+As bulk_create sends no signals, the round counters, search vectors and round versions maintained by signals.py for
+created applications and attachments are updated here, once per batch.
+"""
+
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+import csv
+from itertools import islice
+import threading
+import zipfile
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.db import transaction
+
+from application_evaluator import counters, search
+from application_evaluator.models import Application, ApplicationAttachment, ApplicationRound
+
+APPLICATION_ID_COLUMN = "Application ID (18 char)"
+
+
+def fix_newlines(s):
+    # Replace two spaces with \n\n, Salesforce CSV export does the opposite:
+    return s.replace("  ", "\n\n")
+
+
+def _batches(rows, size):
+    while batch := list(islice(rows, size)):
+        yield batch
+
+
+def count_rows(f):
+    """
+    Return the number of data rows in the CSV file, reading it through.
+    """
+    return max(sum(1 for _row in csv.reader(f)) - 1, 0)
+
+
+def import_applications(application_import, f, batch_size=None):
+    """
+    Import the applications in the CSV file f for the given ApplicationImport, recording its progress.
+    """
+    rounds = {}
+
+    def round_id(row):
+        if application_import.application_round_id:
+            return application_import.application_round_id
+        name = row.pop(application_import.application_round_column)
+        if name not in rounds:
+            rounds[name] = ApplicationRound.objects.get_or_create(name=name)[0].id
+        return rounds[name]
+
+    def application(row):
+        name = row.pop(application_import.application_name_column)
+        application_id = row.pop(APPLICATION_ID_COLUMN)
+        for column in application_import.ignore_columns:
+            row.pop(column, None)
+        return Application(
+            application_round_id=round_id(row),
+            application_id=application_id,
+            name=name,
+            description="\n\n".join([f"#### {k}\n\n{fix_newlines(v)}" for k, v in row.items()]),
+        )
+
+    # Resuming after the rows imported by earlier attempts:
+    processed = application_import.processed_count
+    remaining = islice(csv.DictReader(f), processed, None)
+    for rows in _batches(remaining, batch_size or settings.APPLICATION_IMPORT_BATCH_SIZE):
+        with transaction.atomic():
+            applications = Application.objects.bulk_create([application(row) for row in rows])
+            round_counts = Counter(a.application_round_id for a in applications)
+            for app_round_id, count in round_counts.items():
+                counters.add(app_round_id, application_count=count)
+            search.update_search_vectors([a.id for a in applications])
+            ApplicationRound.increment_versions(list(round_counts))
+            processed += len(rows)
+            application_import.record_progress(processed)
+
+
+def attachment_files(zip):
+    """
+    Return (zip entry, application name) pairs of the files in the zip, which are named after their applications.
+    """
+    files = [(info, info.filename.split("/")[-1].split(".")[0]) for info in zip.infolist() if not info.is_dir()]
+    return [(info, name) for info, name in files if name]
+
+
+def import_attachments(attachment_import, open_file, batch_size=None, threads=None):
+    """
+    Import the attachments in the zip file of the given ApplicationAttachmentImport, recording its progress.
+    open_file returns a new file object of the zip for each thread reading it.
+    """
+    applications = dict(attachment_import.application_round.applications.values_list("name", "id"))
+    with open_file() as f, zipfile.ZipFile(f) as zip:
+        files = attachment_files(zip)
+    missing = sorted({name for _info, name in files if name not in applications})
+    if missing:
+        raise ValidationError(f"Applications not found: {', '.join(missing)}")
+
+    # Resuming after the files imported by earlier attempts:
+    processed = attachment_import.processed_count
+    attachment_import.record_progress(processed, len(files))
+
+    local = threading.local()
+    opened = []
+
+    def open_zip():
+        f = open_file()
+        opened.append(f)
+        local.zip = zipfile.ZipFile(f)
+
+    def upload(file):
+        info, name = file
+        attachment = ApplicationAttachment(application_id=applications[name], name=info.filename)
+        with local.zip.open(info) as f:
+            attachment.attachment.save(info.filename, File(f), save=False)
+        return attachment
+
+    try:
+        with ThreadPoolExecutor(threads or settings.ATTACHMENT_IMPORT_THREADS, initializer=open_zip) as executor:
+            remaining = iter(files[processed:])
+            for batch in _batches(remaining, batch_size or settings.ATTACHMENT_IMPORT_BATCH_SIZE):
+                uploads = [executor.submit(upload, file) for file in batch]
+                # Waiting for all of the batch, so that the files stored by the others are known when one fails:
+                attachments = [u.result() for u in uploads if u.exception() is None]
+                try:
+                    for u in uploads:
+                        u.result()
+                    with transaction.atomic():
+                        ApplicationAttachment.objects.bulk_create(attachments)
+                        search.update_search_vectors({a.application_id for a in attachments})
+                        ApplicationRound.increment_versions([attachment_import.application_round_id])
+                        processed += len(batch)
+                        attachment_import.record_progress(processed)
+                except BaseException:
+                    # The files of a batch that is not committed would be left in storage without attachments, and
+                    # stored again by the retry:
+                    for attachment in attachments:
+                        attachment.attachment.delete(save=False)
+                    raise
+    finally:
+        for f in opened:
+            f.close()
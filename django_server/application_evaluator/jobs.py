@@ -0,0 +1,153 @@
+"""
+Background processing of application and attachment imports.
+
+The import rows double as the job queue: imports are saved as pending and processed by `manage.py run_import_worker`,
+outside the request cycle. Workers claim imports with SELECT ... FOR UPDATE SKIP LOCKED, so that several workers can
+run at the same time without processing an import twice.
+
+While an import is processed, its heartbeat_at is updated every IMPORT_JOB_HEARTBEAT seconds. An import still in
+processing whose heartbeat is older than IMPORT_JOB_TIMEOUT seconds, e.g. because its worker was killed, is claimed
+again. Failed imports are retried after IMPORT_JOB_RETRY_DELAY seconds, doubled for each further attempt, until they
+have been attempted IMPORT_JOB_MAX_ATTEMPTS times, except for imports failing with a ValidationError, which are
+invalid and left in error at once. Retried imports resume from their processed_count, so that rows committed by an
+earlier attempt are not imported twice.
+
+With RUN_IMPORTS_IN_REQUEST, e.g. when no worker is deployed, imports are instead attempted once right after they are
+saved (see signals.py).
+"""
+
+from datetime import timedelta
+import logging
+import threading
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, close_old_connections, connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from application_evaluator.models import ApplicationAttachmentImport, ApplicationImport
+
+logger = logging.getLogger(__name__)
+
+# Applications are imported before attachments, which are matched to them by name:
+IMPORT_MODELS = [ApplicationImport, ApplicationAttachmentImport]
+
+
+def claim(model, ids=None):
+    """
+    Claim the next available import of the given model, or of the given ids regardless of retry delays, for processing.
+    Return the claimed import, or None if there is none.
+    """
+    now = timezone.now()
+    pending = Q(status="pending")
+    if ids is None:
+        pending &= Q(run_after=None) | Q(run_after__lte=now)
+    abandoned = Q(status="processing", heartbeat_at__lt=now - timedelta(seconds=settings.IMPORT_JOB_TIMEOUT))
+    imports = model.objects.filter(pending | abandoned).exclude(file="").order_by("created_at", "id")
+    if ids is not None:
+        imports = imports.filter(id__in=ids)
+
+    while True:
+        with transaction.atomic():
+            job = imports.select_for_update(skip_locked=True).first()
+            if job is None:
+                return None
+            if job.status == "processing" and job.attempts >= settings.IMPORT_JOB_MAX_ATTEMPTS:
+                job.status = "error"
+                job.error = f"Import timed out after {job.attempts} attempts."
+                job.save(update_fields=["status", "error"])
+                continue
+            job.status = "processing"
+            job.attempts += 1
+            job.heartbeat_at = now
+            job.save(update_fields=["status", "attempts", "heartbeat_at"])
+            return job
+
+
+class Heartbeat(threading.Thread):
+    """
+    Update the heartbeat of a claimed import until stopped.
+    """
+
+    def __init__(self, job):
+        super().__init__(daemon=True)
+        self.job = job
+        self.stopped = threading.Event()
+
+    def run(self):
+        try:
+            while not self.stopped.wait(settings.IMPORT_JOB_HEARTBEAT):
+                try:
+                    self.beat()
+                except DatabaseError:
+                    # Beat again later rather than let the import be claimed again while it is still processed:
+                    logger.exception(f"Heartbeat of {self.job} failed.")
+                    # Like between requests, so that a broken connection is replaced:
+                    close_old_connections()
+        finally:
+            # Database connections are per thread:
+            connections.close_all()
+
+    def beat(self):
+        type(self.job).objects.filter(id=self.job.id, status="processing").update(heartbeat_at=timezone.now())
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+def run(job):
+    """
+    Process a claimed import, then mark it done, or pending for a retry or in error if it fails.
+    """
+    heartbeat = Heartbeat(job)
+    heartbeat.start()
+    try:
+        job._process()
+    except ValidationError as e:
+        # The file is invalid, which retrying does not change:
+        logger.warning(f"{job} is invalid: {e}")
+        job.error = " ".join(e.messages)
+        job.status = "error"
+    except Exception as e:
+        logger.exception(f"{job} failed on attempt {job.attempts}.")
+        job.error = str(e)
+        if job.attempts < settings.IMPORT_JOB_MAX_ATTEMPTS:
+            job.status = "pending"
+            job.run_after = timezone.now() + timedelta(
+                seconds=settings.IMPORT_JOB_RETRY_DELAY * 2 ** (job.attempts - 1)
+            )
+        else:
+            job.status = "error"
+    else:
+        job.status = "done"
+        job.error = ""
+    finally:
+        heartbeat.stop()
+    # Unless the import has been claimed again meanwhile, e.g. after missing heartbeats, for its new claim to save:
+    claimed = type(job).objects.filter(id=job.id, status="processing", attempts=job.attempts)
+    if not claimed.update(status=job.status, error=job.error, run_after=job.run_after):
+        logger.warning(f"{job} was claimed again during attempt {job.attempts}, which is not saved.")
+
+
+def run_next():
+    """
+    Claim and process the next available import, returning it, or None if there is none.
+    """
+    for model in IMPORT_MODELS:
+        job = claim(model)
+        if job:
+            run(job)
+            return job
+    return None
+
+
+def run_now(model, job_id):
+    """
+    Attempt to process the given import once, e.g. right after it is saved. If the attempt fails, the import is left
+    to be retried by a worker, rather than retried here without delay.
+    """
+    job = claim(model, ids=[job_id])
+    if job:
+        run(job)
@@ -0,0 +1,90 @@
+import collections
+import http.client
+import threading
+import time
+import urllib.parse
+
+from django.core.management.base import BaseCommand
+
+
+def _percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+class Command(BaseCommand):
+    help = (
+        "Load test a running server with concurrent GET requests, e.g. to compare the WSGI (gunicorn) and ASGI "
+        "(uvicorn) deployments: run the command once against each, with the same database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("urls", nargs="+", help="URLs to request, in turns.")
+        parser.add_argument("--token", help="API token to authenticate with.")
+        parser.add_argument("--accept", default="application/json", help="Accept header of the requests.")
+        parser.add_argument("--concurrency", type=int, default=50, help="Number of concurrent clients.")
+        parser.add_argument("--requests", type=int, default=2000, help="Total number of requests.")
+        parser.add_argument(
+            "--conditional",
+            action="store_true",
+            help="Send the ETags of earlier responses in If-None-Match, as reloading clients do.",
+        )
+
+    def handle(self, *args, urls, token=None, accept="application/json", concurrency=50, requests=2000, **options):
+        headers = {"Accept": accept, "Accept-Encoding": "gzip"}
+        if token:
+            headers["Authorization"] = f"Token {token}"
+        etags = {}
+        latencies = []
+        statuses = collections.Counter()
+        lock = threading.Lock()
+        counter = iter(range(requests))
+
+        def client():
+            connections = {}
+            for i in counter:
+                url = urllib.parse.urlsplit(urls[i % len(urls)])
+                if url.netloc not in connections:
+                    connections[url.netloc] = http.client.HTTPConnection(url.netloc, timeout=60)
+                request_headers = dict(headers)
+                if options["conditional"] and url in etags:
+                    request_headers["If-None-Match"] = etags[url]
+                start = time.perf_counter()
+                try:
+                    connection = connections[url.netloc]
+                    connection.request(
+                        "GET", url.path + (f"?{url.query}" if url.query else ""), headers=request_headers
+                    )
+                    response = connection.getresponse()
+                    response.read()
+                    status = response.status
+                except (OSError, http.client.HTTPException):
+                    connections.pop(url.netloc).close()
+                    status = "error"
+                elapsed = time.perf_counter() - start
+                with lock:
+                    latencies.append(elapsed)
+                    statuses[status] += 1
+                    if status == 200 and response.getheader("ETag"):
+                        etags[url] = response.getheader("ETag")
+
+        threads = [threading.Thread(target=client) for _i in range(concurrency)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        duration = time.perf_counter() - start
+
+        latencies.sort()
+        self.stdout.write(f"{requests} requests by {concurrency} clients in {duration:.2f} s")
+        self.stdout.write(f"Throughput: {requests / duration:.1f} requests/s")
+        self.stdout.write(
+            "Latency (ms): "
+            + ", ".join(
+                f"{name} {_percentile(latencies, fraction) * 1000:.1f}"
+                for name, fraction in [("p50", 0.5), ("p95", 0.95), ("p99", 0.99), ("max", 1)]
+            )
+        )
+        self.stdout.write(
+            "Responses: " + ", ".join(f"{status}: {n}" for status, n in sorted(statuses.items(), key=str))
+        )
@@ -0,0 +1,96 @@
+import gzip
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from application_evaluator.renderers import MessagePackRenderer, ORJSONRenderer
+
+
+def synthetic_round(applications, criteria=10, evaluators=3):
+    """
+    Return data shaped like a serialized application round with the given numbers of applications, criteria and
+    evaluators, each evaluator having scored every criterion of every application.
+    """
+    rng = random.Random(0)
+    organizations = ["Helsinki", "Espoo", "Vantaa"]
+    users = [
+        {
+            "id": i,
+            "first_name": f"First{i}",
+            "last_name": f"Last{i}",
+            "username": f"evaluator{i}",
+            "organization": organizations[i % len(organizations)],
+        }
+        for i in range(evaluators)
+    ]
+    return {
+        "id": 1,
+        "name": "Synthetic round",
+        "criteria": [{"name": f"Criterion {c}", "group": c % 3, "id": c, "weight": 1.0} for c in range(criteria)],
+        "applications": [
+            {
+                "name": f"Application {a}",
+                "application_id": f"a0{a:016d}",
+                "description": " ".join(rng.choice(["smart", "city", "mobility", "energy", "data"]) for i in range(80)),
+                "scores": [
+                    {
+                        "score": float(rng.randint(1, 5)),
+                        "evaluator": user,
+                        "criterion": c,
+                        "application": a,
+                        "id": (a * criteria + c) * evaluators + user["id"],
+                    }
+                    for c in range(criteria)
+                    for user in users
+                ],
+                "comments": [
+                    {
+                        "comment": "Looks promising, but the budget needs more detail.",
+                        "evaluator": user,
+                        "criterion_group": 0,
+                        "application": a,
+                        "id": a * evaluators + user["id"],
+                        "created_at": "2024-05-01T12:00:00.123000Z",
+                    }
+                    for user in users
+                ],
+                "id": a,
+                "evaluating_organizations": organizations[: 1 + a % len(organizations)],
+                "attachments": [
+                    {"name": "plan.pdf", "attachment": f"/media/application_attachments/{a:064x}/plan.pdf"}
+                ],
+                "approved": False,
+                "approved_by": None,
+            }
+            for a in range(applications)
+        ],
+    }
+
+
+class Command(BaseCommand):
+    help = "Compare the render time and payload size of the REST API renderers for a synthetic application round."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--applications", type=int, default=5000, help="Number of applications in the round.")
+        parser.add_argument("--repeat", type=int, default=3, help="Number of renders to take the fastest of.")
+
+    def handle(self, *args, applications=5000, repeat=3, **options):
+        data = synthetic_round(applications)
+        renderers = [
+            ("JSONRenderer (DRF, before)", JSONRenderer()),
+            ("ORJSONRenderer", ORJSONRenderer()),
+            ("MessagePackRenderer", MessagePackRenderer()),
+        ]
+        self.stdout.write(f"Round of {applications} applications:")
+        self.stdout.write(f"{'Renderer':<28}{'Time (ms)':>12}{'Size (KiB)':>14}{'Gzipped (KiB)':>16}")
+        for name, renderer in renderers:
+            times = []
+            for _i in range(repeat):
+                start = time.perf_counter()
+                content = renderer.render(data, renderer.media_type, {})
+                times.append(time.perf_counter() - start)
+            size = len(content) / 1024
+            gzipped = len(gzip.compress(content)) / 1024
+            self.stdout.write(f"{name:<28}{min(times) * 1000:>12.1f}{size:>14.1f}{gzipped:>16.1f}")
@@ -0,0 +1,50 @@
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+import numpy as np
+
+from application_evaluator.scoring import RoundScores
+
+
+class Command(BaseCommand):
+    help = "Measure the time and peak memory of computing the scores of a synthetic application round with RoundScores."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--applications", type=int, default=10000, help="Number of applications in the round.")
+        parser.add_argument("--criteria", type=int, default=50, help="Number of criteria in the round.")
+        parser.add_argument("--evaluators", type=int, default=30, help="Number of evaluators in the round.")
+        parser.add_argument(
+            "--density", type=float, default=0.1, help="Fraction of the criteria each evaluator scores."
+        )
+        parser.add_argument("--repeat", type=int, default=3, help="Number of computations to take the fastest of.")
+
+    def handle(self, *args, applications=10000, criteria=50, evaluators=30, density=0.1, repeat=3, **options):
+        rng = np.random.default_rng(0)
+        scored = rng.random((applications, criteria, evaluators), dtype=np.float32) < density
+        index = np.argwhere(scored)
+        del scored
+        scores = np.column_stack([index, rng.integers(1, 6, len(index))])
+        kwargs = {
+            "application_ids": range(applications),
+            "criteria": [(c, c % 5, 1 + c % 3) for c in range(criteria)],
+            "groups": [(g, g - 1 if g else None, 2.5) for g in range(5)],
+            "scores": scores,
+            "organizations": {e: e % 6 for e in range(evaluators - 3)},
+        }
+
+        times = []
+        for _i in range(repeat):
+            start = time.perf_counter()
+            RoundScores(**kwargs)
+            times.append(time.perf_counter() - start)
+        tracemalloc.start()
+        RoundScores(**kwargs)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        self.stdout.write(
+            f"Round of {applications} applications, {criteria} criteria and {evaluators} evaluators, "
+            f"{len(scores)} scores:"
+        )
+        self.stdout.write(f"Time: {min(times) * 1000:.1f} ms, peak memory: {peak / 2**20:.1f} MiB")
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from application_evaluator import models, summaries
+
+
+class Command(BaseCommand):
+    help = "Rebuild the application score summaries from scratch, or check them for drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--round", type=int, action="append", dest="rounds", help="Application round id(s).")
+        parser.add_argument(
+            "--check", action="store_true", help="Only report applications whose summaries are out of date."
+        )
+
+    def handle(self, *args, rounds=None, check=False, **options):
+        application_rounds = models.ApplicationRound.objects.order_by("id")
+        if rounds:
+            application_rounds = application_rounds.filter(id__in=rounds)
+
+        if check:
+            drifted = summaries.find_drift(models.Application.objects.filter(application_round__in=application_rounds))
+            if drifted:
+                raise CommandError(f"Score summaries out of date for applications: {', '.join(map(str, drifted))}")
+            self.stdout.write("Score summaries are up to date.")
+            return
+
+        for application_round in application_rounds:
+            summaries.refresh_rounds([application_round.id])
+            self.stdout.write(f"Rebuilt score summaries for {application_round}.")
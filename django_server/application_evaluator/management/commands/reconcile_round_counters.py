@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from application_evaluator import counters, models
+
+
+class Command(BaseCommand):
+    help = "Recompute the counters of application rounds from scratch, or check them for drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--round", type=int, action="append", dest="rounds", help="Application round id(s).")
+        parser.add_argument("--check", action="store_true", help="Only report rounds whose counters are out of date.")
+
+    def handle(self, *args, rounds=None, check=False, **options):
+        application_rounds = models.ApplicationRound.objects.order_by("id")
+        if rounds:
+            application_rounds = application_rounds.filter(id__in=rounds)
+
+        if check:
+            drifted = counters.find_drift(application_rounds)
+            if drifted:
+                raise CommandError(f"Counters out of date for application rounds: {', '.join(map(str, drifted))}")
+            self.stdout.write("Application round counters are up to date.")
+            return
+
+        for application_round in application_rounds:
+            counters.refresh_rounds([application_round.id])
+            self.stdout.write(f"Reconciled the counters of {application_round}.")
@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from application_evaluator import jobs
+
+
+class Command(BaseCommand):
+    help = "Process pending application and attachment imports, waiting for new ones until stopped."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Exit when there are no imports left to process.")
+        parser.add_argument(
+            "--poll-interval", type=float, default=5, help="Seconds to wait before checking for new imports."
+        )
+
+    def handle(self, *args, once=False, poll_interval=5, **options):
+        while True:
+            job = jobs.run_next()
+            if job:
+                self.stdout.write(f"{job}: {job.status} after {job.attempts} attempt(s).")
+            elif once:
+                return
+            else:
+                # Like between requests, so that connections are renewed as configured:
+                close_old_connections()
+                time.sleep(poll_interval)
@@ -0,0 +1,226 @@
+"""
+Per-request instrumentation of database queries, serialization and rendering.
+
+RequestMetricsMiddleware (sync and async) reports the query count, database time, serialization time, rendering time
+and total time of each request in a Server-Timing header to staff users (or to anyone in DEBUG mode), aggregates them
+per view in the current process (see view_metrics) and logs a warning for requests that make more than
+settings.REQUEST_QUERY_BUDGET queries.
+"""
+
+import contextlib
+import contextvars
+import logging
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.utils.functional import SimpleLazyObject, empty
+
+logger = logging.getLogger(__name__)
+
+_current_metrics = contextvars.ContextVar("request_metrics", default=None)
+
+_lock = threading.Lock()
+_view_metrics = {}
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.serialize_time = 0.0
+        self.render_time = 0.0
+        self.total_time = 0.0
+        self.serializing = False
+
+    def execute(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_time += time.perf_counter() - start
+
+    def server_timing(self):
+        return ", ".join(
+            [
+                f'db;dur={self.db_time * 1000:.1f};desc="{self.queries} queries"',
+                f"serialize;dur={self.serialize_time * 1000:.1f}",
+                f"render;dur={self.render_time * 1000:.1f}",
+                f"total;dur={self.total_time * 1000:.1f}",
+            ]
+        )
+
+
+@contextlib.contextmanager
+def timed_serialization():
+    """
+    Count the time spent in the block as serialization time of the current request. Nested blocks are counted only
+    once.
+    """
+    metrics = _current_metrics.get()
+    if metrics is None or metrics.serializing:
+        yield
+        return
+    metrics.serializing = True
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.serializing = False
+        metrics.serialize_time += time.perf_counter() - start
+
+
+def view_name(view_func, request):
+    """
+    Return a name for the view handling the request, e.g. "ApplicationRoundViewSet.list" for REST viewsets or
+    "admin:application_evaluator_application_changelist" for admin views.
+    """
+    cls = getattr(view_func, "cls", None)
+    method = request.method.lower()
+    if cls is not None:
+        actions = getattr(view_func, "actions", None) or {}
+        return f"{cls.__name__}.{actions.get(method, method)}"
+    match = request.resolver_match
+    if match and match.view_name:
+        return match.view_name
+    return f"{view_func.__module__}.{view_func.__qualname__}"
+
+
+def _record(view, metrics):
+    with _lock:
+        totals = _view_metrics.setdefault(
+            view,
+            {
+                "requests": 0,
+                "queries": 0,
+                "max_queries": 0,
+                "db_time": 0.0,
+                "serialize_time": 0.0,
+                "render_time": 0.0,
+                "total_time": 0.0,
+                "max_time": 0.0,
+            },
+        )
+        totals["requests"] += 1
+        totals["queries"] += metrics.queries
+        totals["max_queries"] = max(totals["max_queries"], metrics.queries)
+        totals["db_time"] += metrics.db_time
+        totals["serialize_time"] += metrics.serialize_time
+        totals["render_time"] += metrics.render_time
+        totals["total_time"] += metrics.total_time
+        totals["max_time"] = max(totals["max_time"], metrics.total_time)
+
+
+def view_metrics():
+    """
+    Return the request metrics aggregated per view since the process started (or the last reset_view_metrics), as a
+    dict of view name -> totals, with times in seconds.
+    """
+    with _lock:
+        return {view: dict(totals) for view, totals in _view_metrics.items()}
+
+
+def reset_view_metrics():
+    with _lock:
+        _view_metrics.clear()
+
+
+def _execute(execute, sql, params, many, context):
+    metrics = _current_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    return metrics.execute(execute, sql, params, many, context)
+
+
+def instrument(connection, **kwargs):
+    """
+    Count the queries on the database connection in the metrics of the request they are made for, also when the
+    request is handled in another thread, e.g. by the async ORM.
+    """
+    if _execute not in connection.execute_wrappers:
+        # First, so that it stays in place when context managers installing wrappers pop theirs:
+        connection.execute_wrappers.insert(0, _execute)
+
+
+connection_created.connect(instrument)
+
+
+def _is_staff(request, is_async):
+    user = getattr(request, "user", None)
+    if is_async and isinstance(user, SimpleLazyObject) and user._wrapped is empty:
+        # Not authenticated by the view; loading the user would query the database from the event loop:
+        return False
+    return user is not None and user.is_staff
+
+
+class RequestMetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        for connection in connections.all():
+            instrument(connection)
+        metrics = RequestMetrics()
+        token = _current_metrics.set(metrics)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_metrics.reset(token)
+        return self.finish(request, response, metrics, start, is_async=False)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = _current_metrics.set(metrics)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_metrics.reset(token)
+        return self.finish(request, response, metrics, start, is_async=True)
+
+    def finish(self, request, response, metrics, start, is_async):
+        metrics.total_time = time.perf_counter() - start
+        if settings.DEBUG or _is_staff(request, is_async):
+            response["Server-Timing"] = metrics.server_timing()
+        view = getattr(request, "metrics_view_name", None)
+        if view is None:
+            return response
+        _record(view, metrics)
+
+        if metrics.queries > settings.REQUEST_QUERY_BUDGET:
+            logger.warning(
+                "%s %s (%s) made %d queries, over the budget of %d, taking %.1f ms of %.1f ms.",
+                request.method,
+                request.path,
+                view,
+                metrics.queries,
+                settings.REQUEST_QUERY_BUDGET,
+                metrics.db_time * 1000,
+                metrics.total_time * 1000,
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.metrics_view_name = view_name(view_func, request)
+
+    def process_template_response(self, request, response):
+        metrics = _current_metrics.get()
+        start = time.perf_counter()
+
+        def rendered(response):
+            metrics.render_time += time.perf_counter() - start
+
+        response.add_post_render_callback(rendered)
+        return response
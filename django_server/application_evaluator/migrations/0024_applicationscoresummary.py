@@ -0,0 +1,34 @@
+# Generated by Django 4.2.30 on 2026-10-18 10:07
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('application_evaluator', '0023_application_application_id'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApplicationScoreSummary',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(default=0)),
+                ('weighted_score', models.FloatField(default=0)),
+                ('weight', models.FloatField(default=0)),
+                ('score_count', models.IntegerField(default=0)),
+                ('scored_criteria', models.IntegerField(default=0)),
+                ('application', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='score_summaries', to='application_evaluator.application')),
+                ('criterion_group', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='application_evaluator.criteriongroup')),
+                ('evaluator', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('organization', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='application_evaluator.organization')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['application', 'organization', 'evaluator', 'criterion_group'], name='application_applica_4802b8_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 4.2.30 on 2026-10-18 10:19
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('application_evaluator', '0024_applicationscoresummary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(choices=[('score', 'Score'), ('comment', 'Comment')], max_length=16)),
+                ('object_id', models.IntegerField()),
+                ('application_id', models.IntegerField()),
+                ('evaluator_id', models.IntegerField()),
+                ('deleted_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['modified_at'], name='comment_modified_at'),
+        ),
+        migrations.AddIndex(
+            model_name='score',
+            index=models.Index(fields=['modified_at'], name='score_modified_at'),
+        ),
+        migrations.AddField(
+            model_name='tombstone',
+            name='application_round',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tombstones', to='application_evaluator.applicationround'),
+        ),
+        migrations.AddIndex(
+            model_name='tombstone',
+            index=models.Index(fields=['application_round', 'model', 'deleted_at'], name='application_applica_06dc6f_idx'),
+        ),
+    ]
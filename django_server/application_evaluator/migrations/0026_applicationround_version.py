@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-18 10:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('application_evaluator', '0025_tombstone'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='applicationround',
+            name='version',
+            field=models.IntegerField(default=0, editable=False, help_text='Incremented on changes to the round and its applications, criteria and submittals.'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.30 on 2026-10-18 10:29
+
+from django.db import migrations, models
+
+
+def remove_duplicate_scores(apps, schema_editor):
+    # Keep the most recently modified score of each evaluator for each criterion of each application:
+    Score = apps.get_model("application_evaluator", "Score")
+    duplicates = (
+        Score.objects.values("application_id", "criterion_id", "evaluator_id")
+        .annotate(count=models.Count("id"))
+        .filter(count__gt=1)
+    )
+    for duplicate in duplicates:
+        del duplicate["count"]
+        score_ids = Score.objects.filter(**duplicate).order_by("-modified_at", "-id").values_list("id", flat=True)
+        Score.objects.filter(id__in=list(score_ids)[1:]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('application_evaluator', '0026_applicationround_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_scores, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='score',
+            constraint=models.UniqueConstraint(fields=('application', 'criterion', 'evaluator'), name='unique_evaluator_score'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 4.2.30 on 2026-10-18 10:37
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def populate_access(apps, schema_editor):
+    ApplicationRound = apps.get_model("application_evaluator", "ApplicationRound")
+    Application = apps.get_model("application_evaluator", "Application")
+    ApplicationAccess = apps.get_model("application_evaluator", "ApplicationAccess")
+    rows = [
+        ApplicationAccess(user_id=user_id, application_round_id=round_id, reason="evaluator")
+        for round_id, user_id in ApplicationRound.evaluators.through.objects.values_list("applicationround_id", "user_id")
+    ]
+    rows += [
+        ApplicationAccess(user_id=user_id, application_round_id=round_id, reason="admin")
+        for round_id, user_id in ApplicationRound.objects.exclude(admin=None).values_list("id", "admin_id")
+    ]
+    rows += [
+        ApplicationAccess(user_id=user_id, application_round_id=round_id, application_id=app_id, reason="organization")
+        for app_id, round_id, user_id in Application.evaluating_organizations.through.objects.exclude(
+            organization__users=None
+        ).values_list("application_id", "application__application_round_id", "organization__users").distinct()
+    ]
+    ApplicationAccess.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('application_evaluator', '0027_unique_evaluator_score'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApplicationAccess',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reason', models.CharField(choices=[('organization', 'Organization'), ('evaluator', 'Evaluator'), ('admin', 'Admin')], max_length=16)),
+                ('application', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='application_evaluator.application')),
+                ('application_round', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='application_evaluator.applicationround')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'application_round', 'application'], name='application_user_id_795f25_idx')],
+            },
+        ),
+        migrations.RunPython(populate_access, migrations.RunPython.noop),
+    ]
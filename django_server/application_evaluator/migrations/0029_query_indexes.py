@@ -0,0 +1,38 @@
+# Generated by Django 4.2.30 on 2026-10-18 11:14
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('application_evaluator', '0028_applicationaccess'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(fields=['application_round', 'name'], name='application_applica_e2d6cd_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['evaluator', 'application'], name='comment_evaluator_application'),
+        ),
+        migrations.AddIndex(
+            model_name='score',
+            index=models.Index(fields=['evaluator', 'application'], name='score_evaluator_application'),
+        ),
+        migrations.AddIndex(
+            model_name='score',
+            index=models.Index(fields=['application', 'criterion'], include=('evaluator', 'score'), name='score_application_criterion'),
+        ),
+        # The applications evaluated by organizations, from the auto-created through table of
+        # Application.evaluating_organizations, whose unique index only covers them the other way round:
+        migrations.RunSQL(
+            'CREATE INDEX application_evaluating_organization_application '
+            'ON application_evaluator_application_evaluating_organizations (organization_id, application_id)',
+            'DROP INDEX application_evaluating_organization_application',
+        ),
+    ]
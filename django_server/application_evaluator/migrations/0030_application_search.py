@@ -0,0 +1,54 @@
+# Generated by Django 4.2.30 on 2026-10-18 11:19
+
+from django.conf import settings
+from django.contrib.postgres.aggregates import StringAgg
+import django.contrib.postgres.search
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+from django.db.models import OuterRef, Subquery
+
+
+# The search vectors are only used on PostgreSQL (see search.py):
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(
+        "CREATE INDEX application_search_vector ON application_evaluator_application USING gin (search_vector)"
+    )
+    Application = apps.get_model("application_evaluator", "Application")
+    ApplicationAttachment = apps.get_model("application_evaluator", "ApplicationAttachment")
+    attachment_names = (
+        ApplicationAttachment.objects.filter(application=OuterRef("pk"))
+        .values("application")
+        .annotate(names=StringAgg("name", " "))
+        .values("names")
+    )
+    config = settings.SEARCH_CONFIG
+    Application.objects.update(
+        search_vector=SearchVector("name", weight="A", config=config)
+        + SearchVector("description", weight="B", config=config)
+        + SearchVector(Subquery(attachment_names), weight="C", config=config)
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute("DROP INDEX application_search_vector")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('application_evaluator', '0029_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='application',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
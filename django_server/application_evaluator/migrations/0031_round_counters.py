@@ -0,0 +1,85 @@
+# Generated by Django 4.2.30 on 2026-10-18 11:23
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def populate_counters(apps, schema_editor):
+    ApplicationRound = apps.get_model("application_evaluator", "ApplicationRound")
+    Application = apps.get_model("application_evaluator", "Application")
+    ApplicationRoundSubmittal = apps.get_model("application_evaluator", "ApplicationRoundSubmittal")
+    Comment = apps.get_model("application_evaluator", "Comment")
+    Criterion = apps.get_model("application_evaluator", "Criterion")
+    Score = apps.get_model("application_evaluator", "Score")
+
+    def counts(queryset, field):
+        return dict(queryset.order_by().values(field).annotate(n=Count("id")).values_list(field, "n"))
+
+    criterion_counts = counts(Criterion.objects.all(), "application_round")
+    scored_criteria = dict(
+        Score.objects.order_by()
+        .values("application")
+        .annotate(n=Count("criterion", distinct=True))
+        .values_list("application", "n")
+    )
+    fully_scored = [
+        app_id
+        for app_id, round_id in Application.objects.values_list("id", "application_round_id")
+        if 0 < criterion_counts.get(round_id, 0) <= scored_criteria.get(app_id, 0)
+    ]
+    Application.objects.filter(id__in=fully_scored).update(fully_scored=True)
+
+    application_counts = counts(Application.objects.all(), "application_round")
+    scored_counts = counts(Application.objects.filter(fully_scored=True), "application_round")
+    score_counts = counts(Score.objects.all(), "application__application_round")
+    comment_counts = counts(Comment.objects.all(), "application__application_round")
+    submittal_counts = counts(ApplicationRoundSubmittal.objects.all(), "application_round")
+    for round_id in ApplicationRound.objects.values_list("id", flat=True):
+        ApplicationRound.objects.filter(id=round_id).update(
+            application_count=application_counts.get(round_id, 0),
+            scored_application_count=scored_counts.get(round_id, 0),
+            score_count=score_counts.get(round_id, 0),
+            comment_count=comment_counts.get(round_id, 0),
+            submittal_count=submittal_counts.get(round_id, 0),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('application_evaluator', '0030_application_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='application',
+            name='fully_scored',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddField(
+            model_name='applicationround',
+            name='application_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='applications'),
+        ),
+        migrations.AddField(
+            model_name='applicationround',
+            name='comment_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='comments'),
+        ),
+        migrations.AddField(
+            model_name='applicationround',
+            name='score_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='scores'),
+        ),
+        migrations.AddField(
+            model_name='applicationround',
+            name='scored_application_count',
+            field=models.IntegerField(default=0, editable=False, help_text='Applications scored for all criteria.', verbose_name='fully scored'),
+        ),
+        migrations.AddField(
+            model_name='applicationround',
+            name='submittal_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='submittals'),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-18 11:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('application_evaluator', '0031_round_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='applicationattachmentimport',
+            name='processed_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='processed'),
+        ),
+        migrations.AddField(
+            model_name='applicationattachmentimport',
+            name='total_count',
+            field=models.IntegerField(blank=True, editable=False, null=True, verbose_name='total'),
+        ),
+        migrations.AddField(
+            model_name='applicationimport',
+            name='processed_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='processed'),
+        ),
+        migrations.AddField(
+            model_name='applicationimport',
+            name='total_count',
+            field=models.IntegerField(blank=True, editable=False, null=True, verbose_name='total'),
+        ),
+    ]
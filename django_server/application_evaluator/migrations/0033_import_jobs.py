@@ -0,0 +1,43 @@
+# Generated by Django 4.2.30 on 2026-10-18 11:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('application_evaluator', '0032_import_progress'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='applicationattachmentimport',
+            name='attempts',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='applicationattachmentimport',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='applicationattachmentimport',
+            name='run_after',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='applicationimport',
+            name='attempts',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='applicationimport',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='applicationimport',
+            name='run_after',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
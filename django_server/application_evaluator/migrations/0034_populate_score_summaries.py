@@ -0,0 +1,146 @@
+from collections import defaultdict
+from itertools import islice
+
+from django.db import migrations
+
+# The summaries as computed by application_evaluator/summaries.py when this migration was written, using the historical
+# models, so that later changes to the module or the models do not change this migration.
+
+BATCH_SIZE = 500
+
+SUMMARY_FIELDS = ["score", "weighted_score", "weight", "score_count", "scored_criteria"]
+
+
+def _mean(values):
+    return sum(values) / len(values)
+
+
+def _criterion_score(scores, by_organization, organizations):
+    if not by_organization:
+        return _mean([score for evaluator_id, score in scores])
+    org_scores = defaultdict(list)
+    for evaluator_id, score in scores:
+        if evaluator_id in organizations:
+            org_scores[organizations[evaluator_id]].append(score)
+    return _mean([_mean(s) for s in org_scores.values()]) if org_scores else None
+
+
+def _summarize(scores, weights, by_organization, organizations):
+    criterion_scores = defaultdict(list)
+    for criterion_id, evaluator_id, score in scores:
+        if criterion_id in weights:
+            criterion_scores[criterion_id].append((evaluator_id, score))
+
+    values = dict.fromkeys(SUMMARY_FIELDS, 0)
+    for criterion_id, c_scores in criterion_scores.items():
+        values["score_count"] += len(c_scores)
+        score = _criterion_score(c_scores, by_organization, organizations)
+        if score is not None:
+            values["weighted_score"] += score * weights[criterion_id]
+            values["weight"] += weights[criterion_id]
+            values["scored_criteria"] += 1
+    total_weight = sum(weights.values())
+    values["score"] = values["weighted_score"] / total_weight if total_weight else 0
+    return values
+
+
+def _group_weights(groups, criteria):
+    weights = {group_id: {} for group_id in groups}
+    for criterion_id, (group_id, weight) in criteria.items():
+        while group_id is not None:
+            weights[group_id][criterion_id] = weight
+            group_id = groups[group_id]
+    return weights
+
+
+def compute_summaries(apps, application_ids):
+    Application = apps.get_model("application_evaluator", "Application")
+    ApplicationScoreSummary = apps.get_model("application_evaluator", "ApplicationScoreSummary")
+    Criterion = apps.get_model("application_evaluator", "Criterion")
+    CriterionGroup = apps.get_model("application_evaluator", "CriterionGroup")
+    Organization = apps.get_model("application_evaluator", "Organization")
+    Score = apps.get_model("application_evaluator", "Score")
+
+    applications = list(
+        Application.objects.filter(id__in=application_ids).values_list(
+            "id", "application_round_id", "application_round__scoring_model"
+        )
+    )
+    round_ids = {round_id for app_id, round_id, scoring_model in applications}
+
+    criteria = defaultdict(dict)
+    for criterion_id, round_id, group_id, weight in Criterion.objects.filter(
+        application_round_id__in=round_ids
+    ).values_list("id", "application_round_id", "group_id", "weight"):
+        criteria[round_id][criterion_id] = (group_id, weight)
+
+    groups = defaultdict(dict)
+    for group_id, round_id, parent_id in CriterionGroup.objects.filter(application_round_id__in=round_ids).values_list(
+        "id", "application_round_id", "parent_id"
+    ):
+        groups[round_id][group_id] = parent_id
+
+    scores = defaultdict(list)
+    for app_id, criterion_id, evaluator_id, score in Score.objects.filter(
+        application_id__in=application_ids
+    ).values_list("application_id", "criterion_id", "evaluator_id", "score"):
+        scores[app_id].append((criterion_id, evaluator_id, score))
+
+    # The organization of a user is the one with the smallest id:
+    organizations = {}
+    memberships = Organization.users.through.objects.filter(
+        user_id__in={evaluator_id for s in scores.values() for c, evaluator_id, score in s}
+    )
+    for user_id, organization_id in memberships.values_list("user_id", "organization_id"):
+        organizations[user_id] = min(organization_id, organizations.get(user_id, organization_id))
+
+    summaries = []
+    for app_id, round_id, scoring_model in applications:
+        app_scores = scores[app_id]
+        if not app_scores:
+            continue
+        scopes = [(None, {c: weight for c, (group, weight) in criteria[round_id].items()})]
+        scopes += _group_weights(groups[round_id], criteria[round_id]).items()
+
+        subsets = [(None, None, app_scores, scoring_model == "Organizations average")]
+        for org_id in sorted({organizations[e] for c, e, s in app_scores if e in organizations}):
+            org_scores = [s for s in app_scores if organizations.get(s[1]) == org_id]
+            subsets.append((org_id, None, org_scores, False))
+        for evaluator_id in sorted({e for c, e, s in app_scores}):
+            subsets.append((None, evaluator_id, [s for s in app_scores if s[1] == evaluator_id], False))
+
+        for org_id, evaluator_id, subset, by_organization in subsets:
+            for group_id, weights in scopes:
+                values = _summarize(subset, weights, by_organization, organizations)
+                if values["score_count"]:
+                    summaries.append(
+                        ApplicationScoreSummary(
+                            application_id=app_id,
+                            organization_id=org_id,
+                            evaluator_id=evaluator_id,
+                            criterion_group_id=group_id,
+                            **values,
+                        )
+                    )
+    return summaries
+
+
+def populate_summaries(apps, schema_editor):
+    Application = apps.get_model("application_evaluator", "Application")
+    ApplicationScoreSummary = apps.get_model("application_evaluator", "ApplicationScoreSummary")
+    ApplicationScoreSummary.objects.all().delete()
+    ids = Application.objects.filter(scores__isnull=False).distinct().order_by("id").values_list("id", flat=True)
+    ids = ids.iterator()
+    while batch := list(islice(ids, BATCH_SIZE)):
+        ApplicationScoreSummary.objects.bulk_create(compute_summaries(apps, batch))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('application_evaluator', '0033_import_jobs'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_summaries, migrations.RunPython.noop),
+    ]
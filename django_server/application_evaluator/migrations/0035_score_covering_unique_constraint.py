@@ -0,0 +1,49 @@
+# Generated by Django 4.2.30 on 2026-10-18 12:20
+
+from django.db import migrations, models
+
+FIELDS = ('application', 'criterion', 'evaluator')
+
+
+def constraint(schema_editor):
+    # Databases without covering indexes, e.g. SQLite, would get no constraint at all with include:
+    include = ('score',) if schema_editor.connection.features.supports_covering_indexes else ()
+    return models.UniqueConstraint(fields=FIELDS, include=include, name='unique_evaluator_score')
+
+
+# The SQL of the constraint rather than schema_editor.add_constraint, which remakes the table of the historical model,
+# without the constraint, on SQLite:
+def add_constraint(apps, schema_editor):
+    schema_editor.execute(constraint(schema_editor).create_sql(apps.get_model('application_evaluator', 'Score'), schema_editor))
+
+
+def remove_constraint(apps, schema_editor):
+    schema_editor.execute(constraint(schema_editor).remove_sql(apps.get_model('application_evaluator', 'Score'), schema_editor))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('application_evaluator', '0034_populate_score_summaries'),
+    ]
+
+    operations = [
+        # The unique constraint covers the scores of the criteria of applications instead of a separate index:
+        migrations.RemoveIndex(
+            model_name='score',
+            name='score_application_criterion',
+        ),
+        migrations.RemoveConstraint(
+            model_name='score',
+            name='unique_evaluator_score',
+        ),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddConstraint(
+                    model_name='score',
+                    constraint=models.UniqueConstraint(fields=FIELDS, include=('score',), name='unique_evaluator_score'),
+                ),
+            ],
+            database_operations=[migrations.RunPython(add_constraint, remove_constraint)],
+        ),
+    ]
@@ -1,13 +1,15 @@
-import csv
+import io
 import secrets
-import zipfile
 
 from django.contrib.auth.models import User
+from django.contrib.postgres.search import SearchVectorField
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
-from django.core.files import File
-from django.db import models
+from django.db import models, transaction
 from django.utils.safestring import mark_safe
 
+from application_evaluator import caching, payloads
+
 
 class Model(models.Model):
     class Meta:
@@ -66,6 +68,34 @@ class ApplicationRound(NamedModel):
         choices=((x, x) for x in ["Evaluators average", "Organizations average"]),
     )
     scoring_completed = models.BooleanField(default=False, help_text="Set by an admin to close scoring for this round.")
+    version = models.IntegerField(
+        default=0,
+        editable=False,
+        help_text="Incremented on changes to the round and its applications, criteria and submittals.",
+    )
+    # Maintained by counters.py:
+    application_count = models.IntegerField(default=0, editable=False, verbose_name="applications")
+    scored_application_count = models.IntegerField(
+        default=0, editable=False, verbose_name="fully scored", help_text="Applications scored for all criteria."
+    )
+    score_count = models.IntegerField(default=0, editable=False, verbose_name="scores")
+    comment_count = models.IntegerField(default=0, editable=False, verbose_name="comments")
+    submittal_count = models.IntegerField(default=0, editable=False, verbose_name="submittals")
+
+    def save(self, *args, **kwargs):
+        # The version and counters are only changed by increment_versions and counters.py, so that a stale instance
+        # does not overwrite them:
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                f.attname for f in self._meta.concrete_fields if not f.primary_key and f.editable
+            ]
+        return super().save(*args, **kwargs)
+
+    @classmethod
+    def increment_versions(cls, round_ids):
+        rounds = cls.objects.filter(id__in=round_ids)
+        rounds.update(version=models.F("version") + 1)
+        payloads.invalidate_rounds(rounds.values_list("id", flat=True))
 
     def total_weight(self):
         """
@@ -77,24 +107,102 @@ class ApplicationRound(NamedModel):
     def rounds_for_evaluator(cls, user):
         if user.is_staff:
             return cls.objects.all()
-        return (
-            cls.objects.filter(published=True)
-            .filter(
-                models.Q(applications__evaluating_organizations__users=user)
-                | models.Q(evaluators=user)
-                | models.Q(admin=user)
-            )
-            .distinct()
+        return cls.objects.filter(
+            published=True, id__in=ApplicationAccess.objects.filter(user=user).values("application_round")
         )
 
-    def applications_for_evaluator(self, user):
-        if user.is_staff or self.evaluators.filter(id=user.id).exists() or user.id == self.admin_id:
+    def applications_for_evaluator(self, user, round_access=None):
+        """
+        Return the applications of the round visible to the user. round_access tells whether the user has access to
+        all applications of the round, if already known.
+        """
+        access = ApplicationAccess.objects.filter(user=user, application_round=self)
+        if round_access is None:
+            round_access = user.is_staff or access.filter(application=None).exists()
+        if round_access:
             return self.applications.all()
         if user.organization in self.submitted_organizations.all():
             return self.applications.filter(
                 scores__evaluator__organizations__in=self.submitted_organizations.all()
             ).distinct()
-        return self.applications.filter(evaluating_organizations__users=user).distinct()
+        return self.applications.filter(id__in=access.values("application"))
+
+    def criteria_for_evaluator(self, user):
+        if user.is_staff or self.organization_has_submitted(user.organization):
+            return self.criteria.all()
+        return self.criteria.filter(public=True)
+
+    def evaluation_progress(self, user):
+        """
+        Return the number of applications in the round visible to the user, and the number of those that have been
+        scored for all / some of the criteria visible to the user, counting the scores the user is allowed to see.
+        """
+        return ApplicationRound.evaluation_progresses([self], user)[self.id]
+
+    @classmethod
+    def evaluation_progresses(cls, application_rounds, user):
+        """
+        Return a dict of application round id -> evaluation_progress(user) for the given rounds, counted with one
+        query per kind of count for all of them.
+        """
+        application_rounds = list(application_rounds)
+        if not application_rounds:
+            return {}
+        round_access = set(
+            ApplicationAccess.objects.filter(
+                user=user, application=None, application_round__in=application_rounds
+            ).values_list("application_round_id", flat=True)
+        )
+        applications, criteria, criterion_counts = [], [], []
+        for application_round in application_rounds:
+            round_applications = application_round.applications_for_evaluator(
+                user, round_access=user.is_staff or application_round.id in round_access
+            )
+            round_criteria = application_round.criteria_for_evaluator(user)
+            applications.append(
+                Application.objects.filter(id__in=round_applications.values("id"))
+                .order_by()
+                .values("application_round")
+                .annotate(count=models.Count("id"))
+                .values_list("application_round", "count")
+            )
+            criteria.append(
+                round_criteria.order_by()
+                .values("application_round")
+                .annotate(count=models.Count("id"))
+                .values_list("application_round", "count")
+            )
+            criterion_counts.append(
+                Score.for_evaluator(user, application_round)
+                .filter(application__in=round_applications, criterion__in=round_criteria)
+                .order_by()
+                .values("application_id")
+                .annotate(
+                    criterion_count=models.Count("criterion_id", distinct=True),
+                    application_round_id=models.Value(application_round.id),
+                )
+                .values_list("application_round_id", "criterion_count")
+            )
+
+        def union(querysets):
+            return querysets[0].union(*querysets[1:], all=True)
+
+        application_counts = dict(union(applications))
+        criteria_counts = dict(union(criteria))
+        progress = {
+            application_round.id: {
+                "application_count": application_counts.get(application_round.id, 0),
+                "scored_application_count": 0,
+                "evaluated_application_count": 0,
+            }
+            for application_round in application_rounds
+        }
+        for application_round_id, criterion_count in union(criterion_counts):
+            round_progress = progress[application_round_id]
+            round_progress["evaluated_application_count"] += 1
+            if criterion_count >= criteria_counts.get(application_round_id, 0):
+                round_progress["scored_application_count"] += 1
+        return progress
 
     def clone(self):
         copy = ApplicationRound.objects.create(name=f"Copy of {self.name}")
@@ -190,15 +298,88 @@ class Organization(NamedModel):
 
 
 def organization(user):
+    # The organization with the lowest id is the user's organization; the SQL in scoring.py follows the same rule.
     if not hasattr(user, "_organization"):
-        orgs = list(user.organizations.all())
-        user._organization = orgs[0] if len(orgs) else None
+        user._organization = evaluator_organizations([user.id]).get(user.id) if user.id else None
     return user._organization
 
 
 User.organization = property(organization)
 
 
+def organization_ids(user_ids):
+    """
+    Return a dict of user id -> id of the user's organization, for those of the given users with an organization.
+    """
+    organizations = {}
+    for user_id, organization_id in Organization.users.through.objects.filter(user_id__in=user_ids).values_list(
+        "user_id", "organization_id"
+    ):
+        organizations[user_id] = min(organization_id, organizations.get(user_id, organization_id))
+    return organizations
+
+
+ORGANIZATION_CACHE_TIMEOUT = 24 * 60 * 60
+
+# Cached for users without an organization:
+NO_ORGANIZATION = "none"
+
+
+def _organization_cache_key(user_id):
+    return f"application_evaluator:user_organization:{user_id}"
+
+
+def evaluator_organizations(user_ids):
+    """
+    Return a dict of user id -> the user's organization, for those of the given users with an organization.
+
+    The organizations are cached across requests in the default cache; signals.py invalidates the cache entries of
+    users when their organization memberships or organizations change, using forget_organizations. Unless the cache
+    is shared between the server processes, they are only cached briefly, as the other processes keep their entries.
+    """
+    user_ids = set(user_ids)
+    keys = {_organization_cache_key(user_id): user_id for user_id in user_ids}
+    organizations = {keys[key]: value for key, value in cache.get_many(keys).items()}
+
+    missing = user_ids - organizations.keys()
+    if missing:
+        found = {}
+        memberships = (
+            Organization.users.through.objects.filter(user_id__in=missing)
+            .select_related("organization")
+            .order_by("organization_id")
+        )
+        for membership in memberships:
+            found.setdefault(membership.user_id, membership.organization)
+        cache.set_many(
+            {_organization_cache_key(user_id): found.get(user_id, NO_ORGANIZATION) for user_id in missing},
+            caching.timeout(ORGANIZATION_CACHE_TIMEOUT),
+        )
+        organizations.update(found)
+    return {user_id: value for user_id, value in organizations.items() if isinstance(value, Organization)}
+
+
+def forget_organizations(user_ids):
+    """
+    Remove the cached organizations of the given users.
+    """
+    keys = [_organization_cache_key(user_id) for user_id in user_ids]
+    cache.delete_many(keys)
+    # Concurrent requests may cache the old organizations until the change is committed:
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def evaluator_organization_id(user_field):
+    """
+    Return a subquery selecting the id of the organization of the user referenced by user_field.
+    """
+    return models.Subquery(
+        Organization.users.through.objects.filter(user_id=models.OuterRef(user_field))
+        .order_by("organization_id")
+        .values("organization_id")[:1]
+    )
+
+
 class Application(NamedModel):
     application_round = models.ForeignKey(ApplicationRound, related_name="applications", on_delete=models.CASCADE)
     application_id = models.CharField(max_length=64, blank=True)  # Application ID (18 char) from Salesforce CSV
@@ -208,8 +389,46 @@ class Application(NamedModel):
         User, related_name="approved_applications", on_delete=models.SET_NULL, null=True, blank=True
     )
     approved = models.BooleanField(default=False)
+    # Name, description and attachment names, for full-text search on PostgreSQL, GIN indexed there (see search.py):
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Whether the application has scores for all criteria of its round, maintained by counters.py:
+    fully_scored = models.BooleanField(default=False, editable=False)
+
+    # Fields whose values as loaded from the database are kept, for signals.py to tell whether they change on save:
+    tracked_fields = ["approved", "approved_by_id", "application_round_id"]
+
+    class Meta:
+        indexes = [models.Index(fields=["application_round", "name"])]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.loaded_values = {
+            name: value for name, value in zip(field_names, values, strict=True) if name in cls.tracked_fields
+        }
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None):
+        super().refresh_from_db(using, fields)
+        refreshed = self.tracked_fields if fields is None else {self._meta.get_field(f).attname for f in fields}
+        self.loaded_values = {
+            **getattr(self, "loaded_values", {}),
+            **{name: getattr(self, name) for name in self.tracked_fields if name in refreshed},
+        }
+
+    def save(self, *args, **kwargs):
+        # fully_scored and search_vector are only changed by counters.py and search.py, so that a stale instance does
+        # not overwrite them, and so that saving an instance loaded with them deferred does not fetch them:
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                f.attname for f in self._meta.concrete_fields if not f.primary_key and f.editable
+            ]
+        return super().save(*args, **kwargs)
 
     def score(self):
+        # Querysets annotated using scoring.annotate_scores already contain the score:
+        if hasattr(self, "total_score"):
+            return self.total_score
         # Use .all() to force evaluation of the queryset for later:
         if not len(self.scores.all()):
             return 0
@@ -232,26 +451,30 @@ class Application(NamedModel):
         return total / self.application_round.total_weight()
 
     def can_be_evaluated_by(self, user):
-        return (
-            self.evaluating_organizations.filter(users=user).exists()
-            or self.application_round.evaluators.filter(id=user.id).exists()
-        )
+        return ApplicationAccess.to_application(user, self, self.application_round_id).exclude(reason="admin").exists()
 
-    def scores_for_evaluator(self, user):
-        return Score.filter_for_evaluator(self.scores.all(), user, self.application_round)
+    def scores_for_evaluator(self, user, organizations=None):
+        return Score.filter_for_evaluator(self.scores.all(), user, self.application_round, organizations)
 
-    def comments_for_evaluator(self, user):
-        return Comment.filter_for_evaluator(self.comments.all(), user, self.application_round)
+    def comments_for_evaluator(self, user, organizations=None):
+        return Comment.filter_for_evaluator(self.comments.all(), user, self.application_round, organizations)
 
     @classmethod
     def applications_for_evaluator(cls, user):
         if user.is_staff:
             return cls.objects.all()
+        # The ids of the applications of the rounds and the applications the user has access to, rather than
+        # Exists(ApplicationAccess.to_application(user)), for looking the applications up by index instead of
+        # checking each of them:
+        access = ApplicationAccess.objects.filter(user=user)
+        round_applications = cls.objects.filter(
+            application_round__in=access.filter(application=None).values("application_round")
+        )
         return cls.objects.filter(
-            models.Q(evaluating_organizations__users=user)
-            | models.Q(application_round__evaluators=user)
-            | models.Q(application_round__admin=user)
-        ).distinct()
+            id__in=round_applications.values("id").union(
+                access.exclude(application=None).values("application"), all=True
+            )
+        )
 
     def approve_by_user(self, user):
         self.approved_by = user
@@ -278,6 +501,55 @@ class ApplicationAttachment(NamedModel):
         return super().save(**kwargs)
 
 
+def visible_to_evaluator(instances, user, application_round):
+    """
+    Filter a queryset of instances with an evaluator_id in the application round to those that the user is allowed to
+    see, following the rules of EvaluationModel.filter_for_evaluator.
+    """
+    if user.is_staff or application_round.scoring_completed or user.id == application_round.admin_id:
+        return instances
+    if not user.organization:
+        return instances.filter(evaluator_id=user.id)
+
+    instances = instances.annotate(evaluator_organization=evaluator_organization_id("evaluator_id"))
+    if application_round.organization_has_submitted(user.organization):
+        return instances.filter(evaluator_organization__in=application_round.submitted_organizations.values("id"))
+    return instances.filter(evaluator_organization=user.organization.id)
+
+
+def visibility_class(user, application_round_id):
+    """
+    Return a key that is the same for all users who are shown the same data of the application round, for sharing
+    cached payloads between them.
+    """
+    if user.is_staff:
+        return ("staff",)
+    reasons, organization_ids = _visibility_queries(user, application_round_id)
+    return _visibility_class(user, tuple(reasons), tuple(organization_ids))
+
+
+async def avisibility_class(user, application_round_id):
+    """
+    Async version of visibility_class.
+    """
+    if user.is_staff:
+        return ("staff",)
+    reasons, organization_ids = _visibility_queries(user, application_round_id)
+    return _visibility_class(user, tuple([r async for r in reasons]), tuple([o async for o in organization_ids]))
+
+
+def _visibility_queries(user, application_round_id):
+    reasons = ApplicationAccess.objects.filter(user=user, application_round_id=application_round_id, application=None)
+    organization_ids = user.organizations.order_by("id").values_list("id", flat=True)
+    return reasons.order_by("reason").values_list("reason", flat=True), organization_ids
+
+
+def _visibility_class(user, reasons, organization_ids):
+    # Users without an organization are shown only their own scores:
+    user_id = None if organization_ids else user.id
+    return (reasons, organization_ids, user_id)
+
+
 class EvaluationModel(TimestampedModel):
     """
     Model used for evaluating applications
@@ -288,11 +560,17 @@ class EvaluationModel(TimestampedModel):
 
     class Meta:
         abstract = True
+        indexes = [
+            models.Index(fields=["modified_at"], name="%(class)s_modified_at"),
+            models.Index(fields=["evaluator", "application"], name="%(class)s_evaluator_application"),
+        ]
 
     @staticmethod
-    def filter_for_evaluator(instances, user, application_round):
+    def filter_for_evaluator(instances, user, application_round, organizations=None):
         """
-        Returns a list of instances (scores / comments) that the user is allowed to see.
+        Returns a list of instances (scores / comments) that the user is allowed to see. organizations is a dict of
+        evaluator id -> organization (see evaluator_organizations) covering the evaluators of the instances; if not
+        given, it is queried.
         """
         if not user:
             return []
@@ -301,19 +579,38 @@ class EvaluationModel(TimestampedModel):
         if not user.organization:
             return [s for s in instances if s.evaluator_id == user.id]
 
-        submitted_organizations = application_round.submitted_organizations.all()
-        submitted = user.organization in submitted_organizations
-        if submitted:
-            return [
-                s for s in instances if s.evaluator.organization and s.evaluator.organization in submitted_organizations
-            ]
-        return [s for s in instances if s.evaluator.organization and s.evaluator.organization == user.organization]
+        if organizations is None:
+            instances = list(instances)
+            organizations = evaluator_organizations({s.evaluator_id for s in instances})
+        if application_round.organization_has_submitted(user.organization):
+            visible = {organization.id for organization in application_round.submitted_organizations.all()}
+        else:
+            visible = {user.organization.id}
+        return [s for s in instances if s.evaluator_id in organizations and organizations[s.evaluator_id].id in visible]
+
+    @classmethod
+    def for_evaluator(cls, user, application_round):
+        """
+        Returns a queryset of the instances (scores / comments) in the application round that the user is allowed to
+        see; the queryset counterpart of filter_for_evaluator.
+        """
+        instances = cls.objects.filter(application__application_round=application_round)
+        return visible_to_evaluator(instances, user, application_round)
 
 
 class Score(EvaluationModel):
     score = models.FloatField(default=0)
     criterion = models.ForeignKey(Criterion, related_name="scores", on_delete=models.CASCADE)
 
+    class Meta(EvaluationModel.Meta):
+        constraints = [
+            # Also covering the scores of the criteria of applications, for scoring without reading the table
+            # (PostgreSQL):
+            models.UniqueConstraint(
+                fields=["application", "criterion", "evaluator"], include=["score"], name="unique_evaluator_score"
+            )
+        ]
+
     def __str__(self):
         return f"Score(score={self.score}, application={self.application_id}, criterion={self.criterion_id})"
 
@@ -323,6 +620,88 @@ class Comment(EvaluationModel):
     criterion_group = models.ForeignKey(CriterionGroup, related_name="comments", on_delete=models.CASCADE)
 
 
+class Tombstone(Model):
+    """
+    Record of a deleted score or comment, so that clients can be told about deletions since their last sync.
+
+    The evaluator is stored as a plain id, for applying the visibility rules after the evaluator may have been deleted.
+    """
+
+    application_round = models.ForeignKey(ApplicationRound, related_name="tombstones", on_delete=models.CASCADE)
+    model = models.CharField(max_length=16, choices=(("score", "Score"), ("comment", "Comment")))
+    object_id = models.IntegerField()
+    application_id = models.IntegerField()
+    evaluator_id = models.IntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["application_round", "model", "deleted_at"])]
+
+    @classmethod
+    def for_evaluator(cls, user, application_round):
+        """
+        Returns the tombstones in the application round of the scores / comments that the user was allowed to see.
+        """
+        return visible_to_evaluator(cls.objects.filter(application_round=application_round), user, application_round)
+
+
+class ApplicationScoreSummary(Model):
+    """
+    Denormalized score totals of an application, maintained by application_evaluator.summaries.
+
+    The row without organization, evaluator and criterion group holds the totals over all scores of the application;
+    the other rows hold the totals over the scores given by one organization or evaluator, and / or for the criteria
+    of one criterion group (including its child groups).
+    """
+
+    application = models.ForeignKey(Application, related_name="score_summaries", on_delete=models.CASCADE)
+    organization = models.ForeignKey(Organization, related_name="+", on_delete=models.CASCADE, null=True)
+    evaluator = models.ForeignKey(User, related_name="+", on_delete=models.CASCADE, null=True)
+    criterion_group = models.ForeignKey(CriterionGroup, related_name="+", on_delete=models.CASCADE, null=True)
+    # Weighted average of the scores, with 0 used for unscored criteria, as in Application.score():
+    score = models.FloatField(default=0)
+    # Sum of the per-criterion average scores multiplied by the criterion weights:
+    weighted_score = models.FloatField(default=0)
+    # Total weight of the scored criteria; weighted_score / weight is the average over scored criteria only:
+    weight = models.FloatField(default=0)
+    score_count = models.IntegerField(default=0)
+    scored_criteria = models.IntegerField(default=0)
+
+    class Meta:
+        indexes = [models.Index(fields=["application", "organization", "evaluator", "criterion_group"])]
+
+
+class ApplicationAccess(Model):
+    """
+    Denormalized record of who may evaluate which applications, maintained by application_evaluator.access.
+
+    Rows without an application give access to all applications of the round, to its evaluators and admin; rows with
+    an application give access to the users of its evaluating organizations.
+    """
+
+    user = models.ForeignKey(User, related_name="+", on_delete=models.CASCADE)
+    application_round = models.ForeignKey(ApplicationRound, related_name="+", on_delete=models.CASCADE)
+    application = models.ForeignKey(Application, related_name="+", on_delete=models.CASCADE, null=True)
+    reason = models.CharField(
+        max_length=16, choices=(("organization", "Organization"), ("evaluator", "Evaluator"), ("admin", "Admin"))
+    )
+
+    class Meta:
+        indexes = [models.Index(fields=["user", "application_round", "application"])]
+
+    @classmethod
+    def to_application(cls, user, application=None, application_round=None):
+        """
+        Returns the access rows allowing the user to evaluate the given application in the given round, by default
+        the application of the outer query.
+        """
+        if application is None:
+            application, application_round = models.OuterRef("pk"), models.OuterRef("application_round")
+        return cls.objects.filter(user=user, application_round=application_round).filter(
+            models.Q(application=None) | models.Q(application=application)
+        )
+
+
 class ApplicationRoundSubmittal(Model):
     application_round = models.ForeignKey(ApplicationRound, related_name="submittals", on_delete=models.CASCADE)
     organization = models.ForeignKey(Organization, related_name="submittals", on_delete=models.CASCADE)
@@ -345,22 +724,22 @@ class BaseApplicationImport(Model):
         ),
         default="pending",
     )
+    # Progress of the import, updated while processing:
+    total_count = models.IntegerField(null=True, blank=True, editable=False, verbose_name="total")
+    processed_count = models.IntegerField(default=0, editable=False, verbose_name="processed")
+    # Imports are processed in the background, see jobs.py:
+    attempts = models.IntegerField(default=0, editable=False)
+    heartbeat_at = models.DateTimeField(null=True, blank=True, editable=False)
+    run_after = models.DateTimeField(null=True, blank=True, editable=False)
 
     class Meta:
         abstract = True
 
-    def save(self, **kwargs):
-        if self.file and (self.status == "pending"):
-            self.status = "processing"
-            super().save(**kwargs)
-            try:
-                self._process()
-            except Exception as e:
-                self.error = str(e)
-                self.status = "error"
-            else:
-                self.status = "done"
-        return super().save()
+    def record_progress(self, processed_count, total_count=None):
+        self.processed_count = processed_count
+        if total_count is not None:
+            self.total_count = total_count
+        type(self).objects.filter(id=self.id).update(processed_count=self.processed_count, total_count=self.total_count)
 
 
 class ApplicationImport(BaseApplicationImport):
@@ -379,46 +758,23 @@ class ApplicationImport(BaseApplicationImport):
             return open(self.file.path, encoding="utf-8-sig")
 
     def _process(self):
-        # Replace two spaces with \n\n, Salesforce CSV export does the opposite:
-        def fix_newlines(s):
-            return s.replace("  ", "\n\n")
+        from application_evaluator import imports  # imports this module, so not imported at the top
 
         with self._open_file() as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                name = row.pop(self.application_name_column)
-                application_id = row.pop("Application ID (18 char)")
-                for column in self.ignore_columns:
-                    row.pop(column, None)
-                if self.application_round:
-                    app_round = self.application_round
-                else:
-                    app_round_name = row.pop(self.application_round_column)
-                    app_round = ApplicationRound.objects.get_or_create(name=app_round_name)[0]
-                description = "\n\n".join([f"#### {k}\n\n{fix_newlines(v)}" for k, v in row.items()])
-                Application.objects.create(
-                    application_round=app_round,
-                    application_id=application_id,
-                    name=name,
-                    description=description,
-                )
+            self.record_progress(self.processed_count, imports.count_rows(f))
+        with self._open_file() as f:
+            imports.import_applications(self, f)
 
 
 class ApplicationAttachmentImport(BaseApplicationImport):
+    def _open_file(self):
+        if self.file.storage.__class__.__name__ == "InMemoryStorage":
+            # The same file object is returned for each open, so give each thread reading the zip a copy:
+            return io.BytesIO(self.file.storage.open(self.file.name, "rb").file.getvalue())
+        else:
+            return self.file.storage.open(self.file.name, "rb")
+
     def _process(self):
-        # Open the zip in self.file and loop through contents:
-        with zipfile.ZipFile(self.file) as zip:
-            for info in zip.infolist():
-                name = info.filename.split("/")[-1].split(".")[0]
-                if info.is_dir() or not name:
-                    continue
-                try:
-                    self.application_round.applications.get(name=name)
-                except Application.DoesNotExist:
-                    raise ValueError(f"Application {name} not found")
-                with zip.open(info.filename) as f:
-                    attachment = ApplicationAttachment.objects.create(
-                        application=self.application_round.applications.get(name=name),
-                        attachment=File(f),
-                    )
-                    attachment.save()
+        from application_evaluator import imports  # imports this module, so not imported at the top
+
+        imports.import_attachments(self, self._open_file)
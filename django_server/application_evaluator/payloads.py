@@ -0,0 +1,119 @@
+"""
+Cache of rendered and compressed application round payloads.
+
+The payloads of a round (the round with its applications, and the pages of its applications) are cached compressed,
+keyed by the round, the visibility class of the user (see models.visibility_class) and the requested format and path.
+Each cached payload is tagged with the generation of its round, which is replaced on every write affecting the round
+(see invalidate_rounds), so that an unchanged round is served with a single cache read.
+
+Payloads are only cached when the default cache is shared between the server processes (see caching.py), as a new
+generation started in one process would not reach the payloads cached by the others in their local memory caches.
+"""
+
+import gzip
+import hashlib
+import uuid
+
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+
+from application_evaluator import caching
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional; gzip is always available
+    brotli = None
+
+PAYLOAD_CACHE_TIMEOUT = 24 * 60 * 60
+
+
+def enabled():
+    """
+    Return whether round payloads are cached, i.e. whether the default cache is shared between the server processes.
+    """
+    return caching.is_shared()
+
+
+def _generation_key(round_id):
+    return f"application_evaluator:round_generation:{round_id}"
+
+
+def payload_key(round_id, visibility_class, media_type, path):
+    """
+    Return the cache key of the payload of the round at the path in the media type, for users of the visibility class.
+    """
+    digest = hashlib.sha1(repr((visibility_class, media_type, path)).encode()).hexdigest()
+    return f"application_evaluator:round_payload:{round_id}:{digest}"
+
+
+def invalidate_rounds(round_ids):
+    """
+    Start a new generation of the cached payloads of the given rounds.
+    """
+    keys = [_generation_key(round_id) for round_id in round_ids]
+
+    def invalidate():
+        cache.set_many({key: uuid.uuid4().hex for key in keys}, None)
+
+    invalidate()
+    # Concurrent requests may cache payloads of the old data until the change is committed:
+    transaction.on_commit(invalidate)
+
+
+def get(round_id, key):
+    """
+    Return the current generation of the round and the payload cached with the key, or None if there is no payload of
+    the current generation.
+    """
+    generation_key = _generation_key(round_id)
+    return _current(generation_key, key, cache.get_many([generation_key, key]))
+
+
+async def aget(round_id, key):
+    """
+    Async version of get.
+    """
+    generation_key = _generation_key(round_id)
+    return _current(generation_key, key, await cache.aget_many([generation_key, key]))
+
+
+def _current(generation_key, key, values):
+    generation = values.get(generation_key)
+    payload = values.get(key)
+    if payload is None or payload["generation"] != generation:
+        return generation, None
+    return generation, payload
+
+
+def store(key, generation, response):
+    """
+    Cache the content of the rendered response, compressed, as a payload of the given generation of its round.
+    """
+    payload = {
+        "generation": generation,
+        "content_type": response["Content-Type"],
+        "etag": response.get("ETag"),
+        "gzip": gzip.compress(response.content),
+    }
+    if brotli is not None:
+        payload["br"] = brotli.compress(response.content)
+    cache.set(key, payload, PAYLOAD_CACHE_TIMEOUT)
+
+
+def response(payload, request):
+    """
+    Return a response with the payload in the best encoding accepted by the client.
+    """
+    accepted = {encoding.split(";")[0].strip() for encoding in request.headers.get("Accept-Encoding", "").split(",")}
+    encoding = next((e for e in ["br", "gzip"] if e in payload and e in accepted), None)
+    if encoding:
+        result = HttpResponse(payload[encoding], content_type=payload["content_type"])
+        result["Content-Encoding"] = encoding
+    else:
+        result = HttpResponse(gzip.decompress(payload["gzip"]), content_type=payload["content_type"])
+    if payload["etag"]:
+        result["ETag"] = payload["etag"]
+    patch_vary_headers(result, ["Accept-Encoding"])
+    return result
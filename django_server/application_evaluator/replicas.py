@@ -0,0 +1,162 @@
+"""
+Routing of read traffic to an optional read replica of the database (see settings.READ_REPLICA_DATABASE).
+
+ReplicaMiddleware marks the safe method requests of the views matching settings.READ_REPLICA_VIEWS, e.g. the REST
+reads of application rounds and applications and the admin changelists; ReplicaRouter sends the reads of those
+requests to the replica. Authentication data and reads within transactions are always read from the primary.
+
+For reading their own writes, users are pinned to the primary for settings.READ_REPLICA_PIN_SECONDS after each unsafe
+method request they make. The pins are kept in the cache, so that they hold across the server processes; the replica is
+only used when the cache is shared between them (see caching.py).
+"""
+
+import contextlib
+import contextvars
+import fnmatch
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.http import FileResponse
+
+from application_evaluator import caching
+from application_evaluator.middleware import view_name
+
+_current_request = contextvars.ContextVar("replica_request", default=None)
+
+# Read from the primary, so that e.g. tokens and sessions of fresh logins are found:
+PRIMARY_APPS = {"auth", "authtoken", "sessions"}
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+def enabled():
+    """
+    Return whether reads are sent to the replica: when there is one, and the pins to the primary are shared by the
+    server processes.
+    """
+    return settings.READ_REPLICA_DATABASE is not None and caching.is_shared()
+
+
+@contextlib.contextmanager
+def primary():
+    """
+    Send the reads within the block to the primary, e.g. those of data to be cached.
+    """
+    token = _current_request.set(None)
+    try:
+        yield
+    finally:
+        _current_request.reset(token)
+
+
+def pin_key(user_id):
+    return f"application_evaluator:replica_pin:{user_id}"
+
+
+def pin_to_primary(user):
+    cache.set(pin_key(user.id), True, settings.READ_REPLICA_PIN_SECONDS)
+
+
+def _pinned(request):
+    user = getattr(request, "user", None)
+    # DRF sets the user of the request when authenticating it, so it is known by the time any data is read:
+    if user is None or not user.is_authenticated:
+        return False
+    if getattr(request, "_replica_pin", (None,))[0] != user.id:
+        request._replica_pin = (user.id, bool(cache.get(pin_key(user.id))))
+    return request._replica_pin[1]
+
+
+class ReplicaRouter:
+    """
+    Database router sending the reads of the requests marked by ReplicaMiddleware to the read replica, and everything
+    else to the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        replica = settings.READ_REPLICA_DATABASE
+        request = _current_request.get()
+        if (
+            replica is None
+            or request is None
+            or not getattr(request, "use_replica", False)
+            or model._meta.app_label in PRIMARY_APPS
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+            or _pinned(request)
+        ):
+            return DEFAULT_DB_ALIAS
+        return replica
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+
+def _in_request(request, iterator):
+    iterator = iter(iterator)
+    while True:
+        token = _current_request.set(request)
+        try:
+            item = next(iterator)
+        except StopIteration:
+            return
+        finally:
+            _current_request.reset(token)
+        yield item
+
+
+class ReplicaMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = _current_request.set(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_request.reset(token)
+        if request.method not in SAFE_METHODS:
+            self.pin(request)
+        return self.finish(request, response)
+
+    async def __acall__(self, request):
+        token = _current_request.set(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_request.reset(token)
+        if request.method not in SAFE_METHODS:
+            await sync_to_async(self.pin)(request)
+        return self.finish(request, response)
+
+    def pin(self, request):
+        user = getattr(request, "user", None)
+        if user is not None and user.is_authenticated:
+            pin_to_primary(user)
+
+    def finish(self, request, response):
+        # Streamed responses, e.g. CSV exports, read the data as they are sent:
+        if (
+            getattr(request, "use_replica", False)
+            and response.streaming
+            and not response.is_async
+            and not isinstance(response, FileResponse)
+        ):
+            response.streaming_content = _in_request(request, response.streaming_content)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.method in SAFE_METHODS and enabled():
+            name = view_name(view_func, request)
+            request.use_replica = any(fnmatch.fnmatchcase(name, pattern) for pattern in settings.READ_REPLICA_VIEWS)
@@ -1,15 +1,131 @@
+import base64
+import bisect
+from collections import Counter
+import datetime
+import functools
+import hashlib
+import json
+
 from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
+from django.db.models import Max
 from django.http import Http404
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.dateparse import parse_datetime
 from django.utils.decorators import method_decorator
+from django.utils.http import quote_etag
 from django.views.decorators.csrf import ensure_csrf_cookie
 from rest_framework import permissions, routers, serializers, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, PermissionDenied, ValidationError
 from rest_framework.generics import get_object_or_404
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from application_evaluator import (
+    counters,
+    events,
+    exports,
+    middleware,
+    models,
+    payloads,
+    replicas,
+    scoring,
+    search,
+    summaries,
+)
+
 
-from application_evaluator import models
+def _query_paths(request, name):
+    value = request.query_params.get(name) if request is not None else None
+    if value is None:
+        return None
+    return {path.strip() for path in value.split(",") if path.strip()}
+
+
+def _join_path(path, name):
+    return f"{path}.{name}" if path else name
 
 
 class ModelSerializer(serializers.ModelSerializer):
+    """
+    Serializer supporting sparse fieldsets and expansion of related objects with the ?fields=, ?omit= and ?expand=
+    query parameters. Each takes comma-separated field names, with the fields of nested serializers given as dotted
+    paths, e.g. ?fields=id,name,scores.score&omit=scores.evaluator. They apply to the responses of reads only.
+
+    Serializers created in SerializerMethodFields are given their path in the response with the path argument.
+    """
+
+    # Related fields given as ids unless expanded with ?expand=, as field name -> serializer class of the expanded field:
+    expandable_fields = {}
+
+    # Lookups to prefetch for the fields, as field name -> (lookup, serializer class of the related objects or None):
+    prefetch_related = {}
+
+    def __init__(self, *args, path=None, **kwargs):
+        self._path = path
+        super().__init__(*args, **kwargs)
+
+    @property
+    def field_path(self):
+        if self._path is not None:
+            return self._path
+        field, parent = self, self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            field, parent = parent, parent.parent
+        if parent is None:
+            return ""
+        return _join_path(parent.field_path if isinstance(parent, ModelSerializer) else "", field.field_name)
+
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get("request")
+        # The fields validating and saving written data are never filtered:
+        if request is None or request.method not in permissions.SAFE_METHODS:
+            return fields
+        prefix = _join_path(self.field_path, "")
+
+        def own_names(paths):
+            return {path[len(prefix) :].split(".")[0] for path in paths if path.startswith(prefix)}
+
+        selected = _query_paths(request, "fields")
+        if selected is not None:
+            names = own_names(selected)
+            # Nested serializers with none of their fields selected keep them all, e.g. with ?fields=id,scores:
+            if names or not prefix:
+                fields = {name: field for name, field in fields.items() if name in names}
+        omitted = _query_paths(request, "omit") or set()
+        fields = {name: field for name, field in fields.items() if prefix + name not in omitted}
+        for name in own_names(_query_paths(request, "expand") or set()):
+            if name in fields and name in self.expandable_fields:
+                fields[name] = self.expandable_fields[name](read_only=True)
+        return fields
+
+    @classmethod
+    def prefetches(cls, context, path="", lookup_prefix=""):
+        """
+        Return the lookups to prefetch for serializing instances at the given path of the response, following the
+        fields selected in the request of the context.
+        """
+        lookups = []
+        for name, field in cls(context=context, path=path).fields.items():
+            if name in cls.prefetch_related:
+                lookup, serializer_class = cls.prefetch_related[name]
+                lookups.append(lookup_prefix + lookup)
+                if serializer_class is not None:
+                    lookups += serializer_class.prefetches(
+                        context, _join_path(path, name), f"{lookup_prefix}{lookup}__"
+                    )
+            elif name in cls.expandable_fields and isinstance(field, serializers.BaseSerializer):
+                lookups.append(lookup_prefix + name)
+        return lookups
+
+    def to_representation(self, instance):
+        with middleware.timed_serialization():
+            return super().to_representation(instance)
+
     def user(self):
         try:
             return self.context["request"].user
@@ -37,7 +153,10 @@ class EvaluatorSerializer(ModelSerializer):
         fields = ["id", "first_name", "last_name", "username", "organization"]
 
     def get_organization(self, user):
-        return user.organization.name if user.organization else None
+        # Serializers of many scores / comments share a map of their evaluators' organizations:
+        organizations = self.context.get("evaluator_organizations")
+        organization = organizations.get(user.id) if organizations is not None else user.organization
+        return organization.name if organization else None
 
 
 class UserSerializer(EvaluatorSerializer):
@@ -47,6 +166,8 @@ class UserSerializer(EvaluatorSerializer):
 
 
 class BaseScoreSerializer(ModelSerializer):
+    expandable_fields = {"evaluator": EvaluatorSerializer}
+
     class Meta:
         model = models.Score
         fields = ["score", "evaluator", "criterion", "application", "id"]
@@ -55,8 +176,12 @@ class BaseScoreSerializer(ModelSerializer):
 class ScoreSerializer(BaseScoreSerializer):
     evaluator = EvaluatorSerializer(read_only=True)
 
+    prefetch_related = {"evaluator": ("evaluator", None)}
+
 
 class BaseCommentSerializer(ModelSerializer):
+    expandable_fields = {"evaluator": EvaluatorSerializer}
+
     class Meta:
         model = models.Comment
         fields = ["comment", "evaluator", "criterion_group", "application", "id", "created_at"]
@@ -65,6 +190,8 @@ class BaseCommentSerializer(ModelSerializer):
 class CommentSerializer(BaseCommentSerializer):
     evaluator = EvaluatorSerializer(read_only=True)
 
+    prefetch_related = {"evaluator": ("evaluator", None)}
+
 
 class AttachmentSerializer(ModelSerializer):
     class Meta:
@@ -78,12 +205,14 @@ class ApplicationSerializer(ModelSerializer):
     evaluating_organizations = serializers.SlugRelatedField(slug_field="name", read_only=True, many=True)
     attachments = AttachmentSerializer(many=True, read_only=True)
 
-    prefetch_related = [
-        "evaluating_organizations",
-        "scores__evaluator__organizations",
-        "comments__evaluator__organizations",
-        "attachments",
-    ]
+    expandable_fields = {"approved_by": EvaluatorSerializer}
+
+    prefetch_related = {
+        "evaluating_organizations": ("evaluating_organizations", None),
+        "scores": ("scores", ScoreSerializer),
+        "comments": ("comments", CommentSerializer),
+        "attachments": ("attachments", None),
+    }
 
     class Meta:
         model = models.Application
@@ -100,12 +229,42 @@ class ApplicationSerializer(ModelSerializer):
             "approved_by",
         ]
 
+    @staticmethod
+    def _evaluator_ids(applications, fields):
+        relations = [name for name in ["scores", "comments"] if name in fields]
+        return {e.evaluator_id for app in applications for name in relations for e in getattr(app, name).all()}
+
+    @classmethod
+    def for_applications(cls, applications, context, path=""):
+        """
+        Return a serializer of the given applications at the given path of the response, with their relations
+        prefetched as given by prefetches(), that looks up the organizations of all their evaluators with a single
+        query.
+        """
+        applications = list(applications)
+        evaluator_ids = cls._evaluator_ids(applications, cls(context=context, path=path).fields)
+        context = {**context, "evaluator_organizations": models.evaluator_organizations(evaluator_ids)}
+        return cls(applications, many=True, context=context, path=path)
+
+    def _evaluation_context(self, application):
+        if "evaluator_organizations" in self.context:
+            return self.context
+        evaluator_ids = self._evaluator_ids([application], self.fields)
+        return {**self.context, "evaluator_organizations": models.evaluator_organizations(evaluator_ids)}
+
     def get_scores(self, application):
-        return ScoreSerializer(application.scores_for_evaluator(self.user()), many=True).data
+        context = self._evaluation_context(application)
+        scores = application.scores_for_evaluator(self.user(), context["evaluator_organizations"])
+        return ScoreSerializer(scores, many=True, context=context, path=_join_path(self.field_path, "scores")).data
 
     def get_comments(self, application, show_all=True):
-        comments = application.comments.all() if show_all else application.comments_for_evaluator(self.user())
-        return CommentSerializer(comments, many=True).data
+        context = self._evaluation_context(application)
+        if show_all:
+            comments = application.comments.all()
+        else:
+            comments = application.comments_for_evaluator(self.user(), context["evaluator_organizations"])
+        path = _join_path(self.field_path, "comments")
+        return CommentSerializer(comments, many=True, context=context, path=path).data
 
 
 class ApplicationRoundAttachmentSerializer(ModelSerializer):
@@ -115,6 +274,8 @@ class ApplicationRoundAttachmentSerializer(ModelSerializer):
 
 
 class ApplicationRoundSerializer(ModelSerializer):
+    expandable_fields = {"admin": EvaluatorSerializer}
+
     applications = serializers.SerializerMethodField()
     criteria = serializers.SerializerMethodField()
     criterion_groups = CriterionGroupSerializer(many=True, read_only=True)
@@ -123,29 +284,135 @@ class ApplicationRoundSerializer(ModelSerializer):
 
     class Meta:
         model = models.ApplicationRound
-        exclude = ["published"]
+        # The counters are for staff and round admins only (see ApplicationRoundViewSet.counts):
+        exclude = ["published", "version", *counters.COUNTER_FIELDS]
 
     def _get_applications(self, application_round):
         user = self.user()
         return application_round.applications_for_evaluator(user)
 
     def get_applications(self, application_round):
+        path = _join_path(self.field_path, "applications")
         applications = (
             self._get_applications(application_round)
-            .prefetch_related(*ApplicationSerializer.prefetch_related)
+            .defer("search_vector")
+            .prefetch_related(*ApplicationSerializer.prefetches(self.context, path))
             .order_by("name")
         )
-        return ApplicationSerializer(applications, many=True, context=self.context).data
+        return ApplicationSerializer.for_applications(applications, self.context, path).data
 
     def _get_criteria(self, application_round):
-        if self.user().is_staff or application_round.organization_has_submitted(self.user().organization):
-            return application_round.criteria.all()
-        else:
-            return application_round.criteria.filter(public=True)
+        return application_round.criteria_for_evaluator(self.user())
 
     def get_criteria(self, application_round):
         criteria = self._get_criteria(application_round)
-        return CriterionSerializer(criteria, many=True, context=self.context).data
+        path = _join_path(self.field_path, "criteria")
+        return CriterionSerializer(criteria, many=True, context=self.context, path=path).data
+
+
+class ApplicationRoundSummarySerializer(ApplicationRoundSerializer):
+    """
+    Application round without its applications, which are paginated separately, but with the evaluation progress
+    and submittal state of the user.
+    """
+
+    applications = None
+    application_count = serializers.SerializerMethodField()
+    scored_application_count = serializers.SerializerMethodField()
+    evaluated_application_count = serializers.SerializerMethodField()
+    submitted = serializers.SerializerMethodField()
+
+    class Meta(ApplicationRoundSerializer.Meta):
+        # Counted from what the user is allowed to see, rather than the counters of the same names:
+        exclude = [
+            name
+            for name in ApplicationRoundSerializer.Meta.exclude
+            if name not in ["application_count", "scored_application_count"]
+        ]
+
+    @classmethod
+    def for_rounds(cls, application_rounds, context):
+        """
+        Return a serializer of the given application rounds that looks up the criteria visible to the user and counts
+        the evaluation progress of all of them with a fixed number of queries.
+        """
+        application_rounds = list(application_rounds)
+        user = context["request"].user
+        criteria = {application_round.id: [] for application_round in application_rounds}
+        if application_rounds:
+            visible = [
+                application_round.criteria_for_evaluator(user).order_by() for application_round in application_rounds
+            ]
+            for criterion in visible[0].union(*visible[1:], all=True).order_by("group_id", "order"):
+                criteria[criterion.application_round_id].append(criterion)
+        context = {
+            **context,
+            "criteria": criteria,
+            "evaluation_progress": models.ApplicationRound.evaluation_progresses(application_rounds, user),
+        }
+        return cls(application_rounds, many=True, context=context)
+
+    def _get_criteria(self, application_round):
+        if "criteria" in self.context:
+            return self.context["criteria"][application_round.id]
+        return super()._get_criteria(application_round)
+
+    def _progress(self, application_round):
+        if "evaluation_progress" in self.context:
+            return self.context["evaluation_progress"][application_round.id]
+        if not hasattr(application_round, "_progress"):
+            application_round._progress = application_round.evaluation_progress(self.user())
+        return application_round._progress
+
+    def get_application_count(self, application_round):
+        return self._progress(application_round)["application_count"]
+
+    def get_scored_application_count(self, application_round):
+        return self._progress(application_round)["scored_application_count"]
+
+    def get_evaluated_application_count(self, application_round):
+        return self._progress(application_round)["evaluated_application_count"]
+
+    def get_submitted(self, application_round):
+        return application_round.organization_has_submitted(self.user().organization)
+
+
+class ApplicationRoundCountsSerializer(ModelSerializer):
+    class Meta:
+        model = models.ApplicationRound
+        fields = ["id", *counters.COUNTER_FIELDS]
+
+
+class ApplicationPagination(PageNumberPagination):
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 500
+
+
+class ApplicationRoundPagination(PageNumberPagination):
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+
+class ApplicationResultSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    name = serializers.CharField()
+    application_id = serializers.CharField()
+    approved = serializers.BooleanField()
+    score = serializers.FloatField()
+    average_score = serializers.FloatField(allow_null=True)
+    scored = serializers.BooleanField()
+    score_count = serializers.IntegerField()
+    passed = serializers.BooleanField()
+    group_scores = serializers.DictField(child=serializers.FloatField())
+    failed_groups = serializers.ListField(child=serializers.IntegerField())
+
+
+class BulkScoreSerializer(serializers.Serializer):
+    application = serializers.IntegerField()
+    criterion = serializers.IntegerField()
+    score = serializers.FloatField()
 
 
 class UnfilteredApplicationRoundSerializer(ApplicationRoundSerializer):
@@ -156,18 +423,369 @@ class UnfilteredApplicationRoundSerializer(ApplicationRoundSerializer):
         return application_round.criteria.all()
 
 
+def _key_type(value):
+    # Numbers of either type compare with each other, as JSON does not tell them apart:
+    return float if isinstance(value, int | float) and not isinstance(value, bool) else type(value)
+
+
+class RankedCursorPagination:
+    """
+    Cursor pagination over an in-memory list of items sorted by a key function.
+
+    The cursor holds the key of the item at the page boundary, so that paging stays consistent when items are
+    reordered between requests.
+    """
+
+    page_size = 50
+    max_page_size = 500
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+
+    def _encode_cursor(self, key, reverse=False):
+        return base64.urlsafe_b64encode(json.dumps([reverse, key]).encode()).decode()
+
+    def _decode_cursor(self, cursor, keys):
+        """
+        Return (reverse, key) of the cursor, checking that the key compares with the given keys of the items.
+        """
+        try:
+            reverse, key = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            key = tuple(key)
+        except (TypeError, ValueError):
+            raise NotFound("Invalid cursor")
+        if keys and [_key_type(k) for k in key] != [_key_type(k) for k in keys[0]]:
+            raise NotFound("Invalid cursor")
+        return bool(reverse), key
+
+    def get_page_size(self, request):
+        try:
+            return max(1, min(int(request.query_params[self.page_size_query_param]), self.max_page_size))
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def paginate(self, request, items, key):
+        items = sorted(items, key=key)
+        keys = [key(item) for item in items]
+        page_size = self.get_page_size(request)
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            reverse, cursor_key = self._decode_cursor(cursor, keys)
+            if reverse:
+                end = bisect.bisect_left(keys, cursor_key)
+                start = max(0, end - page_size)
+            else:
+                start = bisect.bisect_right(keys, cursor_key)
+                end = start + page_size
+        else:
+            start, end = 0, page_size
+
+        url = request.build_absolute_uri()
+        page = items[start:end]
+        return {
+            "count": len(items),
+            "next": replace_query_param(url, self.cursor_query_param, self._encode_cursor(keys[end - 1]))
+            if end < len(items)
+            else None,
+            "previous": replace_query_param(
+                url, self.cursor_query_param, self._encode_cursor(keys[start], reverse=True)
+            )
+            if start > 0
+            else None,
+            "results": page,
+        }
+
+
+# Sync timestamps given to clients are set back by this much, so that changes saved by requests running concurrently
+# with a sync are included in the next one even if they were committed only after it:
+SYNC_OVERLAP = datetime.timedelta(seconds=10)
+
+
+def sync_timestamp():
+    return timezone.now() - SYNC_OVERLAP
+
+
+def parse_since(request):
+    """
+    Return the ?since= timestamp of the request, or None if not given.
+    """
+    since = request.query_params.get("since")
+    if since is None:
+        return None
+    try:
+        parsed = parse_datetime(since)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ValidationError({"since": "Enter a valid ISO 8601 date and time."})
+    return parsed if timezone.is_aware(parsed) else timezone.make_aware(parsed)
+
+
+def evaluation_changes(model, serializer_class, user, application_round, since):
+    """
+    Return the serialized scores / comments in the application round that the user is allowed to see and that have
+    been changed since the given time, and the ids of those deleted since.
+    """
+    changed = (
+        model.for_evaluator(user, application_round)
+        .filter(application__in=application_round.applications_for_evaluator(user), modified_at__gte=since)
+        .prefetch_related("evaluator__organizations")
+        .order_by("id")
+    )
+    deleted = models.Tombstone.for_evaluator(user, application_round).filter(
+        model=model._meta.model_name, deleted_at__gte=since
+    )
+    return serializer_class(changed, many=True).data, list(deleted.values_list("object_id", flat=True))
+
+
+def evaluation_validator_queries(evaluation_filter, tombstone_filter):
+    """
+    Return (queryset, aggregate) pairs of the latest modification times of the scores and comments matching
+    evaluation_filter and of the latest deletion time of those matching tombstone_filter.
+    """
+    return [
+        (models.Score.objects.filter(**evaluation_filter), Max("modified_at")),
+        (models.Comment.objects.filter(**evaluation_filter), Max("modified_at")),
+        (models.Tombstone.objects.filter(**tombstone_filter), Max("deleted_at")),
+    ]
+
+
+def evaluation_validators(queries):
+    return [queryset.aggregate(latest=latest)["latest"] for queryset, latest in queries]
+
+
+def user_etag(user, organization, path, media_type, validators):
+    """
+    Return an ETag for the response at the path in the media type to the user of the organization, given validators
+    that change whenever the response data does.
+    """
+    organization_id = organization.id if organization else None
+    key = repr((user.id, user.is_staff, organization_id, path, media_type, validators))
+    return quote_etag(hashlib.sha1(key.encode()).hexdigest())
+
+
+def make_etag(request, *validators):
+    """
+    Return an ETag for the response to the request, given validators that change whenever the response data does.
+    """
+    media_type = getattr(request, "accepted_media_type", None)
+    return user_etag(request.user, request.user.organization, request.get_full_path(), media_type, validators)
+
+
+def conditional(etag_func):
+    """
+    Decorator for viewset actions answering conditional GET requests with 304 Not Modified when the ETag given by
+    etag_func(viewset, request, *args, **kwargs) matches, without running the action itself.
+    """
+
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            etag = etag_func(self, request, *args, **kwargs)
+            response = get_conditional_response(request, etag=etag)
+            if response is None:
+                response = method(self, request, *args, **kwargs)
+                if response.status_code == 200:
+                    response["ETag"] = etag
+            # Have browsers revalidate the response on each request, in the negotiated format:
+            patch_cache_control(response, private=True, no_cache=True)
+            patch_vary_headers(response, ["Accept"])
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def cached_payload(method):
+    """
+    Decorator for round payload actions, serving the rendered response from the payload cache (see payloads.py) when
+    the round has not changed since it was cached for a user of the same visibility class, if payloads are cached.
+    """
+
+    @functools.wraps(method)
+    def wrapper(self, request, *args, pk=None, **kwargs):
+        if not payloads.enabled():
+            return method(self, request, *args, pk=pk, **kwargs)
+        try:
+            round_id = int(pk)
+        except ValueError:
+            raise Http404
+        key = payloads.payload_key(
+            round_id,
+            models.visibility_class(request.user, round_id),
+            request.accepted_media_type,
+            request.get_full_path(),
+        )
+        generation, payload = payloads.get(round_id, key)
+        if payload is None:
+            # Payloads rendered from a lagging replica would be served until the round next changes:
+            with replicas.primary():
+                response = method(self, request, *args, pk=pk, **kwargs)
+            if response.status_code == 200:
+                response = self.finalize_response(request, response, *args, pk=pk, **kwargs)
+                payloads.store(key, generation, response.render())
+            return response
+        return payload_response(request, payload)
+
+    return wrapper
+
+
+def payload_response(request, payload):
+    """
+    Return 304 Not Modified if the cached payload matches the conditional request, otherwise the payload.
+    """
+    response = get_conditional_response(request, etag=payload["etag"]) or payloads.response(payload, request)
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ["Accept"])
+    return response
+
+
+def round_versions(user, round_id=None):
+    """
+    Return a queryset of the (id, version) of the rounds visible to the user, or only of the given round.
+    """
+    rounds = models.ApplicationRound.rounds_for_evaluator(user)
+    if round_id is not None:
+        rounds = rounds.filter(id=round_id)
+    return rounds.order_by("id").values_list("id", "version")
+
+
+def round_validators(round_ids):
+    return evaluation_validator_queries(
+        {"application__application_round__in": round_ids}, {"application_round__in": round_ids}
+    )
+
+
+def application_versions(application_id):
+    """
+    Return a queryset of the (round id, round version) of the application.
+    """
+    return models.Application.objects.filter(id=application_id).values_list(
+        "application_round_id", "application_round__version"
+    )
+
+
+def application_validators(application_id):
+    return evaluation_validator_queries({"application_id": application_id}, {"application_id": application_id})
+
+
+def _id(pk):
+    try:
+        return None if pk is None else int(pk)
+    except ValueError:
+        raise Http404
+
+
+def application_rounds_etag(viewset, request, *args, pk=None, **kwargs):
+    versions = list(round_versions(request.user, _id(pk)))
+    round_ids = [round_id for round_id, version in versions]
+    return make_etag(request, versions, *evaluation_validators(round_validators(round_ids)))
+
+
+def application_etag(viewset, request, *args, pk=None, **kwargs):
+    application_id = _id(pk)
+    versions = list(application_versions(application_id))
+    return make_etag(request, versions, *evaluation_validators(application_validators(application_id)))
+
+
 @method_decorator(ensure_csrf_cookie, name="dispatch")
 class ApplicationRoundViewSet(viewsets.ReadOnlyModelViewSet):
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = ApplicationRoundSerializer
+    pagination_class = ApplicationRoundPagination
 
     def get_queryset(self):
         return (
             models.ApplicationRound.rounds_for_evaluator(self.request.user)
-            .prefetch_related("criterion_groups", "attachments", "submitted_organizations")
+            .prefetch_related("criterion_groups", "attachments", "submitted_organizations", "evaluators")
             .order_by("name")
         )
 
+    def get_serializer_class(self):
+        if self.action == "list":
+            return ApplicationRoundSummarySerializer
+        return super().get_serializer_class()
+
+    @conditional(application_rounds_etag)
+    def list(self, request, *args, **kwargs):
+        """
+        The application rounds visible to the user, ordered by name and paginated with ?page=<n> and ?page_size=<n>.
+        """
+        page = self.paginate_queryset(self.get_queryset())
+        serializer = ApplicationRoundSummarySerializer.for_rounds(page, self.get_serializer_context())
+        return self.get_paginated_response(serializer.data)
+
+    @cached_payload
+    @conditional(application_rounds_etag)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+    @action(detail=True)
+    @cached_payload
+    @conditional(application_rounds_etag)
+    def applications(self, request, pk=None):
+        """
+        The applications of the round visible to the user, with the scores and comments they are allowed to see,
+        ordered by name and paginated with ?page=<n> and ?page_size=<n>.
+        """
+        instance = self.get_object()
+        timestamp = sync_timestamp()
+        context = self.get_serializer_context()
+        applications = (
+            instance.applications_for_evaluator(request.user)
+            .defer("search_vector")
+            .prefetch_related(*ApplicationSerializer.prefetches(context))
+            .order_by("name", "id")
+        )
+        paginator = ApplicationPagination()
+        page = paginator.paginate_queryset(applications, request, view=self)
+        for application in page:
+            # Share the round with its prefetched submitted organizations, used for filtering the scores:
+            application.application_round = instance
+        serializer = ApplicationSerializer.for_applications(page, context)
+        response = paginator.get_paginated_response(serializer.data)
+        # For requesting the subsequent changes from the changes endpoint:
+        response.data["timestamp"] = timestamp
+        return response
+
+    @action(detail=True)
+    def changes(self, request, pk=None):
+        """
+        The scores and comments in the round that the user is allowed to see and that have been changed since
+        ?since=<ISO 8601 timestamp>, and the ids of those deleted since. Pass the returned timestamp as since in the
+        next request.
+        """
+        instance = self.get_object()
+        since = parse_since(request)
+        if since is None:
+            raise ValidationError({"since": "This parameter is required."})
+        timestamp = sync_timestamp()
+        scores, deleted_scores = evaluation_changes(models.Score, ScoreSerializer, request.user, instance, since)
+        comments, deleted_comments = evaluation_changes(
+            models.Comment, CommentSerializer, request.user, instance, since
+        )
+        return Response(
+            {
+                "timestamp": timestamp,
+                "scores": scores,
+                "comments": comments,
+                "deleted_scores": deleted_scores,
+                "deleted_comments": deleted_comments,
+            }
+        )
+
+    @action(detail=True)
+    def counts(self, request, pk=None):
+        """
+        The numbers of applications, fully scored applications, scores, comments and submittals in the round, for
+        staff and the admin of the round.
+        """
+        instance = self.get_object()
+        if not (request.user.is_staff or instance.admin_id == request.user.id):
+            raise PermissionDenied()
+        return Response(ApplicationRoundCountsSerializer(instance).data)
+
     @action(detail=True, methods=["post"])
     def submit(self, request, pk=None):
         instance = get_object_or_404(models.ApplicationRound.rounds_for_evaluator(self.request.user), id=pk)
@@ -177,6 +795,74 @@ class ApplicationRoundViewSet(viewsets.ReadOnlyModelViewSet):
             raise Http404
         return self.retrieve(request, pk=pk)
 
+    @action(detail=True)
+    @conditional(application_rounds_etag)
+    def results(self, request, pk=None):
+        """
+        Applications of the round ranked by total score, computed from the scores visible to the user. Use
+        ?passed=true / false to only include applications that pass / fail the criterion group thresholds.
+        """
+        instance = self.get_object()
+        applications = instance.applications_for_evaluator(request.user)
+        scores = models.Score.for_evaluator(request.user, instance).filter(
+            criterion__in=instance.criteria_for_evaluator(request.user)
+        )
+        round_scores = scoring.RoundScores.for_round(instance, applications=applications, scores=scores)
+        thresholds = {g.id: g.threshold for g in instance.criterion_groups.all() if g.threshold}
+
+        results = []
+        for app in applications.order_by().values("id", "name", "application_id", "approved"):
+            app_results = round_scores.results(app["id"])
+            group_scores = app_results["group_scores"]
+            app_results["failed_groups"] = [g for g, t in thresholds.items() if group_scores.get(g, t) < t]
+            results.append({**app, **app_results})
+
+        passed = request.query_params.get("passed")
+        if passed in ["true", "false"]:
+            results = [r for r in results if r["passed"] == (passed == "true")]
+
+        page = RankedCursorPagination().paginate(request, results, key=lambda r: (-r["score"], r["name"], r["id"]))
+        page["results"] = ApplicationResultSerializer(page["results"], many=True).data
+        return Response(page)
+
+    def _export(self, request, rows):
+        """
+        Stream the given export as ?file_format=csv (default) or xlsx, for all applications in the round visible to
+        the user or only the one given as ?application=<id>.
+        """
+        instance = self.get_object()
+        applications = instance.applications_for_evaluator(request.user).defer("search_vector")
+        filename = instance.name
+        if request.query_params.get("application"):
+            try:
+                application = get_object_or_404(applications, id=int(request.query_params["application"]))
+            except ValueError:
+                raise Http404
+            applications = applications.filter(id=application.id)
+            filename = application.name
+        return exports.export_response(
+            rows(instance, request.user, applications), filename, request.query_params.get("file_format")
+        )
+
+    @action(detail=True)
+    def export_scores(self, request, pk=None):
+        return self._export(request, exports.score_rows)
+
+    @action(detail=True)
+    def export_summary(self, request, pk=None):
+        """
+        Use ?score_multiplier=<n> to scale the total scores, as in the UI.
+        """
+        try:
+            score_multiplier = float(request.query_params.get("score_multiplier", 1))
+        except ValueError:
+            raise Http404
+
+        def rows(*args):
+            return exports.summary_rows(*args, score_multiplier=score_multiplier)
+
+        return self._export(request, rows)
+
 
 class EvaluationModelViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated]
@@ -187,24 +873,141 @@ class EvaluationModelViewSet(viewsets.ModelViewSet):
         )
         if self.request.user.organization:
             qset = qset.exclude(application__application_round__submitted_organizations=self.request.user.organization)
-        return qset
+        return qset.prefetch_related(*self.get_serializer_class().prefetches(self.get_serializer_context()))
 
-    def create(self, request, *args, **kwargs):
-        qset = models.Application.objects.exclude(application_round__scoring_completed=True)
+    def list(self, request, *args, **kwargs):
+        """
+        With ?since=<ISO 8601 timestamp>&application_round=<id>, list the instances in the round that the user is
+        allowed to see and that have been changed since, and the ids of those deleted since.
+        """
+        since = parse_since(request)
+        if since is None:
+            return super().list(request, *args, **kwargs)
+        try:
+            application_round = get_object_or_404(
+                models.ApplicationRound.rounds_for_evaluator(request.user),
+                id=int(request.query_params.get("application_round", "")),
+            )
+        except ValueError:
+            raise ValidationError({"application_round": "A valid application round id is required with since."})
+        timestamp = sync_timestamp()
+        results, deleted = evaluation_changes(
+            self.queryset.model, self.changes_serializer_class, request.user, application_round, since
+        )
+        return Response({"timestamp": timestamp, "results": results, "deleted": deleted})
+
+    def scorable_applications(self):
+        qset = models.Application.applications_for_evaluator(self.request.user).exclude(
+            application_round__scoring_completed=True
+        )
         if self.request.user.organization:
             qset = qset.exclude(application_round__submitted_organizations=self.request.user.organization)
-        get_object_or_404(qset, id=request.data["application"])
+        return qset
+
+    def create(self, request, *args, **kwargs):
+        get_object_or_404(self.scorable_applications(), id=request.data["application"])
         request.data["evaluator"] = request.user.id
         return super().create(request, *args, **kwargs)
 
 
 class ScoreViewSet(EvaluationModelViewSet):
     serializer_class = BaseScoreSerializer
+    changes_serializer_class = ScoreSerializer
     queryset = models.Score.objects.all()
 
+    def _save_scores(self, items):
+        """
+        Create or update the user's scores from a dict of (application id, criterion id) -> score, returning the keys
+        of the created scores. Raises IntegrityError, having saved none, if some of them were created concurrently.
+        """
+        scores = [
+            models.Score(
+                application_id=application_id, criterion_id=criterion_id, evaluator=self.request.user, score=score
+            )
+            for (application_id, criterion_id), score in items.items()
+        ]
+        with transaction.atomic():
+            # The existing scores are locked, so that they are still there to be updated:
+            existing = set(
+                models.Score.objects.select_for_update()
+                .filter(
+                    evaluator=self.request.user,
+                    application_id__in={application_id for application_id, criterion_id in items},
+                    criterion_id__in={criterion_id for application_id, criterion_id in items},
+                )
+                .values_list("application_id", "criterion_id")
+            )
+            models.Score.objects.bulk_create([s for s in scores if (s.application_id, s.criterion_id) not in existing])
+            models.Score.objects.bulk_create(
+                [s for s in scores if (s.application_id, s.criterion_id) in existing],
+                update_conflicts=True,
+                unique_fields=["application", "criterion", "evaluator"],
+                update_fields=["score", "modified_at"],
+            )
+        return [key for key in items if key not in existing]
+
+    @action(detail=False, methods=["post"])
+    def bulk(self, request):
+        """
+        Create or update the user's scores from a list of {application, criterion, score} items in one transaction,
+        returning the saved scores.
+        """
+        serializer = BulkScoreSerializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        # The last item wins for repeated application / criterion pairs:
+        items = {(item["application"], item["criterion"]): item["score"] for item in serializer.validated_data}
+        application_ids = {application_id for application_id, criterion_id in items}
+        criterion_ids = {criterion_id for application_id, criterion_id in items}
+
+        application_rounds = dict(
+            self.scorable_applications().filter(id__in=application_ids).values_list("id", "application_round_id")
+        )
+        if application_rounds.keys() != application_ids:
+            raise NotFound(f"Applications not found: {sorted(application_ids - application_rounds.keys())}")
+        criterion_rounds = dict(
+            models.Criterion.objects.filter(id__in=criterion_ids).values_list("id", "application_round_id")
+        )
+        invalid = [key for key in items if criterion_rounds.get(key[1]) != application_rounds[key[0]]]
+        if invalid:
+            raise ValidationError(f"Criteria not in the application round: {sorted(invalid)}")
+
+        with transaction.atomic():
+            try:
+                created = self._save_scores(items)
+            except IntegrityError:
+                # The user's other request created some of the scores concurrently, so they are updated instead:
+                created = self._save_scores(items)
+            # Bulk operations do not send the signals that keep the summaries, counters and payload cache up to date:
+            counters.add_scores(
+                Counter(application_rounds[application_id] for application_id, criterion_id in created),
+                {application_id for application_id, criterion_id in created},
+            )
+            summaries.refresh_on_commit(application_ids=application_ids)
+            payloads.invalidate_rounds(set(application_rounds.values()))
+
+        scores = (
+            models.Score.objects.filter(
+                evaluator=request.user, application_id__in=application_ids, criterion_id__in=criterion_ids
+            )
+            .prefetch_related("evaluator__organizations")
+            .order_by("id")
+        )
+        scores = [s for s in scores if (s.application_id, s.criterion_id) in items]
+        data = ScoreSerializer(scores, many=True).data
+        for score in data:
+            events.publish(
+                application_rounds[score["application"]],
+                "score",
+                functools.partial(dict, score),
+                application_id=score["application"],
+                evaluator_id=request.user.id,
+            )
+        return Response(data)
+
 
 class CommentViewSet(EvaluationModelViewSet):
     serializer_class = BaseCommentSerializer
+    changes_serializer_class = CommentSerializer
     queryset = models.Comment.objects.all()
 
 
@@ -213,10 +1016,27 @@ class ApplicationViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = ApplicationSerializer
 
     def get_queryset(self):
-        return models.Application.applications_for_evaluator(self.request.user).prefetch_related(
-            *ApplicationSerializer.prefetch_related
+        return (
+            models.Application.applications_for_evaluator(self.request.user)
+            .defer("search_vector")
+            .prefetch_related(*ApplicationSerializer.prefetches(self.get_serializer_context()))
         )
 
+    def list(self, request, *args, **kwargs):
+        """
+        Use ?q=<search terms> to search the applications by name, description and attachment names, most relevant
+        first.
+        """
+        applications = self.get_queryset()
+        if request.query_params.get("q"):
+            applications = search.search(applications, request.query_params["q"])
+        serializer = ApplicationSerializer.for_applications(applications, self.get_serializer_context())
+        return Response(serializer.data)
+
+    @conditional(application_etag)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
     @action(detail=True, methods=["post"])
     def approve(self, request, pk=None):
         instance = get_object_or_404(models.Application.applications_for_evaluator(self.request.user), id=pk)
@@ -230,8 +1050,20 @@ class ApplicationViewSet(viewsets.ReadOnlyModelViewSet):
         return self.retrieve(request, pk=pk)
 
 
+class RequestMetricsViewSet(viewsets.ViewSet):
+    """
+    Request metrics aggregated per view in the serving process, with times in seconds.
+    """
+
+    permission_classes = [permissions.IsAdminUser]
+
+    def list(self, request):
+        return Response(middleware.view_metrics())
+
+
 router = routers.DefaultRouter()
 router.register("application_rounds", ApplicationRoundViewSet, "application_round")
 router.register("scores", ScoreViewSet, "score")
 router.register("comments", CommentViewSet, "comment")
 router.register("applications", ApplicationViewSet, "application")
+router.register("request_metrics", RequestMetricsViewSet, "request_metrics")
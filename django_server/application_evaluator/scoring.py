@@ -0,0 +1,431 @@
+"""
+Set-based scoring of applications.
+
+The weighted total score of an application is computed in SQL as a correlated subquery, so that a queryset of any
+number of applications can be annotated with their scores and still be fetched in a single query. RoundScores loads
+all scores of an application round at once and computes totals, criterion group scores and breakdowns by
+organization and evaluator for every application using NumPy.
+"""
+
+import math
+
+from django.db import models
+from django.db.models import F
+import numpy as np
+
+from application_evaluator.models import (
+    ApplicationRound,
+    Criterion,
+    Organization,
+    Score,
+    organization_ids,
+)
+
+
+def _tables():
+    return {
+        "round": ApplicationRound._meta.db_table,
+        "criterion": Criterion._meta.db_table,
+        "score": Score._meta.db_table,
+        "org_users": Organization.users.through._meta.db_table,
+    }
+
+
+# Sum of the per-criterion averages of all scores, weighed by criterion weight:
+EVALUATORS_AVERAGE_SQL = """
+    SELECT SUM(criterion_scores.score * criterion_scores.weight) FROM (
+        SELECT AVG(s.score) AS score, MAX(c.weight) AS weight
+        FROM {score} s INNER JOIN {criterion} c ON c.id = s.criterion_id
+        WHERE s.application_id = {application_id}
+        GROUP BY s.criterion_id
+    ) criterion_scores
+"""
+
+# Sum of the per-criterion averages of the per-organization averages, weighed by criterion weight. The organization
+# of an evaluator is the one with the lowest id (see models.organization); scores by evaluators without an
+# organization are not counted.
+ORGANIZATIONS_AVERAGE_SQL = """
+    SELECT SUM(criterion_scores.score * criterion_scores.weight) FROM (
+        SELECT AVG(org_scores.score) AS score, MAX(org_scores.weight) AS weight FROM (
+            SELECT s.criterion_id, AVG(s.score) AS score, MAX(c.weight) AS weight
+            FROM {score} s
+            INNER JOIN {criterion} c ON c.id = s.criterion_id
+            INNER JOIN (
+                SELECT user_id, MIN(organization_id) AS organization_id FROM {org_users} GROUP BY user_id
+            ) evaluator_orgs ON evaluator_orgs.user_id = s.evaluator_id
+            WHERE s.application_id = {application_id}
+            GROUP BY s.criterion_id, evaluator_orgs.organization_id
+        ) org_scores
+        GROUP BY org_scores.criterion_id
+    ) criterion_scores
+"""
+
+TOTAL_WEIGHT_SQL = """
+    SELECT SUM(c.weight) FROM {criterion} c WHERE c.application_round_id = {application_round_id}
+"""
+
+SCORING_MODEL_SQL = """
+    SELECT r.scoring_model FROM {round} r WHERE r.id = {application_round_id}
+"""
+
+
+class _ApplicationSQL(models.Func):
+    """
+    SQL correlated with an application by the {application_id} and {application_round_id} placeholders, which are
+    replaced with the compiled expressions, e.g. F("pk") or OuterRef("pk"), so that they refer to the right table
+    alias also when the query nests, unions or aliases the applications.
+    """
+
+    def __init__(self, sql, params, application_id, application_round_id, **extra):
+        super().__init__(application_id, application_round_id, **extra)
+        self.sql, self.params = sql, params
+
+    def as_sql(self, compiler, connection, **extra_context):
+        (application_id, application_params), (round_id, round_params) = [
+            compiler.compile(expression) for expression in self.get_source_expressions()
+        ]
+        if application_params or round_params:
+            raise ValueError("The application and round of _ApplicationSQL must be column references.")
+        return self.sql.format(application_id=application_id, application_round_id=round_id), self.params
+
+
+def score_expression(application_id=None, application_round_id=None):
+    """
+    Return an expression computing the weighted total score of each application, as Application.score() would.
+
+    The scoring model of the application round of each row is respected, so the expression may be used on querysets
+    spanning several rounds. The applications are referenced by F("pk") and F("application_round") by default, or
+    e.g. OuterRef("pk") and OuterRef("application_round") when annotating another model.
+    """
+    # The application placeholders are left for _ApplicationSQL:
+    tables = {**_tables(), "application_id": "{application_id}", "application_round_id": "{application_round_id}"}
+    scoring_model = SCORING_MODEL_SQL.format(**tables)
+    organizations_average = ORGANIZATIONS_AVERAGE_SQL.format(**tables)
+    evaluators_average = EVALUATORS_AVERAGE_SQL.format(**tables)
+    total_weight = TOTAL_WEIGHT_SQL.format(**tables)
+    sql = (
+        f"COALESCE(CASE WHEN ({scoring_model}) = %s THEN ({organizations_average}) ELSE ({evaluators_average}) END "
+        f"/ NULLIF(({total_weight}), 0), 0)"
+    )
+    return _ApplicationSQL(
+        sql,
+        ["Organizations average"],
+        application_id or F("pk"),
+        application_round_id or F("application_round"),
+        output_field=models.FloatField(),
+    )
+
+
+def annotate_scores(queryset, name="total_score"):
+    """
+    Annotate a queryset of applications with their weighted total scores.
+    """
+    return queryset.annotate(**{name: score_expression()})
+
+
+def round_scores(application_round):
+    """
+    Return a dict of application id -> weighted total score for all applications in the given round.
+    """
+    return dict(annotate_scores(application_round.applications.all()).values_list("id", "total_score"))
+
+
+def _index(ids, values):
+    """
+    Return the positions of the (non-negative integer) values in the array ids, or -1 for values not in it.
+    """
+    lookup = np.full(max(ids.max(initial=0), values.max(initial=0)) + 1, -1)
+    lookup[ids] = np.arange(len(ids))
+    return lookup[values]
+
+
+def _mean(sums, counts):
+    return np.divide(sums, counts, out=np.full(sums.shape, np.nan), where=counts > 0)
+
+
+def _group(keys, size):
+    """
+    Return the distinct values of the (non-negative integer) keys, which are less than size, in order, and the
+    position of each key in them.
+    """
+    if size <= 4 * len(keys):
+        # Counting is cheaper than sorting when the keys are dense:
+        present = np.bincount(keys, minlength=size) > 0
+        return np.flatnonzero(present), (np.cumsum(present) - 1)[keys]
+    return np.unique(keys, return_inverse=True)
+
+
+def _aggregate(columns, sizes, *values):
+    """
+    Sum the values by the distinct combinations of the given (non-negative integer) columns, whose values are less
+    than the given sizes. Return the distinct combinations, as columns sorted by the first one, and the sums of each
+    of the values for them.
+    """
+    keys = np.zeros(len(columns[0]), dtype=np.int64)
+    for column, size in zip(columns, sizes, strict=True):
+        keys = keys * size + column
+    keys, inverse = _group(keys, math.prod(sizes))
+    sums = [np.bincount(inverse, weights=v, minlength=len(keys)) for v in values]
+    combinations = []
+    for size in reversed(sizes[1:]):
+        keys, column = np.divmod(keys, size)
+        combinations.insert(0, column)
+    return [keys, *combinations], sums
+
+
+class _Breakdown:
+    """
+    Scores of applications by organization or evaluator, for the (application, organization / evaluator) pairs with
+    scores only, sorted by application.
+    """
+
+    def __init__(self, application_index, ids, scores, group_scores):
+        self.application_index = application_index
+        self.ids = ids
+        self.scores = scores
+        self.group_scores = group_scores
+
+    def for_application(self, i):
+        """
+        Return (id, score, criterion group scores) for each organization / evaluator of the application at index i.
+        """
+        start, end = np.searchsorted(self.application_index, [i, i + 1])
+        return zip(self.ids[start:end], self.scores[start:end], self.group_scores[start:end], strict=True)
+
+
+class RoundScores:
+    """
+    Scores of all applications in an application round, computed with vectorized operations.
+
+    The scores are aggregated by (application, evaluator, criterion) and then by (application, organization,
+    criterion), keeping only the combinations that have scores, so that memory use grows with the number of scores
+    rather than with the number of applications x evaluators x criteria. Total scores are computed as in
+    Application.score(); average scores, criterion group scores and the breakdowns by organization and by evaluator
+    are computed as in addApplicationScores in the React UI, i.e. as weighted averages over the scored criteria only,
+    averaging the scores of each organization first. Missing values are NaN.
+    """
+
+    def __init__(self, application_ids, criteria, groups, scores, organizations, scoring_model="Evaluators average"):
+        """
+        :param application_ids: ids of the applications to score
+        :param criteria: (criterion id, criterion group id, weight) for each criterion in the round
+        :param groups: (criterion group id, parent id, threshold) for each criterion group in the round
+        :param scores: (application id, criterion id, evaluator id, score) for each score to include
+        :param organizations: dict of evaluator id -> organization id, for evaluators with an organization
+        :param scoring_model: scoring model of the round, used for the total scores
+        """
+        criteria = sorted(criteria)
+        groups = sorted(groups)
+        self.application_ids = np.array(sorted(application_ids), dtype=np.int64)
+        self.criterion_ids = np.array([c[0] for c in criteria], dtype=np.int64)
+        self.weights = np.array([c[2] for c in criteria], dtype=float)
+        self.group_ids = np.array([g[0] for g in groups], dtype=np.int64)
+        self.thresholds = np.array([np.nan if g[2] is None else g[2] for g in groups], dtype=float)
+        self.scoring_model = scoring_model
+
+        # Criterion x group membership, including the criteria of child groups:
+        group_index = {g[0]: i for i, g in enumerate(groups)}
+        parents = {g[0]: g[1] for g in groups}
+        self.group_criteria = np.zeros((len(criteria), len(groups)))
+        for i, criterion in enumerate(criteria):
+            group_id = criterion[1]
+            while group_id in group_index:
+                self.group_criteria[i, group_index[group_id]] = 1
+                group_id = parents[group_id]
+        # Criterion x (total, groups) weights:
+        self.criterion_weights = np.column_stack([self.weights, self.weights[:, None] * self.group_criteria])
+
+        self._load(scores, organizations)
+        self._compute()
+
+    def _load(self, scores, organizations):
+        """
+        Set the evaluators and organizations of the scores and their sums and counts by application, evaluator and
+        criterion, skipping the scores of other applications and criteria.
+        """
+        scores = np.asarray(scores, dtype=float).reshape(-1, 4)
+        ids = scores[:, :3].astype(np.int64)
+        app_index = _index(self.application_ids, ids[:, 0])
+        criterion_index = _index(self.criterion_ids, ids[:, 1])
+        found = (app_index >= 0) & (criterion_index >= 0)
+        if not found.all():
+            scores, ids, app_index, criterion_index = (
+                scores[found],
+                ids[found],
+                app_index[found],
+                criterion_index[found],
+            )
+
+        evaluators = np.zeros(ids[:, 2].max(initial=0) + 1, dtype=bool)
+        evaluators[ids[:, 2]] = True
+        self.evaluator_ids = np.flatnonzero(evaluators)
+        evaluator_index = _index(self.evaluator_ids, ids[:, 2])
+        self.organization_ids = np.array(
+            sorted({organizations[e] for e in self.evaluator_ids.tolist() if e in organizations}), dtype=np.int64
+        )
+        # Organization index of each evaluator; the last one collects the evaluators without an organization:
+        org_index = {org_id: i for i, org_id in enumerate(self.organization_ids.tolist())}
+        self.evaluator_organizations = np.array(
+            [org_index.get(organizations.get(e), len(org_index)) for e in self.evaluator_ids.tolist()], dtype=np.int64
+        )
+
+        self.cells, (self.sums, self.counts) = _aggregate(
+            [app_index, evaluator_index, criterion_index],
+            [len(self.application_ids), len(self.evaluator_ids), len(self.criterion_ids)],
+            scores[:, 3],
+            np.ones(len(scores)),
+        )
+
+    @classmethod
+    def for_round(cls, application_round, applications=None, scores=None):
+        """
+        Load the scores of the given application round, optionally limited to the given application and score
+        querysets.
+        """
+        if applications is None:
+            applications = application_round.applications.all()
+        if scores is None:
+            scores = Score.objects.all()
+        scores = scores.filter(application__application_round=application_round).values_list(
+            "application_id", "criterion_id", "evaluator_id", "score"
+        )
+        scores = np.array(list(scores), dtype=float).reshape(-1, 4)
+        return cls(
+            application_ids=applications.values_list("id", flat=True),
+            criteria=application_round.criteria.values_list("id", "group_id", "weight"),
+            groups=application_round.criterion_groups.values_list("id", "parent_id", "threshold"),
+            scores=scores,
+            organizations=organization_ids(np.unique(scores[:, 2]).astype(int).tolist()),
+            scoring_model=application_round.scoring_model,
+        )
+
+    def _weighted_averages(self, rows, row_count, criteria, means):
+        """
+        Return the weighted averages over the scored criteria of the mean scores of row_count rows, in total (rows)
+        and for each criterion group (rows x groups), given the row, criterion index and mean score of each scored
+        (row, criterion) pair.
+        """
+        averages = np.empty((row_count, self.criterion_weights.shape[1]))
+        for j, column in enumerate(self.criterion_weights.T):
+            weights = column[criteria]
+            averages[:, j] = _mean(
+                np.bincount(rows, weights=weights * means, minlength=row_count),
+                np.bincount(rows, weights=weights, minlength=row_count),
+            )
+        return averages[:, 0], averages[:, 1:]
+
+    def _totals(self, applications, criteria, means):
+        """
+        Return the total scores as in Application.score(), i.e. weighted over all criteria with 0 for the unscored
+        ones, given the application and criterion index and mean score of each scored (application, criterion) pair.
+        """
+        total_weight = self.weights.sum()
+        if not total_weight:
+            return np.zeros(len(self.application_ids))
+        weighted = np.bincount(
+            applications, weights=self.weights[criteria] * means, minlength=len(self.application_ids)
+        )
+        return weighted / total_weight
+
+    def _compute(self):
+        app_count, criterion_count = len(self.application_ids), len(self.criterion_ids)
+        cell_apps, cell_evaluators, cell_criteria = self.cells
+        self.score_counts = np.bincount(cell_apps, weights=self.counts, minlength=app_count).astype(int)
+
+        # Application x criterion:
+        (apps, criteria), (sums, counts) = _aggregate(
+            [cell_apps, cell_criteria], [app_count, criterion_count], self.sums, self.counts
+        )
+        scored_criteria = np.bincount(apps, minlength=app_count)
+        self.scored = (scored_criteria == criterion_count) & (self.score_counts > 0)
+
+        # Application x organization x criterion, the last organization being the one of evaluators without one:
+        organization_count = len(self.organization_ids) + 1
+        (org_apps, orgs, org_criteria), (org_sums, org_counts) = _aggregate(
+            [cell_apps, self.evaluator_organizations[cell_evaluators], cell_criteria],
+            [app_count, organization_count, criterion_count],
+            self.sums,
+            self.counts,
+        )
+        org_means = org_sums / org_counts
+
+        # Total scores as in Application.score(), with 0 for unscored criteria:
+        if self.scoring_model == "Organizations average":
+            with_org = orgs < organization_count - 1
+            (apps, criteria), (mean_sums, org_numbers) = _aggregate(
+                [org_apps[with_org], org_criteria[with_org]],
+                [app_count, criterion_count],
+                org_means[with_org],
+                np.ones(with_org.sum()),
+            )
+            self.totals = self._totals(apps, criteria, mean_sums / org_numbers)
+        else:
+            self.totals = self._totals(apps, criteria, sums / counts)
+
+        # Averages as in the React UI, averaging over organizations including a group for those without one:
+        (apps, criteria), (mean_sums, org_numbers) = _aggregate(
+            [org_apps, org_criteria], [app_count, criterion_count], org_means, np.ones(len(org_means))
+        )
+        self.average_scores, self.group_scores = self._weighted_averages(
+            apps, app_count, criteria, mean_sums / org_numbers
+        )
+
+        # Breakdowns by organization and by evaluator:
+        self.organization_scores = self._breakdown(
+            org_apps, orgs, org_criteria, org_means, organization_count, [*self.organization_ids.tolist(), None]
+        )
+        self.evaluator_scores = self._breakdown(
+            cell_apps,
+            cell_evaluators,
+            cell_criteria,
+            self.sums / self.counts,
+            len(self.evaluator_ids),
+            self.evaluator_ids.tolist(),
+        )
+
+        # Applications pass unless they score below the threshold in a scored criterion group:
+        with np.errstate(invalid="ignore"):
+            self.passed = ~(self.group_scores < self.thresholds).any(1)
+
+    def _breakdown(self, apps, keys, criteria, means, key_count, ids):
+        """
+        Return the weighted averages of the mean scores of each (application, key, criterion) as a _Breakdown by the
+        given ids of the keys.
+        """
+        pairs, inverse = _group(apps * key_count + keys, len(self.application_ids) * key_count)
+        scores, group_scores = self._weighted_averages(inverse, len(pairs), criteria, means)
+        pair_apps, pair_keys = np.divmod(pairs, key_count)
+        return _Breakdown(pair_apps, [ids[k] for k in pair_keys.tolist()], scores, group_scores)
+
+    def application_index(self, application_id):
+        return int(np.searchsorted(self.application_ids, application_id))
+
+    def results(self, application_id):
+        """
+        Return the scores of one application as a dict, with None for missing values.
+        """
+        i = self.application_index(application_id)
+
+        def value(x):
+            return None if np.isnan(x) else float(x)
+
+        def group_scores(scores):
+            return {int(g): value(s) for g, s in zip(self.group_ids, scores, strict=True) if not np.isnan(s)}
+
+        def breakdown(scores):
+            return {
+                key: {"score": value(score), "group_scores": group_scores(group)}
+                for key, score, group in scores.for_application(i)
+                if not np.isnan(score)
+            }
+
+        return {
+            "score": float(self.totals[i]),
+            "average_score": value(self.average_scores[i]),
+            "scored": bool(self.scored[i]),
+            "score_count": int(self.score_counts[i]),
+            "passed": bool(self.passed[i]),
+            "group_scores": group_scores(self.group_scores[i]),
+            "scores_by_organization": breakdown(self.organization_scores),
+            "scores_by_evaluator": breakdown(self.evaluator_scores),
+        }
@@ -0,0 +1,59 @@
+"""
+Full-text search over applications, by their name, description and attachment names.
+
+On PostgreSQL the applications are searched by Application.search_vector, kept up to date by update_search_vectors
+when applications and their attachments are saved (see signals.py), and ranked by relevance. On other databases, e.g.
+SQLite in tests, they are filtered by substring matches of the search terms instead.
+"""
+
+from django.conf import settings
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connection
+from django.db.models import Exists, F, OuterRef, Q, Subquery
+
+from application_evaluator.models import Application, ApplicationAttachment
+
+
+def _postgresql():
+    return connection.vendor == "postgresql"
+
+
+def update_search_vectors(application_ids):
+    """
+    Recompute the search vectors of the given applications.
+    """
+    if not _postgresql():
+        return
+    attachment_names = (
+        ApplicationAttachment.objects.filter(application=OuterRef("pk"))
+        .values("application")
+        .annotate(names=StringAgg("name", " "))
+        .values("names")
+    )
+    config = settings.SEARCH_CONFIG
+    Application.objects.filter(id__in=application_ids).update(
+        search_vector=SearchVector("name", weight="A", config=config)
+        + SearchVector("description", weight="B", config=config)
+        + SearchVector(Subquery(attachment_names), weight="C", config=config)
+    )
+
+
+def search(applications, q):
+    """
+    Return the applications of the queryset matching the search query q, most relevant first.
+    """
+    if _postgresql():
+        query = SearchQuery(q, search_type="websearch", config=settings.SEARCH_CONFIG)
+        return (
+            applications.filter(search_vector=query)
+            .annotate(rank=SearchRank(F("search_vector"), query))
+            .order_by("-rank", "name")
+        )
+
+    for term in q.split():
+        attachments = ApplicationAttachment.objects.filter(application=OuterRef("pk"), name__icontains=term)
+        applications = applications.filter(
+            Q(name__icontains=term) | Q(description__icontains=term) | Exists(attachments)
+        )
+    return applications.order_by("name")
@@ -0,0 +1,342 @@
+"""
+Signal receivers keeping denormalized data up to date.
+"""
+
+from functools import partial
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from application_evaluator import access, counters, events, jobs, models, payloads, rest, search, summaries
+
+
+def _application_round_id(instance, origin=None):
+    """
+    Return the application round id of a score or comment, looking it up once per application for all those deleted
+    together and not at all when deleted along with an application or criterion (group) of the round.
+    """
+    if isinstance(origin, models.Application | models.Criterion | models.CriterionGroup):
+        return origin.application_round_id
+    if origin is None or origin is instance or type(instance).application.is_cached(instance):
+        return instance.application.application_round_id
+    round_ids = vars(origin).setdefault("_application_round_ids", {})
+    if instance.application_id not in round_ids:
+        round_ids[instance.application_id] = instance.application.application_round_id
+    return round_ids[instance.application_id]
+
+
+@receiver(post_save, sender=models.Score)
+@receiver(post_delete, sender=models.Score)
+def score_changed(sender, instance, **kwargs):
+    summaries.refresh_on_commit(application_ids=[instance.application_id])
+
+
+@receiver(post_save, sender=models.Score)
+@receiver(post_delete, sender=models.Score)
+@receiver(post_save, sender=models.Comment)
+@receiver(post_delete, sender=models.Comment)
+def evaluation_changed(sender, instance, origin=None, **kwargs):
+    if isinstance(origin, models.ApplicationRound) or getattr(origin, "model", None) is models.ApplicationRound:
+        return
+    payloads.invalidate_rounds([_application_round_id(instance, origin)])
+
+
+@receiver(post_save, sender=models.Score)
+@receiver(post_save, sender=models.Comment)
+def evaluation_saved_event(sender, instance, **kwargs):
+    serializer_class = rest.ScoreSerializer if sender is models.Score else rest.CommentSerializer
+    events.publish(
+        _application_round_id(instance),
+        sender._meta.model_name,
+        lambda: serializer_class(instance).data,
+        application_id=instance.application_id,
+        evaluator_id=instance.evaluator_id,
+    )
+
+
+@receiver(post_delete, sender=models.Score)
+@receiver(post_delete, sender=models.Comment)
+def evaluation_deleted_event(sender, instance, origin=None, **kwargs):
+    if isinstance(origin, models.ApplicationRound) or getattr(origin, "model", None) is models.ApplicationRound:
+        return
+    events.publish(
+        _application_round_id(instance, origin),
+        f"{sender._meta.model_name}_deleted",
+        lambda: {"id": instance.id},
+        application_id=instance.application_id,
+        evaluator_id=instance.evaluator_id,
+    )
+
+
+@receiver(post_delete, sender=models.Score)
+@receiver(post_delete, sender=models.Comment)
+def evaluation_deleted(sender, instance, origin=None, **kwargs):
+    if isinstance(origin, models.ApplicationRound) or getattr(origin, "model", None) is models.ApplicationRound:
+        # The tombstones would be deleted along with the round:
+        return
+    models.Tombstone.objects.create(
+        application_round_id=_application_round_id(instance, origin),
+        model=sender._meta.model_name,
+        object_id=instance.id,
+        application_id=instance.application_id,
+        evaluator_id=instance.evaluator_id,
+    )
+
+
+@receiver(post_save, sender=models.Criterion)
+@receiver(post_delete, sender=models.Criterion)
+@receiver(post_save, sender=models.CriterionGroup)
+@receiver(post_delete, sender=models.CriterionGroup)
+def criteria_changed(sender, instance, **kwargs):
+    models.ApplicationRound.increment_versions([instance.application_round_id])
+    summaries.refresh_on_commit(round_ids=[instance.application_round_id])
+
+
+@receiver(post_save, sender=models.Application)
+@receiver(post_delete, sender=models.Application)
+@receiver(post_save, sender=models.ApplicationRoundSubmittal)
+@receiver(post_delete, sender=models.ApplicationRoundSubmittal)
+@receiver(post_save, sender=models.ApplicationRoundAttachment)
+@receiver(post_delete, sender=models.ApplicationRoundAttachment)
+def application_round_content_changed(sender, instance, **kwargs):
+    models.ApplicationRound.increment_versions([instance.application_round_id])
+
+
+@receiver(pre_save, sender=models.Application)
+def application_saving(sender, instance, **kwargs):
+    previous = None
+    if instance.pk is not None:
+        previous = getattr(instance, "loaded_values", {})
+        # Applications not loaded from the database, or loaded without all the tracked fields, are looked up:
+        if previous.keys() != set(sender.tracked_fields):
+            previous = sender.objects.filter(pk=instance.pk).values(*sender.tracked_fields).first()
+    instance._approval_changed = bool(previous) and (previous["approved"], previous["approved_by_id"]) != (
+        instance.approved,
+        instance.approved_by_id,
+    )
+    instance._previous_round_id = previous and previous["application_round_id"]
+
+
+@receiver(post_save, sender=models.Application)
+def application_saved(sender, instance, created, **kwargs):
+    instance.loaded_values = {name: getattr(instance, name) for name in sender.tracked_fields}
+    # The application may have been moved to another round:
+    if not created:
+        access.refresh_application_access([instance.id])
+        if instance._previous_round_id and instance._previous_round_id != instance.application_round_id:
+            counters.refresh_rounds([instance._previous_round_id, instance.application_round_id])
+    if instance._approval_changed:
+        data = {"id": instance.id, "approved": instance.approved, "approved_by": instance.approved_by_id}
+        events.publish(instance.application_round_id, "approval", lambda: data, application_id=instance.id)
+
+
+@receiver(post_save, sender=models.ApplicationRoundSubmittal)
+def submittal_saved(sender, instance, created, **kwargs):
+    if created:
+        events.publish(instance.application_round_id, "submittal", lambda: {"organization": instance.organization.name})
+
+
+@receiver(post_save, sender=models.ApplicationAttachment)
+@receiver(post_delete, sender=models.ApplicationAttachment)
+def application_attachment_changed(sender, instance, **kwargs):
+    models.ApplicationRound.increment_versions(
+        models.Application.objects.filter(id=instance.application_id).values("application_round_id")
+    )
+
+
+@receiver(m2m_changed, sender=models.Application.evaluating_organizations.through)
+def evaluating_organizations_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ["post_add", "post_remove", "post_clear"]:
+        return
+    if reverse:
+        # Cleared applications are not known after the fact, so increment the versions of all rounds:
+        applications = models.Application.objects.filter(id__in=pk_set) if pk_set else models.Application.objects
+        models.ApplicationRound.increment_versions(applications.values("application_round_id"))
+        access.refresh_application_access(user_ids=list(instance.users.values_list("id", flat=True)))
+    else:
+        models.ApplicationRound.increment_versions([instance.application_round_id])
+        access.refresh_application_access([instance.id])
+
+
+@receiver(m2m_changed, sender=models.ApplicationRound.evaluators.through)
+def application_round_evaluators_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ["post_add", "post_remove", "post_clear"]:
+        return
+    if reverse:
+        models.ApplicationRound.increment_versions(pk_set if pk_set else models.ApplicationRound.objects.values("id"))
+        access.refresh_round_access(user_ids=[instance.id])
+    else:
+        models.ApplicationRound.increment_versions([instance.id])
+        access.refresh_round_access([instance.id])
+
+
+def _evaluated_rounds(user_ids):
+    return models.Application.objects.filter(
+        Q(scores__evaluator__in=user_ids) | Q(comments__evaluator__in=user_ids)
+    ).values("application_round_id")
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, update_fields=None, **kwargs):
+    # The names of the evaluators are shown with their scores and comments:
+    if not created and update_fields != frozenset(["last_login"]):
+        models.ApplicationRound.increment_versions(_evaluated_rounds([instance.id]))
+
+
+@receiver(post_save, sender=models.Organization)
+def organization_saved(sender, instance, created, **kwargs):
+    # Organization names are shown with the scores in all rounds:
+    if not created:
+        models.ApplicationRound.increment_versions(models.ApplicationRound.objects.values("id"))
+        models.forget_organizations(instance.users.values_list("id", flat=True))
+
+
+@receiver(pre_delete, sender=models.Organization)
+def organization_deleting(sender, instance, **kwargs):
+    instance._user_ids = list(instance.users.values_list("id", flat=True))
+    models.forget_organizations(instance._user_ids)
+
+
+@receiver(post_delete, sender=models.Organization)
+def organization_deleted(sender, instance, **kwargs):
+    access.refresh_application_access(user_ids=instance._user_ids)
+
+
+@receiver(pre_save, sender=models.ApplicationRound)
+def application_round_saving(sender, instance, **kwargs):
+    instance._scoring_model_changed = (
+        instance.pk is not None
+        and models.ApplicationRound.objects.filter(pk=instance.pk)
+        .exclude(scoring_model=instance.scoring_model)
+        .exists()
+    )
+
+
+@receiver(post_save, sender=models.ApplicationRound)
+def application_round_saved(sender, instance, **kwargs):
+    models.ApplicationRound.increment_versions([instance.id])
+    instance.refresh_from_db(fields=["version"])
+    access.refresh_round_access([instance.id])
+    if instance._scoring_model_changed:
+        summaries.refresh_on_commit(round_ids=[instance.id])
+
+
+@receiver(m2m_changed, sender=models.Organization.users.through)
+def organization_users_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ["post_add", "post_remove", "pre_clear"]:
+        return
+    if action == "pre_clear":
+        # The cleared users are not known after the fact:
+        user_ids = [instance.id] if reverse else list(instance.users.values_list("id", flat=True))
+    else:
+        user_ids = list(pk_set) if not reverse else [instance.id]
+    models.forget_organizations(user_ids)
+    application_ids = list(
+        models.Score.objects.filter(evaluator_id__in=user_ids).values_list("application_id", flat=True).distinct()
+    )
+    summaries.refresh_on_commit(application_ids=application_ids)
+    # The organizations of the evaluators are shown with their scores and comments:
+    models.ApplicationRound.increment_versions(_evaluated_rounds(user_ids))
+
+
+@receiver(m2m_changed, sender=models.Organization.users.through)
+def organization_users_access_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == "pre_clear":
+        # The cleared users are not known after the fact:
+        instance._cleared_user_ids = [instance.id] if reverse else list(instance.users.values_list("id", flat=True))
+    elif action == "post_clear":
+        access.refresh_application_access(user_ids=instance._cleared_user_ids)
+    elif action in ["post_add", "post_remove"]:
+        access.refresh_application_access(user_ids=[instance.id] if reverse else list(pk_set))
+
+
+@receiver(post_save, sender=models.Application)
+def application_search_changed(sender, instance, **kwargs):
+    search.update_search_vectors([instance.id])
+
+
+@receiver(post_save, sender=models.ApplicationAttachment)
+@receiver(post_delete, sender=models.ApplicationAttachment)
+def attachment_search_changed(sender, instance, **kwargs):
+    search.update_search_vectors([instance.application_id])
+
+
+def _deleted_with(origin, model):
+    # Whether a deletion cascades from deleting instances of the model:
+    return isinstance(origin, model) or getattr(origin, "model", None) is model
+
+
+@receiver(post_save, sender=models.Application)
+def application_counted(sender, instance, created, **kwargs):
+    if created:
+        counters.add(instance.application_round_id, application_count=1)
+
+
+@receiver(pre_delete, sender=models.Application)
+def application_uncounted(sender, instance, origin=None, **kwargs):
+    if _deleted_with(origin, models.ApplicationRound):
+        return
+    # Counted before the scores and comments are deleted along with the application, which are then not counted:
+    current = models.Application.objects.filter(id=instance.id).values("application_round_id", "fully_scored").first()
+    if current:
+        counters.add(
+            current["application_round_id"],
+            application_count=-1,
+            score_count=-instance.scores.count(),
+            comment_count=-instance.comments.count(),
+            scored_application_count=-int(current["fully_scored"]),
+        )
+
+
+@receiver(post_save, sender=models.Score)
+@receiver(post_delete, sender=models.Score)
+def score_counted(sender, instance, signal, created=False, origin=None, **kwargs):
+    if signal is post_save and not created:
+        return
+    # Counted along with the deleted application or round:
+    if _deleted_with(origin, models.Application) or _deleted_with(origin, models.ApplicationRound):
+        return
+    counters.add_scores({_application_round_id(instance, origin): 1 if created else -1}, [instance.application_id])
+
+
+@receiver(post_save, sender=models.Comment)
+@receiver(post_delete, sender=models.Comment)
+def comment_counted(sender, instance, signal, created=False, origin=None, **kwargs):
+    if signal is post_save and not created:
+        return
+    # Counted along with the deleted application or round:
+    if _deleted_with(origin, models.Application) or _deleted_with(origin, models.ApplicationRound):
+        return
+    counters.add(_application_round_id(instance, origin), comment_count=1 if created else -1)
+
+
+@receiver(post_save, sender=models.ApplicationRoundSubmittal)
+@receiver(post_delete, sender=models.ApplicationRoundSubmittal)
+def submittal_counted(sender, instance, signal, created=False, origin=None, **kwargs):
+    if (signal is post_save and not created) or _deleted_with(origin, models.ApplicationRound):
+        return
+    counters.add(instance.application_round_id, submittal_count=1 if created else -1)
+
+
+@receiver(post_save, sender=models.Criterion)
+@receiver(post_delete, sender=models.Criterion)
+def criteria_counted(sender, instance, signal, created=False, origin=None, **kwargs):
+    if (signal is post_save and not created) or _deleted_with(origin, models.ApplicationRound):
+        return
+    # Applications become fully scored or not as criteria are added or deleted:
+    counters.refresh_scored_applications(
+        models.Application.objects.filter(application_round_id=instance.application_round_id).values_list(
+            "id", flat=True
+        )
+    )
+
+
+@receiver(post_save, sender=models.ApplicationImport)
+@receiver(post_save, sender=models.ApplicationAttachmentImport)
+def import_created(sender, instance, created, **kwargs):
+    if created and settings.RUN_IMPORTS_IN_REQUEST:
+        transaction.on_commit(partial(jobs.run_now, sender, instance.id))
@@ -0,0 +1,233 @@
+"""
+Maintenance of the denormalized ApplicationScoreSummary table.
+
+Summaries are recomputed per application whenever its scores change (see signals.py), so that reading the scores of
+any number of applications is a plain indexed lookup.
+"""
+
+from collections import defaultdict
+from itertools import islice
+
+from django.db import connection, transaction
+from django.db.models import FloatField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from application_evaluator.models import (
+    Application,
+    ApplicationScoreSummary,
+    Criterion,
+    CriterionGroup,
+    Score,
+    organization_ids,
+)
+
+BATCH_SIZE = 500
+
+SUMMARY_FIELDS = ["score", "weighted_score", "weight", "score_count", "scored_criteria"]
+
+
+def _mean(values):
+    return sum(values) / len(values)
+
+
+def _criterion_score(scores, by_organization, organizations):
+    """
+    Return the average of the given (evaluator id, score) pairs for one criterion, or None if none of them count.
+    """
+    if not by_organization:
+        return _mean([score for evaluator_id, score in scores])
+    org_scores = defaultdict(list)
+    for evaluator_id, score in scores:
+        if evaluator_id in organizations:
+            org_scores[organizations[evaluator_id]].append(score)
+    return _mean([_mean(s) for s in org_scores.values()]) if org_scores else None
+
+
+def _summarize(scores, weights, by_organization, organizations):
+    """
+    Return the summary values of the given (criterion id, evaluator id, score) tuples for the criteria in weights.
+    """
+    criterion_scores = defaultdict(list)
+    for criterion_id, evaluator_id, score in scores:
+        if criterion_id in weights:
+            criterion_scores[criterion_id].append((evaluator_id, score))
+
+    values = dict.fromkeys(SUMMARY_FIELDS, 0)
+    for criterion_id, c_scores in criterion_scores.items():
+        values["score_count"] += len(c_scores)
+        score = _criterion_score(c_scores, by_organization, organizations)
+        if score is not None:
+            values["weighted_score"] += score * weights[criterion_id]
+            values["weight"] += weights[criterion_id]
+            values["scored_criteria"] += 1
+    total_weight = sum(weights.values())
+    values["score"] = values["weighted_score"] / total_weight if total_weight else 0
+    return values
+
+
+def _group_weights(groups, criteria):
+    """
+    Return a dict of criterion group id -> {criterion id: weight} for the criteria in each group and its child groups.
+    """
+    weights = {group_id: {} for group_id in groups}
+    for criterion_id, (group_id, weight) in criteria.items():
+        while group_id is not None:
+            weights[group_id][criterion_id] = weight
+            group_id = groups[group_id]
+    return weights
+
+
+def compute_summaries(application_ids):
+    """
+    Return unsaved ApplicationScoreSummary instances for the given applications, computed from their current scores.
+    """
+    applications = list(
+        Application.objects.filter(id__in=application_ids).values_list(
+            "id", "application_round_id", "application_round__scoring_model"
+        )
+    )
+    round_ids = {round_id for app_id, round_id, scoring_model in applications}
+
+    criteria = defaultdict(dict)
+    for criterion_id, round_id, group_id, weight in Criterion.objects.filter(
+        application_round_id__in=round_ids
+    ).values_list("id", "application_round_id", "group_id", "weight"):
+        criteria[round_id][criterion_id] = (group_id, weight)
+
+    groups = defaultdict(dict)
+    for group_id, round_id, parent_id in CriterionGroup.objects.filter(application_round_id__in=round_ids).values_list(
+        "id", "application_round_id", "parent_id"
+    ):
+        groups[round_id][group_id] = parent_id
+
+    scores = defaultdict(list)
+    for app_id, criterion_id, evaluator_id, score in Score.objects.filter(
+        application_id__in=application_ids
+    ).values_list("application_id", "criterion_id", "evaluator_id", "score"):
+        scores[app_id].append((criterion_id, evaluator_id, score))
+
+    organizations = organization_ids({evaluator_id for s in scores.values() for c, evaluator_id, score in s})
+
+    summaries = []
+    for app_id, round_id, scoring_model in applications:
+        app_scores = scores[app_id]
+        if not app_scores:
+            continue
+        scopes = [(None, {c: weight for c, (group, weight) in criteria[round_id].items()})]
+        scopes += _group_weights(groups[round_id], criteria[round_id]).items()
+
+        subsets = [(None, None, app_scores, scoring_model == "Organizations average")]
+        for org_id in sorted({organizations[e] for c, e, s in app_scores if e in organizations}):
+            org_scores = [s for s in app_scores if organizations.get(s[1]) == org_id]
+            subsets.append((org_id, None, org_scores, False))
+        for evaluator_id in sorted({e for c, e, s in app_scores}):
+            subsets.append((None, evaluator_id, [s for s in app_scores if s[1] == evaluator_id], False))
+
+        for org_id, evaluator_id, subset, by_organization in subsets:
+            for group_id, weights in scopes:
+                values = _summarize(subset, weights, by_organization, organizations)
+                if values["score_count"]:
+                    summaries.append(
+                        ApplicationScoreSummary(
+                            application_id=app_id,
+                            organization_id=org_id,
+                            evaluator_id=evaluator_id,
+                            criterion_group_id=group_id,
+                            **values,
+                        )
+                    )
+    return summaries
+
+
+def refresh_applications(application_ids):
+    """
+    Recompute the score summaries of the given applications.
+    """
+    application_ids = list(application_ids)
+    with transaction.atomic():
+        # Lock the applications so that concurrent refreshes of the same application do not interleave:
+        list(Application.objects.select_for_update().filter(id__in=application_ids).values_list("id"))
+        summaries = compute_summaries(application_ids)
+        ApplicationScoreSummary.objects.filter(application_id__in=application_ids).delete()
+        ApplicationScoreSummary.objects.bulk_create(summaries)
+
+
+def refresh_rounds(round_ids):
+    """
+    Recompute the score summaries of all applications in the given application rounds.
+    """
+    for batch in _batches(Application.objects.filter(application_round_id__in=round_ids)):
+        refresh_applications(batch)
+
+
+def refresh_on_commit(application_ids=(), round_ids=()):
+    """
+    Recompute the score summaries of the given applications and of all applications in the given rounds when the
+    current transaction commits. The ids given in the same transaction, e.g. by the signals of the scores deleted
+    together or the criteria saved together, are refreshed together, once.
+    """
+    pending = getattr(connection, "_pending_summaries", None)
+    if pending is None:
+        pending = connection._pending_summaries = {"applications": set(), "rounds": set()}
+    pending["applications"].update(application_ids)
+    pending["rounds"].update(round_ids)
+    # Each call schedules the refresh, so that ids are not lost when the callbacks of a rolled back savepoint are
+    # discarded; the first callback refreshes all pending ids and the rest find none:
+    transaction.on_commit(_refresh_pending)
+
+
+def _refresh_pending():
+    pending = getattr(connection, "_pending_summaries", None)
+    if not pending or not (pending["applications"] or pending["rounds"]):
+        return
+    connection._pending_summaries = None
+    refresh_rounds(pending["rounds"])
+    applications = Application.objects.filter(id__in=pending["applications"]).exclude(
+        application_round_id__in=pending["rounds"]
+    )
+    for batch in _batches(applications):
+        refresh_applications(batch)
+
+
+def _batches(applications):
+    ids = applications.order_by("id").values_list("id", flat=True).iterator()
+    while batch := list(islice(ids, BATCH_SIZE)):
+        yield batch
+
+
+def _summary_key(summary):
+    return (summary.application_id, summary.organization_id, summary.evaluator_id, summary.criterion_group_id)
+
+
+def _summary_values(summary):
+    return tuple(round(getattr(summary, field), 9) for field in SUMMARY_FIELDS)
+
+
+def find_drift(applications=None):
+    """
+    Return the ids of those of the given applications (default: all) whose stored summaries differ from those
+    computed from their current scores.
+    """
+    if applications is None:
+        applications = Application.objects.all()
+    drifted = set()
+    for batch in _batches(applications):
+        expected = {_summary_key(s): _summary_values(s) for s in compute_summaries(batch)}
+        stored = {
+            _summary_key(s): _summary_values(s)
+            for s in ApplicationScoreSummary.objects.filter(application_id__in=batch)
+        }
+        for key in expected.keys() | stored.keys():
+            if expected.get(key) != stored.get(key):
+                drifted.add(key[0])
+    return sorted(drifted)
+
+
+def annotate_scores(queryset, name="total_score"):
+    """
+    Annotate a queryset of applications with their weighted total scores, as stored in the summary table.
+    """
+    totals = ApplicationScoreSummary.objects.filter(
+        application=OuterRef("pk"), organization=None, evaluator=None, criterion_group=None
+    ).values("score")[:1]
+    return queryset.annotate(**{name: Coalesce(Subquery(totals, output_field=FloatField()), 0.0)})
@@ -1,3 +1,5 @@
 from .test_auth import *
 from .test_models import *
+from .test_query_plans import *
+from .test_replicas import *
 from .test_rest import *
@@ -1,9 +1,18 @@
 """Pytest configuration and fixtures for application_evaluator tests."""
 
 from django.contrib.auth.models import User
+from django.core.cache import cache
 import pytest
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Start each test with an empty cache, as database ids are reused between tests."""
+    cache.clear()
+    yield
+    cache.clear()
+
+
 @pytest.fixture
 def user(db):
     """Create a test user."""
@@ -1,9 +1,23 @@
+from datetime import timedelta
+from io import BytesIO, StringIO
+import time
+from unittest import mock
+import zipfile
+
+from django.conf import settings
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
 from django.core.files.base import ContentFile
-from django.test import TestCase
+from django.core.files.storage import default_storage
+from django.core.management import CommandError, call_command
+from django.db import DatabaseError, connection
+from django.db.models import OuterRef, Subquery
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
 
-from application_evaluator import models
+from application_evaluator import caching, counters, events, jobs, models, payloads, scoring, summaries
 
 
 class ModelTests(TestCase):
@@ -46,6 +60,458 @@ class ModelTests(TestCase):
         # Then the scores for each separate criterion is averaged before the total weighed average is computed
         self.assertEqual(app.score(), (2 * 3.5 + 5) / 3)
 
+    def test_annotated_application_scores(self):
+        app_round = models.ApplicationRound.objects.create(name="AI4Cities")
+        criterion1 = app_round.criteria.create(name="Goodness", weight=1)
+        criterion2 = app_round.criteria.create(name="Awesomeness", weight=2)
+        app_round.criteria.create(name="Unscored", weight=1)
+        evaluator1 = User.objects.create(username="evaluator1")
+        evaluator2 = User.objects.create(username="evaluator2")
+        evaluator3 = User.objects.create(username="evaluator3")
+        org1 = evaluator1.organizations.create(name="Org")
+        org1.users.add(evaluator2)
+        evaluator3.organizations.create(name="Org2")
+
+        # Given applications with scores by several evaluators from different organizations
+        apps = [app_round.applications.create(name=f"App {i}") for i in range(3)]
+        apps[0].scores.create(criterion=criterion1, evaluator=evaluator1, score=5)
+        apps[0].scores.create(criterion=criterion1, evaluator=evaluator2, score=3)
+        apps[0].scores.create(criterion=criterion1, evaluator=evaluator3, score=1)
+        apps[0].scores.create(criterion=criterion2, evaluator=evaluator3, score=4)
+        apps[1].scores.create(criterion=criterion2, evaluator=evaluator2, score=2)
+
+        for scoring_model in ["Evaluators average", "Organizations average"]:
+            app_round.scoring_model = scoring_model
+            app_round.save()
+
+            # When the applications are annotated with their scores
+            with self.assertNumQueries(1):
+                scores = scoring.round_scores(app_round)
+
+            # Then the scores equal those computed for each application separately
+            for app in apps:
+                app = models.Application.objects.get(id=app.id)
+                self.assertAlmostEqual(scores[app.id], app.score())
+
+        # And the organizations average is computed over the per-organization averages
+        self.assertAlmostEqual(scores[apps[0].id], ((4 + 1) / 2 * 1 + 4 * 2) / 4)
+
+        # And the scores are also computed for applications in subqueries, where their table is aliased
+        applications = models.Application.objects.filter(application_round=OuterRef("pk"))
+        best = scoring.annotate_scores(applications).order_by("-total_score").values("name")[:1]
+        rounds = models.ApplicationRound.objects.annotate(best=Subquery(best))
+        self.assertEqual(rounds.get(id=app_round.id).best, "App 0")
+
+    def test_score_summaries(self):
+        app_round = models.ApplicationRound.objects.create(name="AI4Cities", scoring_model="Organizations average")
+        group = app_round.criterion_groups.create(name="Impact")
+        child_group = app_round.criterion_groups.create(name="Climate", parent=group)
+        criterion1 = app_round.criteria.create(name="Goodness", weight=1, group=child_group)
+        criterion2 = app_round.criteria.create(name="Awesomeness", weight=2)
+        app = app_round.applications.create(name="SkyNet")
+        evaluator1 = User.objects.create(username="evaluator1")
+        evaluator2 = User.objects.create(username="evaluator2")
+        org = evaluator1.organizations.create(name="Org")
+        evaluator2.organizations.create(name="Org2")
+
+        # Given scores created by several evaluators
+        with self.captureOnCommitCallbacks(execute=True):
+            app.scores.create(criterion=criterion1, evaluator=evaluator1, score=5)
+            app.scores.create(criterion=criterion2, evaluator=evaluator1, score=2)
+            score = app.scores.create(criterion=criterion1, evaluator=evaluator2, score=1)
+
+        # Then the total summary equals the application score
+        def summary(**kwargs):
+            return app.score_summaries.get(
+                **{"organization": None, "evaluator": None, "criterion_group": None, **kwargs}
+            )
+
+        self.assertAlmostEqual(summary().score, app.score())
+        self.assertEqual(summary().score_count, 3)
+
+        # And the summaries per criterion group include the criteria of child groups
+        self.assertAlmostEqual(summary(criterion_group=group).score, 3)
+
+        # And the summaries per organization and evaluator only include their scores
+        self.assertAlmostEqual(summary(organization=org).score, (5 + 2 * 2) / 3)
+        self.assertAlmostEqual(summary(evaluator=evaluator2).weighted_score / summary(evaluator=evaluator2).weight, 1)
+        self.assertAlmostEqual(summary(evaluator=evaluator2, criterion_group=child_group).score, 1)
+
+        # And when scores are changed or deleted, the summaries are updated
+        with self.captureOnCommitCallbacks(execute=True):
+            score.delete()
+        self.assertAlmostEqual(summary().score, (5 + 2 * 2) / 3)
+        self.assertFalse(app.score_summaries.filter(evaluator=evaluator2).exists())
+
+        # And when criteria are saved and scores deleted together, the summaries are refreshed once for all of them
+        with self.captureOnCommitCallbacks() as callbacks:
+            criterion1.save()
+            criterion2.save()
+            app.scores.create(criterion=criterion2, evaluator=evaluator2, score=4)
+            app.scores.filter(evaluator=evaluator1).delete()
+        refreshes = [callback for callback in callbacks if callback is summaries._refresh_pending]
+        self.assertEqual(len(refreshes), 5)
+        refreshes[0]()
+        with self.assertNumQueries(0):
+            for refresh in refreshes[1:]:
+                refresh()
+        self.assertAlmostEqual(summary().score, 4 * 2 / 3)
+
+        # And summaries that have drifted from the scores are detected and fixed by the rebuild command
+        models.ApplicationScoreSummary.objects.filter(evaluator=None, organization=None).update(score=0)
+        self.assertEqual(summaries.find_drift(), [app.id])
+        with self.assertRaises(CommandError):
+            call_command("rebuild_score_summaries", "--check", stdout=StringIO())
+        call_command("rebuild_score_summaries", stdout=StringIO())
+        self.assertEqual(summaries.find_drift(), [])
+
+    def test_round_counters(self):
+        app_round = models.ApplicationRound.objects.create(name="AI4Cities")
+        other_round = models.ApplicationRound.objects.create(name="Smart Mobility")
+        group = app_round.criterion_groups.create(name="Impact")
+        criterion1 = app_round.criteria.create(name="Goodness", weight=1, group=group)
+        criterion2 = app_round.criteria.create(name="Awesomeness", weight=1, group=group)
+        evaluator = User.objects.create(username="evaluator")
+        organization = evaluator.organizations.create(name="Helsinki")
+
+        def counts(application_round=app_round):
+            application_round.refresh_from_db()
+            return [getattr(application_round, name) for name in counters.COUNTER_FIELDS]
+
+        # When applications, scores, comments and submittals are created
+        app1, app2, app3 = [app_round.applications.create(name=name) for name in ["SkyNet", "HAL", "Marvin"]]
+        app1.scores.create(criterion=criterion1, evaluator=evaluator, score=5)
+        app1.scores.create(criterion=criterion2, evaluator=evaluator, score=2)
+        score = app2.scores.create(criterion=criterion1, evaluator=evaluator, score=1)
+        app1.comments.create(criterion_group=group, evaluator=evaluator, comment="Good")
+        app_round.submittals.create(organization=organization, user=evaluator)
+
+        # Then the counters of the round follow: applications, scores, comments, submittals, fully scored applications
+        self.assertEqual(counts(), [3, 3, 1, 1, 1])
+
+        # And they follow bulk operations and deletions
+        models.Score.objects.bulk_create(
+            [models.Score(application=app, criterion=criterion2, evaluator=evaluator, score=3) for app in [app2, app3]]
+        )
+        counters.add_scores({app_round.id: 2}, [app2.id, app3.id])
+        self.assertEqual(counts(), [3, 5, 1, 1, 2])
+        score.delete()
+        self.assertEqual(counts(), [3, 4, 1, 1, 1])
+        app1.delete()
+        self.assertEqual(counts(), [2, 2, 0, 1, 0])
+        criterion1.delete()
+        self.assertEqual(counts(), [2, 2, 0, 1, 2])
+
+        # And applications moved to another round are counted there
+        app3.application_round = other_round
+        app3.save()
+        self.assertEqual(counts(), [1, 1, 0, 1, 1])
+        self.assertEqual(counts(other_round), [1, 1, 0, 0, 0])
+        self.assertEqual(counters.find_drift(models.ApplicationRound.objects.all()), [])
+
+        # And counters that have drifted are detected and fixed by the reconcile command
+        models.ApplicationRound.objects.filter(id=app_round.id).update(score_count=10)
+        with self.assertRaises(CommandError):
+            call_command("reconcile_round_counters", "--check", stdout=StringIO())
+        call_command("reconcile_round_counters", stdout=StringIO())
+        self.assertEqual(counts(), [1, 1, 0, 1, 1])
+
+    def test_initialize_scores(self):
+        # Given an application round with two applications, one of them scored for one of the two criteria
+        admin = User.objects.create(username="admin", is_staff=True, is_superuser=True)
+        evaluator = User.objects.create(username="evaluator")
+        app_round = models.ApplicationRound.objects.create(name="AI4Cities")
+        criteria = [app_round.criteria.create(name=name, weight=1) for name in ["Goodness", "Awesomeness"]]
+        skynet, hal = [app_round.applications.create(name=name) for name in ["SkyNet", "HAL"]]
+        skynet.scores.create(criterion=criteria[0], evaluator=evaluator, score=4)
+
+        # When an admin initializes the scores of the criteria
+        self.client.force_login(admin)
+        url = reverse("admin:application_evaluator_criterion_changelist")
+        data = {"action": "initialize_scores", "_selected_action": [criterion.id for criterion in criteria]}
+        with (
+            mock.patch.object(events, "publish") as publish,
+            mock.patch.object(payloads, "invalidate_rounds", wraps=payloads.invalidate_rounds) as invalidate,
+            self.captureOnCommitCallbacks(execute=True),
+        ):
+            response = self.client.post(url, data)
+
+        # Then scores of 0 by the admin are created for the applications not yet scored for each criterion
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(
+            sorted(models.Score.objects.filter(evaluator=admin).values_list("application__name", "criterion__name")),
+            [("HAL", "Awesomeness"), ("HAL", "Goodness"), ("SkyNet", "Awesomeness")],
+        )
+        self.assertEqual(set(models.Score.objects.filter(evaluator=admin).values_list("score", flat=True)), {0})
+
+        # And the round counters and score summaries follow
+        app_round.refresh_from_db()
+        self.assertEqual((app_round.score_count, app_round.scored_application_count), (4, 2))
+        self.assertEqual(counters.find_drift(models.ApplicationRound.objects.all()), [])
+        self.assertEqual(summaries.find_drift(), [])
+
+        # And the cached payloads of the round are invalidated and a score event published for each created score
+        self.assertEqual([list(call.args[0]) for call in invalidate.call_args_list], [[app_round.id]])
+        self.assertEqual(
+            sorted((call.args[:2], call.kwargs["application_id"]) for call in publish.call_args_list),
+            sorted([((app_round.id, "score"), hal.id)] * 2 + [((app_round.id, "score"), skynet.id)]),
+        )
+        self.assertEqual(publish.call_args_list[0].args[2]()["evaluator"]["username"], "admin")
+
+    def test_round_scores(self):
+        app_round = models.ApplicationRound.objects.create(name="AI4Cities")
+        group = app_round.criterion_groups.create(name="Impact", threshold=3)
+        child_group = app_round.criterion_groups.create(name="Climate", parent=group)
+        criterion1 = app_round.criteria.create(name="Goodness", weight=1, group=child_group)
+        criterion2 = app_round.criteria.create(name="Awesomeness", weight=2, group=group)
+        criterion3 = app_round.criteria.create(name="Wellness", weight=1)
+        evaluator1 = User.objects.create(username="evaluator1")
+        evaluator2 = User.objects.create(username="evaluator2")
+        evaluator3 = User.objects.create(username="evaluator3")
+        org1 = evaluator1.organizations.create(name="Org")
+        org1.users.add(evaluator2)
+        org2 = evaluator3.organizations.create(name="Org2")
+
+        # Given applications with scores by several evaluators from different organizations
+        app1, app2, app3 = [app_round.applications.create(name=f"App {i}") for i in range(3)]
+        app1.scores.create(criterion=criterion1, evaluator=evaluator1, score=5)
+        app1.scores.create(criterion=criterion1, evaluator=evaluator2, score=3)
+        app1.scores.create(criterion=criterion1, evaluator=evaluator3, score=1)
+        app1.scores.create(criterion=criterion2, evaluator=evaluator3, score=2)
+        app1.scores.create(criterion=criterion3, evaluator=evaluator1, score=4)
+        app2.scores.create(criterion=criterion3, evaluator=evaluator2, score=2)
+
+        for scoring_model in ["Evaluators average", "Organizations average"]:
+            app_round.scoring_model = scoring_model
+            app_round.save()
+
+            # When the scores of the round are computed
+            round_scores = scoring.RoundScores.for_round(app_round)
+
+            # Then the total scores equal those computed for each application separately
+            for app in [app1, app2, app3]:
+                app = models.Application.objects.get(id=app.id)
+                self.assertAlmostEqual(round_scores.results(app.id)["score"], app.score())
+
+        # And the averages, group scores and breakdowns equal those computed in the UI
+        results = round_scores.results(app1.id)
+        self.assertAlmostEqual(results["average_score"], ((4 + 1) / 2 * 1 + 2 * 2 + 4 * 1) / 4)
+        self.assertAlmostEqual(results["group_scores"][group.id], ((4 + 1) / 2 * 1 + 2 * 2) / 3)
+        self.assertAlmostEqual(results["group_scores"][child_group.id], (4 + 1) / 2)
+        self.assertFalse(results["passed"])
+        self.assertTrue(results["scored"])
+        self.assertAlmostEqual(results["scores_by_organization"][org1.id]["score"], (4 * 1 + 4 * 1) / 2)
+        self.assertAlmostEqual(results["scores_by_organization"][org2.id]["group_scores"][group.id], 5 / 3)
+        self.assertAlmostEqual(results["scores_by_evaluator"][evaluator2.id]["score"], 3)
+        self.assertEqual(round_scores.results(app2.id)["group_scores"], {})
+        self.assertTrue(round_scores.results(app2.id)["passed"])
+        self.assertEqual(round_scores.results(app3.id)["score_count"], 0)
+
+    def test_round_scores_queries(self):
+        # Given a round of 20 applications with 6 criteria in 2 groups, scored on every criterion by 5 evaluators of
+        # 2 organizations and one evaluator without an organization
+        app_round = models.ApplicationRound.objects.create(name="AI4Cities")
+        groups = [app_round.criterion_groups.create(name=f"Group {g}", threshold=2) for g in range(2)]
+        criteria = [app_round.criteria.create(name=f"Criterion {c}", weight=1, group=groups[c % 2]) for c in range(6)]
+        evaluators = [User.objects.create(username=f"evaluator{e}") for e in range(6)]
+        organizations = [models.Organization.objects.create(name=f"Org {o}") for o in range(2)]
+        for i, evaluator in enumerate(evaluators[:5]):
+            organizations[i % 2].users.add(evaluator)
+        apps = models.Application.objects.bulk_create(
+            [models.Application(application_round=app_round, name=f"App {i}") for i in range(20)]
+        )
+        models.Score.objects.bulk_create(
+            [
+                models.Score(application=app, criterion=criterion, evaluator=evaluator, score=(i + j) % 6)
+                for i, app in enumerate(apps)
+                for j, criterion in enumerate(criteria)
+                for evaluator in evaluators
+            ]
+        )
+
+        # When the scores of the round are computed
+        # Then the applications, criteria, criterion groups, scores and organizations are each loaded in one query
+        with self.assertNumQueries(5):
+            round_scores = scoring.RoundScores.for_round(app_round)
+
+        # And every application has its group scores and a breakdown by each organization and evaluator
+        self.assertEqual(round_scores.group_scores.shape, (len(apps), len(groups)))
+        for app in apps:
+            results = round_scores.results(app.id)
+            self.assertTrue(results["scored"])
+            self.assertEqual(results["score_count"], len(criteria) * len(evaluators))
+            self.assertEqual(results["group_scores"].keys(), {g.id for g in groups})
+            self.assertEqual(results["scores_by_organization"].keys(), {*[o.id for o in organizations], None})
+            self.assertEqual(results["scores_by_evaluator"].keys(), {e.id for e in evaluators})
+
+        # And a round without scores is computed without any
+        models.Score.objects.all().delete()
+        results = scoring.RoundScores.for_round(app_round).results(apps[0].id)
+        self.assertEqual((results["score"], results["average_score"], results["scored"]), (0, None, False))
+
+    def test_deleted_evaluation_tombstones(self):
+        # Given scores by two evaluators for two criteria of three applications
+        app_round = models.ApplicationRound.objects.create(name="AI4Cities")
+        criteria = [app_round.criteria.create(name=f"Criterion {c}", weight=1) for c in range(2)]
+        evaluators = [User.objects.create(username=f"evaluator{e}") for e in range(2)]
+        apps = [app_round.applications.create(name=f"App {i}") for i in range(3)]
+        for app in apps:
+            for criterion in criteria:
+                for evaluator in evaluators:
+                    models.Score.objects.create(application=app, criterion=criterion, evaluator=evaluator)
+
+        def application_lookups(queries):
+            lookup = 'FROM "application_evaluator_application" WHERE "application_evaluator_application"."id" = '
+            return len([q for q in queries.captured_queries if lookup in q["sql"]])
+
+        # When a criterion is deleted along with its scores
+        with CaptureQueriesContext(connection) as queries:
+            criteria[0].delete()
+
+        # Then tombstones are recorded in the round of the scores, without looking their applications up
+        self.assertEqual(models.Tombstone.objects.filter(application_round=app_round).count(), 6)
+        self.assertEqual(application_lookups(queries), 0)
+
+        # And when the scores of an evaluator are deleted, each application is looked up once
+        with CaptureQueriesContext(connection) as queries:
+            models.Score.objects.filter(evaluator=evaluators[0]).delete()
+        self.assertEqual(models.Tombstone.objects.filter(application_round=app_round).count(), 9)
+        self.assertEqual(application_lookups(queries), len(apps))
+
+    def test_cached_user_organization(self):
+        # Given a user of an organization whose organization has been looked up
+        user = User.objects.create(username="evaluator")
+        helsinki = models.Organization.objects.create(name="Helsinki")
+        helsinki.users.add(user)
+        self.assertEqual(User.objects.get(id=user.id).organization, helsinki)
+
+        # When looking the organization up again in another request
+        # Then no queries are made
+        with self.assertNumQueries(0):
+            self.assertEqual(models.evaluator_organizations([user.id]), {user.id: helsinki})
+
+        # And the cache is invalidated when the organization is renamed or the memberships of the user change
+        helsinki.name = "Helsingin kaupunki"
+        helsinki.save()
+        self.assertEqual(User.objects.get(id=user.id).organization.name, "Helsingin kaupunki")
+        espoo = models.Organization.objects.create(name="Espoo")
+        helsinki.users.remove(user)
+        espoo.users.add(user)
+        self.assertEqual(User.objects.get(id=user.id).organization, espoo)
+        user.organizations.clear()
+        self.assertIsNone(User.objects.get(id=user.id).organization)
+        user.organizations.add(espoo)
+        espoo.delete()
+        self.assertIsNone(User.objects.get(id=user.id).organization)
+
+    def test_cached_user_organization_expiry(self):
+        # Given a user whose organization has been looked up, in a cache local to the process
+        user = User.objects.create(username="evaluator")
+        helsinki = models.Organization.objects.create(name="Helsinki")
+        espoo = models.Organization.objects.create(name="Espoo")
+        helsinki.users.add(user)
+        self.assertEqual(models.evaluator_organizations([user.id]), {user.id: helsinki})
+        self.assertFalse(caching.is_shared())
+
+        # When the memberships of the user are changed in another process, without invalidating this cache
+        models.Organization.users.through.objects.filter(user=user).update(organization=espoo)
+
+        # Then the organization is looked up again once the local timeout has passed
+        self.assertEqual(models.evaluator_organizations([user.id]), {user.id: helsinki})
+        later = time.time() + caching.LOCAL_TIMEOUT + 1
+        with mock.patch("django.core.cache.backends.locmem.time.time", return_value=later):
+            self.assertEqual(models.evaluator_organizations([user.id]), {user.id: espoo})
+
+        # And a shared cache keeps the entries for the full timeout
+        with mock.patch.object(caching, "is_shared", return_value=True):
+            self.assertEqual(caching.timeout(models.ORGANIZATION_CACHE_TIMEOUT), models.ORGANIZATION_CACHE_TIMEOUT)
+        self.assertEqual(caching.timeout(None), caching.LOCAL_TIMEOUT)
+
+    def test_application_access(self):
+        # Given users, organizations and application rounds
+        users = [User.objects.create(username=f"user{i}") for i in range(4)]
+        helsinki = models.Organization.objects.create(name="Helsinki")
+        espoo = models.Organization.objects.create(name="Espoo")
+        round1 = models.ApplicationRound.objects.create(name="AI4Cities", published=True)
+        round2 = models.ApplicationRound.objects.create(name="Smart Mobility", published=True, admin=users[3])
+        app1 = round1.applications.create(name="SkyNet")
+        app2 = round1.applications.create(name="HAL")
+
+        def visible():
+            return [
+                (
+                    {r.name for r in models.ApplicationRound.rounds_for_evaluator(user)},
+                    {a.name for a in models.Application.applications_for_evaluator(user)},
+                )
+                for user in users
+            ]
+
+        # When the memberships, evaluating organizations, evaluators and admins change
+        # Then the applications visible to the users follow
+        helsinki.users.add(users[0], users[1])
+        app1.evaluating_organizations.add(helsinki)
+        espoo.applications_to_evaluate.add(app2)
+        round1.evaluators.add(users[2])
+        self.assertEqual(
+            visible(),
+            [
+                ({"AI4Cities"}, {"SkyNet"}),
+                ({"AI4Cities"}, {"SkyNet"}),
+                ({"AI4Cities"}, {"SkyNet", "HAL"}),
+                ({"Smart Mobility"}, set()),
+            ],
+        )
+        self.assertTrue(app1.can_be_evaluated_by(users[0]))
+        self.assertFalse(app2.can_be_evaluated_by(users[0]))
+
+        users[1].organizations.clear()
+        espoo.users.add(users[0])
+        users[2].evaluated_application_rounds.clear()
+        round2.admin = users[2]
+        round2.save()
+        app3 = round2.applications.create(name="Marvin")
+        self.assertEqual(
+            visible(),
+            [
+                ({"AI4Cities"}, {"SkyNet", "HAL"}),
+                (set(), set()),
+                ({"Smart Mobility"}, {"Marvin"}),
+                (set(), set()),
+            ],
+        )
+
+        app2.application_round = round2
+        app2.save()
+        app1.evaluating_organizations.clear()
+        espoo.delete()
+        self.assertEqual(
+            visible(), [(set(), set()), (set(), set()), ({"Smart Mobility"}, {"Marvin", "HAL"}), (set(), set())]
+        )
+        self.assertEqual(app3.application_round.applications_for_evaluator(users[2]).count(), 2)
+
+    def test_application_approval_events(self):
+        # Given an application loaded from the database twice
+        user = User.objects.create(username="admin")
+        app_round = models.ApplicationRound.objects.create(name="AI4Cities")
+        app_id = app_round.applications.create(name="SkyNet").id
+        app, other_app = models.Application.objects.get(id=app_id), models.Application.objects.get(id=app_id)
+
+        # When it is approved
+        with mock.patch.object(events, "publish") as publish, CaptureQueriesContext(connection) as queries:
+            app.approve_by_user(user)
+
+        # Then an approval event is published, without looking the application up again
+        self.assertEqual(publish.call_args.args[:2], (app_round.id, "approval"))
+        approval_lookups = [q for q in queries if '"application_evaluator_application"."approved"' in q["sql"]]
+        self.assertEqual(approval_lookups, [])
+
+        # And saving the application again, or the other instance refreshed from the database, publishes nothing
+        other_app.refresh_from_db()
+        with mock.patch.object(events, "publish") as publish:
+            app.save()
+            other_app.save()
+        publish.assert_not_called()
+
     def test_import_csv(self):
         # Given an application round
         app_round = models.ApplicationRound.objects.create(name="AI4Cities")
@@ -55,10 +521,24 @@ class ModelTests(TestCase):
             csv_file = ContentFile(f.read(), "applications.csv")
 
         # When saving an ApplicationImport object with the CSV file in its file field
-        models.ApplicationImport.objects.create(application_round=app_round, file=csv_file)
+        app_import = models.ApplicationImport.objects.create(application_round=app_round, file=csv_file)
+
+        # Then the import is left pending for the worker
+        self.assertEqual(app_round.applications.count(), 0)
+
+        # And when the worker runs, importing in batches of 2 rows
+        with override_settings(APPLICATION_IMPORT_BATCH_SIZE=2):
+            call_command("run_import_worker", "--once", stdout=StringIO())
 
         # Then the applications are imported
         self.assertEqual(app_round.applications.count(), 3)
+        self.assertIn("#### Work plan", app_round.applications.order_by("name").first().description)
+
+        # And the progress of the import and the counters of the round are recorded
+        app_import.refresh_from_db()
+        self.assertEqual((app_import.status, app_import.processed_count, app_import.total_count), ("done", 3, 3))
+        app_round.refresh_from_db()
+        self.assertEqual(app_round.application_count, 3)
 
     def test_import_rounds_from_csv(self):
         # Given a CSV file containing applications exported from Salesforce, referencing application rounds
@@ -70,14 +550,17 @@ class ModelTests(TestCase):
         models.ApplicationRound.objects.create(name="Call 1")
 
         # When saving an ApplicationImport object with the CSV file in its file field without linking it to any
-        # existing application round
+        # existing application round, and running the worker
         models.ApplicationImport.objects.create(file=csv_file)
+        jobs.run_next()
 
         # Then the applications are imported
         self.assertEqual(models.Application.objects.count(), 3)
 
         # And application rounds are created as needed
-        self.assertEqual(set(models.ApplicationRound.objects.values_list("name", flat=True)), {"Call 1", "Call 2"})
+        self.assertEqual(
+            dict(models.ApplicationRound.objects.values_list("name", "application_count")), {"Call 1": 2, "Call 2": 1}
+        )
 
     def test_application_attachment_import(self):
         # Given an application round with some named applications
@@ -89,8 +572,10 @@ class ModelTests(TestCase):
         with open("application_evaluator/tests/application_attachments.zip", "rb") as f:
             zip_file = ContentFile(f.read(), "application_attachments.zip")
 
-        # When saving an ApplicationAttachmentImport object with the zip file in its file field
+        # When saving an ApplicationAttachmentImport object with the zip file in its file field and running the worker
         app_import = models.ApplicationAttachmentImport.objects.create(application_round=app_round, file=zip_file)
+        jobs.run_next()
+        app_import.refresh_from_db()
 
         # Then the import succeeds without errors
         self.assertEqual(app_import.error, "")
@@ -98,6 +583,160 @@ class ModelTests(TestCase):
         # And the attachments are imported and associated with the applications
         self.assertEqual(app.attachments.count(), 1)
 
+    def test_parallel_attachment_import(self):
+        # Given an application round with some named applications
+        app_round = models.ApplicationRound.objects.create(name="AI4Cities")
+        skynet = app_round.applications.create(name="SkyNet")
+        hal = app_round.applications.create(name="HAL")
+
+        # And zip files of attachments named after the applications, one of them including an unknown application
+        def zip_file(names):
+            data = BytesIO()
+            with zipfile.ZipFile(data, "w") as zip:
+                for name in names:
+                    zip.writestr(f"attachments/{name}", f"Attachment {name}")
+            return ContentFile(data.getvalue(), "attachments.zip")
+
+        # When importing the zip including the unknown application
+        with override_settings(ATTACHMENT_IMPORT_BATCH_SIZE=2, ATTACHMENT_IMPORT_THREADS=2):
+            app_import = models.ApplicationAttachmentImport.objects.create(
+                application_round=app_round, file=zip_file(["SkyNet.pdf", "Marvin.pdf", "Deep Thought.pdf"])
+            )
+            jobs.run_next()
+
+            # Then the unknown applications are reported before importing any attachments, without retrying
+            app_import.refresh_from_db()
+            self.assertEqual(app_import.error, "Applications not found: Deep Thought, Marvin")
+            self.assertEqual((app_import.status, app_import.attempts), ("error", 1))
+            self.assertFalse(models.ApplicationAttachment.objects.exists())
+
+            # And when creating the attachments of a batch fails
+            stored = []
+
+            def fail(attachments):
+                stored.extend(attachment.attachment.name for attachment in attachments)
+                raise DatabaseError("Connection lost")
+
+            models.ApplicationAttachmentImport.objects.create(
+                application_round=app_round, file=zip_file(["SkyNet.pdf", "HAL.pdf"])
+            )
+            with mock.patch.object(models.ApplicationAttachment.objects, "bulk_create", side_effect=fail):
+                jobs.run_next()
+
+            # Then the files stored for the batch are deleted
+            self.assertEqual(len(stored), 2)
+            self.assertEqual([name for name in stored if default_storage.exists(name)], [])
+
+            # And when importing the other zip in batches of 2 files
+            app_import = models.ApplicationAttachmentImport.objects.create(
+                application_round=app_round, file=zip_file(["SkyNet.pdf", "HAL.pdf", "SkyNet.docx"])
+            )
+            jobs.run_next()
+
+        # Then all the attachments are imported with their contents
+        app_import.refresh_from_db()
+        self.assertEqual((app_import.status, app_import.processed_count, app_import.total_count), ("done", 3, 3))
+        self.assertEqual(
+            sorted(skynet.attachments.values_list("name", flat=True)),
+            ["attachments/SkyNet.docx", "attachments/SkyNet.pdf"],
+        )
+        attachment = hal.attachments.get()
+        with attachment.attachment.open("rb") as f:
+            self.assertEqual(f.read(), b"Attachment HAL.pdf")
+
+    @override_settings(IMPORT_JOB_MAX_ATTEMPTS=2)
+    def test_import_jobs(self):
+        # Given a CSV file of applications and a CSV file missing the application numbers
+        with open("application_evaluator/tests/applications.csv", encoding="utf-8-sig") as f:
+            csv_data = f.read()
+        broken_data = csv_data.replace("Application Number", "Number")
+
+        # When the worker fails to process an import
+        broken = models.ApplicationImport.objects.create(file=ContentFile(broken_data, "broken.csv"))
+        self.assertEqual(jobs.run_next(), broken)
+
+        # Then the import is left pending for a later retry
+        broken.refresh_from_db()
+        self.assertEqual((broken.status, broken.attempts, broken.error), ("pending", 1, "'Application Number'"))
+        self.assertIsNone(jobs.run_next())
+
+        # And when retried after the delay and failing again, the import is left in error
+        models.ApplicationImport.objects.filter(id=broken.id).update(run_after=timezone.now())
+        jobs.run_next()
+        broken.refresh_from_db()
+        self.assertEqual((broken.status, broken.attempts), ("error", 2))
+
+        # And given an import being processed by a worker, having imported 2 of its rows
+        app_round = models.ApplicationRound.objects.create(name="AI4Cities")
+        app_import = models.ApplicationImport.objects.create(
+            application_round=app_round, file=ContentFile(csv_data, "applications.csv")
+        )
+        models.ApplicationImport.objects.filter(id=app_import.id).update(
+            status="processing", attempts=1, heartbeat_at=timezone.now(), processed_count=2
+        )
+
+        # Then it is not claimed by other workers
+        self.assertIsNone(jobs.run_next())
+
+        # But when its worker has stopped sending heartbeats, it is claimed again and resumed after the imported rows
+        models.ApplicationImport.objects.filter(id=app_import.id).update(
+            heartbeat_at=timezone.now() - timedelta(seconds=settings.IMPORT_JOB_TIMEOUT + 1)
+        )
+        self.assertEqual(jobs.run_next(), app_import)
+        app_import.refresh_from_db()
+        self.assertEqual((app_import.status, app_import.attempts, app_import.processed_count), ("done", 2, 3))
+        self.assertEqual(list(app_round.applications.values_list("name", flat=True)), ["PN#-202302-10444"])
+
+        # And when imports are run in the request, they are processed once the request is committed
+        with override_settings(RUN_IMPORTS_IN_REQUEST=True), self.captureOnCommitCallbacks(execute=True):
+            app_import = models.ApplicationImport.objects.create(
+                application_round=app_round, file=ContentFile(csv_data, "applications.csv")
+            )
+        app_import.refresh_from_db()
+        self.assertEqual(app_import.status, "done")
+        self.assertEqual(app_round.applications.count(), 4)
+
+        # And failing there, they are attempted once and left pending for a worker to retry
+        with override_settings(RUN_IMPORTS_IN_REQUEST=True), self.captureOnCommitCallbacks(execute=True):
+            broken = models.ApplicationImport.objects.create(file=ContentFile(broken_data, "broken.csv"))
+        broken.refresh_from_db()
+        self.assertEqual((broken.status, broken.attempts), ("pending", 1))
+
+        # And when an import is claimed again while its first attempt is still running, the outcome of the first
+        # attempt is not saved over the second one
+        job = jobs.claim(models.ApplicationImport, ids=[broken.id])
+        models.ApplicationImport.objects.filter(id=broken.id).update(attempts=3)
+        jobs.run(job)
+        broken.refresh_from_db()
+        self.assertEqual((broken.status, broken.attempts), ("processing", 3))
+
+    def test_import_job_heartbeat(self):
+        # Given an import being processed
+        app_import = models.ApplicationImport.objects.create(file=ContentFile("", "applications.csv"))
+        beats = []
+
+        def beat(heartbeat):
+            beats.append(time.monotonic())
+            if len(beats) == 1:
+                raise DatabaseError("Connection lost")
+
+        # When updating its heartbeat fails
+        with (
+            override_settings(IMPORT_JOB_HEARTBEAT=0.01),
+            mock.patch.object(jobs.Heartbeat, "beat", beat),
+            mock.patch.object(jobs.logger, "exception") as log,
+        ):
+            heartbeat = jobs.Heartbeat(app_import)
+            heartbeat.start()
+            deadline = time.monotonic() + 5
+            while len(beats) < 2 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            heartbeat.stop()
+
+        # Then the error is logged and the heartbeat is updated again
+        log.assert_called_once()
+        self.assertGreaterEqual(len(beats), 2)
+
     def test_criterion_weight_must_be_positive(self):
         app_round = models.ApplicationRound.objects.create(name="AI4Cities")
 
@@ -0,0 +1,107 @@
+import datetime
+import re
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from application_evaluator import models
+
+# Tables that grow with the applications and their evaluations, which must not be scanned sequentially:
+LARGE_TABLES = {
+    model._meta.db_table
+    for model in [
+        models.Application,
+        models.Application.evaluating_organizations.through,
+        models.ApplicationAccess,
+        models.Comment,
+        models.Score,
+        models.Tombstone,
+    ]
+}
+
+
+def sequential_scans(queryset):
+    """
+    Return the plan of the queryset and the large tables that it scans sequentially. On PostgreSQL, sequential scans
+    are disabled for planning, so that they only appear where no index can be used, whatever the size of the data.
+    """
+    sql = str(queryset.query)
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+        plan = queryset.explain()
+        scanned = re.findall(r"Seq Scan on (\w+)", plan)
+    else:
+        plan = queryset.explain()
+        # SQLite plans refer to tables by their aliases in the query, e.g. SCAN U0:
+        aliases = {alias: table for table, alias in re.findall(r'"(\w+)" ([A-Z]\d+)\b', sql)}
+        scanned = [aliases.get(table, table) for table in re.findall(r"SCAN (\w+)(?! USING)", plan)]
+    return plan, sorted(set(scanned) & LARGE_TABLES)
+
+
+class QueryPlanTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # Rounds with applications evaluated by the evaluators of several organizations:
+        cls.organizations = [models.Organization.objects.create(name=f"Organization {i}") for i in range(3)]
+        cls.evaluators = []
+        for i in range(6):
+            evaluator = User.objects.create(username=f"evaluator{i}")
+            cls.organizations[i % 3].users.add(evaluator)
+            cls.evaluators.append(evaluator)
+        cls.rounds = []
+        for r in range(3):
+            app_round = models.ApplicationRound.objects.create(name=f"Round {r}", published=True)
+            group = app_round.criterion_groups.create(name="Impact")
+            criteria = [app_round.criteria.create(name=f"Criterion {c}", weight=1, group=group) for c in range(4)]
+            for a in range(20):
+                app = app_round.applications.create(name=f"Application {a}")
+                app.evaluating_organizations.add(*cls.organizations[: 1 + a % 3])
+                models.Score.objects.bulk_create(
+                    [
+                        models.Score(application=app, criterion=criterion, evaluator=evaluator, score=3)
+                        for criterion in criteria
+                        for evaluator in cls.evaluators
+                    ]
+                )
+                models.Comment.objects.bulk_create(
+                    [
+                        models.Comment(application=app, criterion_group=group, evaluator=evaluator, comment="Good")
+                        for evaluator in cls.evaluators
+                    ]
+                )
+            cls.rounds.append(app_round)
+        cls.application = cls.rounds[0].applications.first()
+        cls.criterion = cls.rounds[0].criteria.first()
+        cls.evaluator = cls.evaluators[0]
+        cls.organization = cls.organizations[0]
+
+    def querysets(self):
+        app_round, app, evaluator = self.rounds[0], self.application, self.evaluator
+        since = timezone.now() - datetime.timedelta(hours=1)
+        return {
+            "round scores": models.Score.for_evaluator(evaluator, app_round),
+            "round comments": models.Comment.for_evaluator(evaluator, app_round),
+            "round changes": models.Score.for_evaluator(evaluator, app_round).filter(modified_at__gte=since),
+            "round tombstones": models.Tombstone.for_evaluator(evaluator, app_round).filter(deleted_at__gte=since),
+            "round applications": app_round.applications_for_evaluator(evaluator).order_by("name"),
+            "applications": models.Application.applications_for_evaluator(evaluator),
+            "organization applications": models.Application.objects.filter(evaluating_organizations=self.organization),
+            "criterion scores": models.Score.objects.filter(application=app, criterion=self.criterion),
+            "evaluator scores": models.Score.objects.filter(evaluator=evaluator, application=app),
+            "evaluator comments": models.Comment.objects.filter(evaluator=evaluator, application=app),
+            "open evaluator scores": models.Score.objects.filter(evaluator=evaluator).exclude(
+                application__application_round__scoring_completed=True
+            ),
+        }
+
+    def test_no_sequential_scans(self):
+        # Given seeded rounds, applications, scores and comments
+        # When the main querysets are planned
+        for name, queryset in self.querysets().items():
+            with self.subTest(name):
+                plan, scanned = sequential_scans(queryset)
+                # Then none of them scans a large table sequentially
+                self.assertEqual(scanned, [], f"{name} scans {scanned}:\n{plan}")
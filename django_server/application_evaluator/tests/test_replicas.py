@@ -0,0 +1,156 @@
+from pathlib import Path
+import tempfile
+
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connections
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from application_evaluator import models, replicas, rest
+
+router = replicas.ReplicaRouter()
+
+
+def shared_cache(test_case):
+    """
+    Use a default cache shared between processes, in a directory of its own, for the rest of the test.
+    """
+    location = tempfile.TemporaryDirectory()
+    test_case.addCleanup(location.cleanup)
+    caches = {"default": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": location.name}}
+    settings = override_settings(CACHES=caches)
+    settings.enable()
+    test_case.addCleanup(settings.disable)
+
+
+def read_database(request):
+    return HttpResponse(router.db_for_read(models.Application))
+
+
+def streamed_read_database(request):
+    return StreamingHttpResponse(router.db_for_read(models.Application) for _i in range(1))
+
+
+def viewset_view(view, cls, actions):
+    # Named in the same way as the REST viewset actions (see middleware.view_name):
+    def wrapper(request):
+        return view(request)
+
+    wrapper.cls, wrapper.actions = cls, actions
+    return wrapper
+
+
+@override_settings(READ_REPLICA_DATABASE="replica")
+class ReplicaRoutingTests(SimpleTestCase):
+    def setUp(self):
+        # The replica is only used when the pins to the primary are shared by the server processes:
+        shared_cache(self)
+        self.factory = RequestFactory()
+        self.evaluator = User(id=1, username="evaluator")
+        self.other_evaluator = User(id=2, username="other")
+
+    def request(self, view, method="get", user=None):
+        request = getattr(self.factory, method)("/")
+        request.user = user or AnonymousUser()
+
+        def get_response(request):
+            return middleware.process_view(request, view, (), {}) or view(request)
+
+        middleware = replicas.ReplicaMiddleware(get_response)
+        response = middleware(request)
+        return b"".join(response.streaming_content if response.streaming else [response.content]).decode()
+
+    def test_reads_routed_to_replica(self):
+        # Given views of application rounds and other views
+        rounds = viewset_view(read_database, rest.ApplicationRoundViewSet, {"get": "list"})
+        scores = viewset_view(read_database, rest.ScoreViewSet, {"get": "list"})
+        export = viewset_view(streamed_read_database, rest.ApplicationRoundViewSet, {"get": "export_scores"})
+
+        # When requesting them, then the application round reads are sent to the replica, also when streamed
+        self.assertEqual(self.request(rounds, user=self.evaluator), "replica")
+        self.assertEqual(self.request(export, user=self.evaluator), "replica")
+        # And the other reads, the reads outside requests and the authentication data to the primary
+        self.assertEqual(self.request(scores, user=self.evaluator), "default")
+        self.assertEqual(router.db_for_read(models.Application), "default")
+        self.assertEqual(router.db_for_read(User), "default")
+        # And all writes to the primary
+        self.assertEqual(router.db_for_write(models.Application), "default")
+
+        # And nothing is sent to the replica when there is none
+        with override_settings(READ_REPLICA_DATABASE=None):
+            self.assertEqual(self.request(rounds, user=self.evaluator), "default")
+        # Or when the cache holding the pins to the primary is local to each process
+        with override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}):
+            self.assertEqual(self.request(rounds, user=self.evaluator), "default")
+
+    def test_read_your_writes(self):
+        # Given an evaluator who has just written
+        rounds = viewset_view(read_database, rest.ApplicationRoundViewSet, {"get": "list", "post": "create"})
+        self.assertEqual(self.request(rounds, "post", user=self.evaluator), "default")
+
+        # When they and another evaluator read application rounds
+        # Then the evaluator is read from the primary and the other evaluator from the replica
+        self.assertEqual(self.request(rounds, user=self.evaluator), "default")
+        self.assertEqual(self.request(rounds, user=self.other_evaluator), "replica")
+
+        # And the evaluator is read from the replica again after the pin expires
+        cache.delete(replicas.pin_key(self.evaluator.id))
+        self.assertEqual(self.request(rounds, user=self.evaluator), "replica")
+
+
+@override_settings(READ_REPLICA_DATABASE="replica")
+class ReplicaDatabaseTests(TransactionTestCase):
+    databases = {"default", "replica"}
+
+    @classmethod
+    def setUpClass(cls):
+        # A database of its own as the replica, lagging behind the primary as it is only written to by the tests:
+        cls.directory = tempfile.TemporaryDirectory()
+        connections.settings["replica"] = {
+            **connections.settings["default"],
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": Path(cls.directory.name) / "replica.sqlite3",
+        }
+        call_command("migrate", database="replica", verbosity=0)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections["replica"].close()
+        del connections["replica"]
+        del connections.settings["replica"]
+        cls.directory.cleanup()
+
+    def test_routed_queries(self):
+        # Given an application round renamed on the primary but not yet on the replica
+        user = User.objects.create(username="admin", is_staff=True)
+        app_round = models.ApplicationRound.objects.create(name="AI4Cities", published=True)
+        stale_round = models.ApplicationRound(id=app_round.id, name="AI4Cities (stale)", published=True)
+        models.ApplicationRound.objects.using("replica").bulk_create([stale_round])
+        self.client.force_login(user)
+        shared_cache(self)
+
+        def names(url):
+            with CaptureQueriesContext(connections["replica"]) as replica_queries:
+                response = self.client.get(url)
+            results = response.json()
+            return [r["name"] for r in results.get("results", [results])], len(replica_queries) > 0
+
+        # When the rounds are listed, and the round is loaded
+        list_url = reverse("application_round-list")
+        detail_url = reverse("application_round-detail", kwargs={"pk": app_round.id})
+
+        # Then the list is read from the replica
+        self.assertEqual(names(list_url), (["AI4Cities (stale)"], True))
+        # And the round payload, to be cached, from the primary, and then from the cache
+        self.assertEqual(names(detail_url)[0], ["AI4Cities"])
+        self.assertEqual(names(detail_url), (["AI4Cities"], False))
+
+        # And after the user writes, they are read from the primary
+        self.client.post(reverse("score-bulk"), [], content_type="application/json")
+        self.assertEqual(names(list_url), (["AI4Cities"], False))
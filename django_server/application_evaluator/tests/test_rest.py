@@ -1,8 +1,57 @@
+import asyncio
+import base64
+import functools
+import gzip
+import io
+import json
+import tempfile
+from unittest import mock
+import zipfile
+
+from asgiref.sync import sync_to_async
 from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import connection
+from django.test import AsyncClient, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
+import msgpack
+from rest_framework.authtoken.models import Token
 from rest_framework.test import APITestCase
+from rest_framework.utils.urls import replace_query_param
+
+from application_evaluator import async_views, counters, events, exports, middleware, models, payloads, rest, summaries
+
+
+def shared_caches(location):
+    """
+    Return CACHES settings of a default cache shared between processes, in the given directory.
+    """
+    return {"default": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": location}}
+
+
+def shared_cache(test):
+    """
+    Run the test with a shared default cache (see shared_caches) in a directory of its own, for payloads to be cached.
+    """
+    if asyncio.iscoroutinefunction(test):
+
+        @functools.wraps(test)
+        async def async_wrapper(*args, **kwargs):
+            with tempfile.TemporaryDirectory() as location, override_settings(CACHES=shared_caches(location)):
+                return await test(*args, **kwargs)
+
+        return async_wrapper
+
+    @functools.wraps(test)
+    def wrapper(*args, **kwargs):
+        with tempfile.TemporaryDirectory() as location, override_settings(CACHES=shared_caches(location)):
+            return test(*args, **kwargs)
 
-from application_evaluator import models
+    return wrapper
 
 
 class RestTests(APITestCase):
@@ -31,7 +80,7 @@ class RestTests(APITestCase):
 
         # Then an empty list is received
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(response.data, [])
+        self.assertEqual(response.data["results"], [])
 
     def test_application_rounds_when_not_published(self):
         # Given a logged in user that belongs to an organization with allocated applications only in unpublished rounds
@@ -49,7 +98,7 @@ class RestTests(APITestCase):
 
         # Then an empty list is received
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(response.data, [])
+        self.assertEqual(response.data["results"], [])
 
     def test_application_rounds(self):
         # Given a logged in user that belongs to an organization with allocated applications
@@ -76,42 +125,14 @@ class RestTests(APITestCase):
         url = reverse("application_round-list")
         response = self.client.get(url)
 
-        # Then the application rounds of the allocated applications are received, along with public scores given
-        # by the user's organization
+        # Then the application rounds of the allocated applications are received without the applications, along
+        # with the public criteria and the evaluation progress of the user's organization
         self.assertEqual(response.status_code, 200)
         self.assertEqual(
-            response.json(),
+            response.json()["results"],
             [
                 {
                     "id": app_round.id,
-                    "applications": [
-                        {
-                            "id": app.id,
-                            "application_id": "",
-                            "name": "SkyNet",
-                            "description": "",
-                            "evaluating_organizations": ["Helsinki", "Tallinn"],
-                            "comments": [],
-                            "attachments": [],
-                            "approved": False,
-                            "approved_by": None,
-                            "scores": [
-                                {
-                                    "id": score1.id,
-                                    "application": app.id,
-                                    "score": 5.0,
-                                    "criterion": criterion1.id,
-                                    "evaluator": {
-                                        "id": evaluator.id,
-                                        "first_name": "",
-                                        "last_name": "",
-                                        "organization": "Helsinki",
-                                        "username": "evaluator",
-                                    },
-                                }
-                            ],
-                        }
-                    ],
                     "criteria": [{"name": "Goodness", "group": None, "id": criterion1.id, "weight": 1.0}],
                     "criterion_groups": [],
                     "attachments": [],
@@ -122,10 +143,60 @@ class RestTests(APITestCase):
                     "evaluators": [],
                     "scoring_completed": False,
                     "scoring_model": "Evaluators average",
+                    "application_count": 1,
+                    "scored_application_count": 1,
+                    "evaluated_application_count": 1,
+                    "submitted": False,
                 }
             ],
         )
 
+        # And when requesting the applications of the round
+        url = reverse("application_round-applications", kwargs={"pk": app_round.id})
+        response = self.client.get(url)
+
+        # Then the applications are received, along with public scores given by the user's organization and a
+        # timestamp for requesting subsequent changes
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertIsNotNone(data.pop("timestamp"))
+        self.assertEqual(
+            data,
+            {
+                "count": 1,
+                "next": None,
+                "previous": None,
+                "results": [
+                    {
+                        "id": app.id,
+                        "application_id": "",
+                        "name": "SkyNet",
+                        "description": "",
+                        "evaluating_organizations": ["Helsinki", "Tallinn"],
+                        "comments": [],
+                        "attachments": [],
+                        "approved": False,
+                        "approved_by": None,
+                        "scores": [
+                            {
+                                "id": score1.id,
+                                "application": app.id,
+                                "score": 5.0,
+                                "criterion": criterion1.id,
+                                "evaluator": {
+                                    "id": evaluator.id,
+                                    "first_name": "",
+                                    "last_name": "",
+                                    "organization": "Helsinki",
+                                    "username": "evaluator",
+                                },
+                            }
+                        ],
+                    }
+                ],
+            },
+        )
+
     def test_application_rounds_without_organizations(self):
         # Given a logged in user who is allocated as evaluator for an application round
         evaluator = User.objects.create(username="evaluator")
@@ -145,12 +216,14 @@ class RestTests(APITestCase):
         url = reverse("application_round-list")
         response = self.client.get(url)
 
-        # Then the allocated application rounds are received, along with the scores given
-        # by the user
+        # Then the allocated application rounds are received
         self.assertEqual(response.status_code, 200)
-        rounds = response.json()
+        rounds = response.json()["results"]
         self.assertEqual(len(rounds), 1)
-        applications = rounds[0]["applications"]
+
+        # And the applications of the round are received along with the scores given by the user
+        response = self.client.get(reverse("application_round-applications", kwargs={"pk": rounds[0]["id"]}))
+        applications = response.json()["results"]
         self.assertEqual(len(applications), 1)
         self.assertEqual(len(applications[0]["scores"]), 1)
 
@@ -251,3 +324,950 @@ class RestTests(APITestCase):
 
         # And the application approved_by is empty
         self.assertIsNone(app.approved_by)
+
+    def test_application_round_results(self):
+        # Given a logged in user that belongs to an organization with allocated applications
+        evaluator = User.objects.create(username="evaluator")
+        self.client.force_login(evaluator)
+        organization = evaluator.organizations.create(name="Helsinki")
+        app_round = models.ApplicationRound.objects.create(name="AI4Cities", published=True)
+        group = app_round.criterion_groups.create(name="Impact", threshold=3)
+        criterion1 = app_round.criteria.create(name="Goodness", weight=1, group=group)
+        criterion2 = app_round.criteria.create(name="Wellness", weight=1)
+        apps = [app_round.applications.create(name=name) for name in ["SkyNet", "HAL", "Marvin", "Robby"]]
+        for app in apps:
+            app.evaluating_organizations.add(organization)
+
+        # And given scores by the user's organization, one of which is below the criterion group threshold
+        for app, (score1, score2) in zip(apps, [(4, 2), (2, 5), (5, 5)], strict=False):
+            app.scores.create(evaluator=evaluator, score=score1, criterion=criterion1)
+            app.scores.create(evaluator=evaluator, score=score2, criterion=criterion2)
+
+        # And a score by another organization, which has not been submitted
+        evaluator2 = User.objects.create(username="evaluator2")
+        evaluator2.organizations.create(name="Tallinn")
+        apps[3].scores.create(evaluator=evaluator2, score=5, criterion=criterion1)
+
+        # When requesting the results of the round, two at a time
+        url = reverse("application_round-results", kwargs={"pk": app_round.id})
+        response = self.client.get(url, {"page_size": 2})
+
+        # Then the applications are received sorted by total score, with their threshold results
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["count"], 4)
+        self.assertIsNone(response.data["previous"])
+        self.assertEqual(
+            [(r["name"], r["score"], r["passed"], r["failed_groups"]) for r in response.data["results"]],
+            [("Marvin", 5.0, True, []), ("HAL", 3.5, False, [group.id])],
+        )
+
+        # And the next page contains the rest of the applications, not including the other organization's score
+        response = self.client.get(response.data["next"])
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.data["next"])
+        self.assertEqual(
+            [(r["name"], r["score"], r["scored"]) for r in response.data["results"]],
+            [("SkyNet", 3.0, True), ("Robby", 0.0, False)],
+        )
+
+        # And the previous page can be requested using the cursor of the page
+        response = self.client.get(response.data["previous"])
+        self.assertEqual([r["name"] for r in response.data["results"]], ["Marvin", "HAL"])
+
+        # And the results can be filtered by whether the thresholds are passed
+        response = self.client.get(url, {"passed": "false"})
+        self.assertEqual([r["name"] for r in response.data["results"]], ["HAL"])
+
+        # And the page before one starting at the second application contains only the first one
+        response = self.client.get(url, {"page_size": 3})
+        response = self.client.get(response.data["next"])
+        self.assertEqual([r["name"] for r in response.data["results"]], ["Robby"])
+        response = self.client.get(replace_query_param(response.data["previous"], "page_size", 2))
+        self.assertEqual([r["name"] for r in response.data["results"]], ["HAL", "SkyNet"])
+        response = self.client.get(response.data["previous"])
+        self.assertEqual([r["name"] for r in response.data["results"]], ["Marvin"])
+        self.assertIsNone(response.data["previous"])
+
+        # And invalid cursors, including ones with keys of another shape, are rejected
+        for cursor in ["invalid", base64.urlsafe_b64encode(json.dumps([False, ["a"]]).encode()).decode()]:
+            response = self.client.get(url, {"cursor": cursor})
+            self.assertEqual(response.status_code, 404)
+
+    def test_application_round_results_restricted(self):
+        # Given a logged in user whose organization has not submitted its evaluations of a round
+        evaluator = User.objects.create(username="evaluator")
+        self.client.force_login(evaluator)
+        organization = evaluator.organizations.create(name="Helsinki")
+        app_round = models.ApplicationRound.objects.create(name="AI4Cities", published=True)
+        public_criterion = app_round.criteria.create(name="Goodness", weight=1)
+        hidden_criterion = app_round.criteria.create(name="Wellness", weight=1, public=False)
+        app = app_round.applications.create(name="SkyNet")
+        app.evaluating_organizations.add(organization)
+
+        # And given scores by the user for a public and a non-public criterion
+        app.scores.create(evaluator=evaluator, score=2, criterion=public_criterion)
+        app.scores.create(evaluator=evaluator, score=5, criterion=hidden_criterion)
+
+        # When requesting the results of the round
+        url = reverse("application_round-results", kwargs={"pk": app_round.id})
+        response = self.client.get(url)
+
+        # Then the total score does not include the score for the non-public criterion, which counts as unscored
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([(r["name"], r["score"]) for r in response.data["results"]], [("SkyNet", 1.0)])
+
+        # And once the organization has submitted, the non-public criterion is included
+        self.client.post(reverse("application_round-submit", kwargs={"pk": app_round.id}))
+        response = self.client.get(url)
+        self.assertEqual([(r["name"], r["score"]) for r in response.data["results"]], [("SkyNet", 3.5)])
+
+    def test_export_scores(self):
+        # Given a logged in user that belongs to an organization with allocated applications
+        evaluator = User.objects.create(username="evaluator", first_name="Eva", last_name="Luator")
+        self.client.force_login(evaluator)
+        organization = evaluator.organizations.create(name="Helsinki")
+        app_round = models.ApplicationRound.objects.create(name="AI4Cities", published=True)
+        group = app_round.criterion_groups.create(name="Impact")
+        criterion = app_round.criteria.create(name="Goodness", weight=1, group=group)
+        app1 = app_round.applications.create(name="SkyNet", application_id="A1")
+        app2 = app_round.applications.create(name="HAL", application_id="A2")
+        for app in [app1, app2]:
+            app.evaluating_organizations.add(organization)
+
+        # And given scores and comments by the user and by another organization, which has not submitted
+        app1.scores.create(evaluator=evaluator, score=4, criterion=criterion)
+        app1.comments.create(evaluator=evaluator, comment="Scary", criterion_group=group)
+        app2.scores.create(evaluator=evaluator, score=2, criterion=criterion)
+        evaluator2 = User.objects.create(username="evaluator2")
+        evaluator2.organizations.create(name="Tallinn")
+        app1.scores.create(evaluator=evaluator2, score=1, criterion=criterion)
+        app1.comments.create(evaluator=evaluator2, comment="Hidden", criterion_group=group)
+
+        # When requesting the raw scores export of the round as CSV
+        url = reverse("application_round-export-scores", kwargs={"pk": app_round.id})
+        response = self.client.get(url)
+
+        # Then the visible scores and comments are streamed, ordered by application name
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Disposition"], 'attachment; filename="AI4Cities.csv"')
+        self.assertEqual(
+            b"".join(response.streaming_content).decode().splitlines(),
+            [
+                "Application,Criterion group,Criterion,Organization,First name,Last name,Score,Comment",
+                "HAL,Impact,Goodness,Helsinki,Eva,Luator,2.0,",
+                "SkyNet,Impact,Goodness,Helsinki,Eva,Luator,4.0,",
+                "SkyNet,Impact,,Helsinki,Eva,Luator,,Scary",
+            ],
+        )
+
+        # And when requesting the summary export of one application
+        url = reverse("application_round-export-summary", kwargs={"pk": app_round.id})
+        response = self.client.get(url, {"application": app1.id, "score_multiplier": 4})
+
+        self.assertEqual(response["Content-Disposition"], 'attachment; filename="SkyNet.csv"')
+        # Then the application is exported with its group and total scores and comments
+        self.assertEqual(
+            b"".join(response.streaming_content).decode().splitlines(),
+            [
+                "Application number,Id,Impact,Total score,Approved,Comments",
+                "SkyNet,A1,4.0,16.0,False,Eva Luator - Impact: Scary",
+            ],
+        )
+
+        # And the summary export of the round, with scores computed one application at a time, includes total
+        # scores of zero
+        app3 = app_round.applications.create(name="Marvin", application_id="A3")
+        app3.evaluating_organizations.add(organization)
+        app3.scores.create(evaluator=evaluator, score=0, criterion=criterion)
+        with mock.patch.object(exports, "CHUNK_SIZE", 1):
+            response = self.client.get(url)
+            lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(
+            lines[1:],
+            [
+                "HAL,A2,2.0,2.0,False,",
+                "Marvin,A3,0.0,0.0,False,",
+                "SkyNet,A1,4.0,4.0,False,Eva Luator - Impact: Scary",
+            ],
+        )
+
+        # And the exports can be requested as XLSX
+        for name in ["export-scores", "export-summary"]:
+            url = reverse(f"application_round-{name}", kwargs={"pk": app_round.id})
+            response = self.client.get(url, {"file_format": "xlsx"})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response["Content-Disposition"], 'attachment; filename="AI4Cities.xlsx"')
+            with zipfile.ZipFile(io.BytesIO(b"".join(response.streaming_content))) as xlsx:
+                sheet = xlsx.read("xl/worksheets/sheet1.xml").decode()
+            self.assertIn("SkyNet", sheet)
+            self.assertNotIn("Hidden", sheet)
+
+    def test_application_round_applications_pagination(self):
+        # Given a logged in user who is allocated as evaluator for an application round with many applications
+        evaluator = User.objects.create(username="evaluator")
+        self.client.force_login(evaluator)
+        app_round = models.ApplicationRound.objects.create(name="AI4Cities", published=True)
+        app_round.evaluators.add(evaluator)
+        criterion = app_round.criteria.create(name="Goodness", weight=1)
+        apps = [app_round.applications.create(name=f"App {i:02}") for i in range(5)]
+        apps[0].scores.create(evaluator=evaluator, score=5, criterion=criterion)
+
+        # When requesting the applications of the round a page at a time
+        url = reverse("application_round-applications", kwargs={"pk": app_round.id})
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {"page_size": 2})
+
+        # Then the applications are received ordered by name, with links to the other pages
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["count"], 5)
+        self.assertEqual([a["name"] for a in response.data["results"]], ["App 00", "App 01"])
+        response = self.client.get(response.data["next"])
+        self.assertEqual([a["name"] for a in response.data["results"]], ["App 02", "App 03"])
+
+        # And the number of queries does not depend on the page size
+        with CaptureQueriesContext(connection) as all_queries:
+            self.client.get(url, {"page_size": 5})
+        self.assertEqual(len(all_queries), len(queries))
+
+        # And the round listing includes the evaluation progress
+        response = self.client.get(reverse("application_round-list"))
+        self.assertEqual(
+            {k: response.data["results"][0][k] for k in ["application_count", "scored_application_count", "submitted"]},
+            {"application_count": 5, "scored_application_count": 1, "submitted": False},
+        )
+
+    def test_application_rounds_pagination(self):
+        # Given a logged in user of an organization with applications allocated in several rounds, one of which the
+        # organization has submitted
+        evaluator = User.objects.create(username="evaluator")
+        self.client.force_login(evaluator)
+        organization = evaluator.organizations.create(name="Helsinki")
+        for i in range(5):
+            app_round = models.ApplicationRound.objects.create(name=f"Round {i}", published=True)
+            criterion = app_round.criteria.create(name="Goodness", weight=1)
+            app = app_round.applications.create(name="SkyNet")
+            app.evaluating_organizations.add(organization)
+            app_round.applications.create(name="HAL").evaluating_organizations.add(organization)
+            app.scores.create(evaluator=evaluator, score=5, criterion=criterion)
+        app_round.submittals.create(organization=organization, user=evaluator)
+
+        # When requesting the application rounds a page at a time
+        url = reverse("application_round-list")
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {"page_size": 2})
+
+        # Then the rounds are received ordered by name, with links to the other pages
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["count"], 5)
+        self.assertEqual([r["name"] for r in response.data["results"]], ["Round 0", "Round 1"])
+        response = self.client.get(response.data["next"])
+        self.assertEqual([r["name"] for r in response.data["results"]], ["Round 2", "Round 3"])
+
+        # And the evaluation progress of each round is counted as for the round alone
+        response = self.client.get(url, {"page_size": 5})
+        for application_round, data in zip(
+            models.ApplicationRound.objects.order_by("name"), response.data["results"], strict=True
+        ):
+            progress = application_round.evaluation_progress(evaluator)
+            self.assertEqual({k: data[k] for k in progress}, progress)
+            self.assertEqual(progress["scored_application_count"], 1)
+
+        # And the number of queries does not depend on the page size
+        with CaptureQueriesContext(connection) as all_queries:
+            self.client.get(url, {"page_size": 5})
+        self.assertEqual(len(all_queries), len(queries))
+
+    def test_application_round_applications_evaluator_organizations(self):
+        # Given a logged in user of an organization evaluating an application scored by many evaluators
+        evaluator = User.objects.create(username="evaluator")
+        organization = evaluator.organizations.create(name="Helsinki")
+        other_organization = models.Organization.objects.create(name="Espoo")
+        self.client.force_login(evaluator)
+        app_round = models.ApplicationRound.objects.create(name="AI4Cities", published=True)
+        criterion = app_round.criteria.create(name="Goodness", weight=1, public=True)
+        app = app_round.applications.create(name="SkyNet")
+        app.evaluating_organizations.add(organization, other_organization)
+
+        def add_evaluators(n, org):
+            for i in range(n):
+                user = User.objects.create(username=f"{org.name}-{org.users.count()}")
+                org.users.add(user)
+                app.scores.create(evaluator=user, score=i, criterion=criterion)
+
+        add_evaluators(2, organization)
+        add_evaluators(2, other_organization)
+
+        # When requesting the applications of the round
+        url = reverse("application_round-applications", kwargs={"pk": app_round.id})
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+
+        # Then only the scores of the user's own organization are received, with the organization names
+        scores = response.data["results"][0]["scores"]
+        self.assertEqual([s["evaluator"]["organization"] for s in scores], ["Helsinki", "Helsinki"])
+
+        # And the number of queries does not depend on the number of evaluators
+        add_evaluators(5, organization)
+        add_evaluators(5, other_organization)
+        cache.clear()
+        with CaptureQueriesContext(connection) as more_queries:
+            response = self.client.get(url)
+        self.assertEqual(len(response.data["results"][0]["scores"]), 7)
+        self.assertEqual(len(more_queries), len(queries))
+
+    def test_application_search(self):
+        # Given a logged in user who is allocated as evaluator for an application round
+        evaluator = User.objects.create(username="evaluator")
+        self.client.force_login(evaluator)
+        app_round = models.ApplicationRound.objects.create(name="AI4Cities", published=True)
+        app_round.evaluators.add(evaluator)
+        app_round.applications.create(name="Adaptive traffic lights", description="Shorter queues at crossings")
+        app_round.applications.create(name="Bus lanes", description="#### Impact\n\nLess traffic in the centre")
+        cargo_bikes = app_round.applications.create(name="Cargo bikes")
+        cargo_bikes.attachments.create(name="Traffic study.pdf", attachment="application_attachments/study.pdf")
+        app_round.applications.create(name="Parks", description="More trees")
+        # And an application matching the search in another round
+        other_round = models.ApplicationRound.objects.create(name="Mobility", published=True)
+        other_round.applications.create(name="Traffic sensors")
+
+        # When searching the applications
+        url = reverse("application-list")
+        response = self.client.get(url, {"q": "traffic"})
+
+        # Then the applications of the round matching by name, description or attachment names are received, the
+        # ones matching by name first
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([a["name"] for a in response.data], ["Adaptive traffic lights", "Bus lanes", "Cargo bikes"])
+
+        # And all search terms must match
+        response = self.client.get(url, {"q": "traffic lights"})
+        self.assertEqual([a["name"] for a in response.data], ["Adaptive traffic lights"])
+
+        # And the search follows changes to the applications
+        models.Application.objects.get(name="Parks").attachments.create(
+            name="Traffic calming.pdf", attachment="application_attachments/calming.pdf"
+        )
+        response = self.client.get(url, {"q": "traffic"})
+        self.assertEqual(len(response.data), 4)
+
+    def test_payloads_without_search_vectors(self):
+        # Given a logged in user who is allocated as evaluator for an application round with an application
+        evaluator = User.objects.create(username="evaluator")
+        self.client.force_login(evaluator)
+        app_round = models.ApplicationRound.objects.create(name="AI4Cities", published=True)
+        app_round.evaluators.add(evaluator)
+        app = app_round.applications.create(name="SkyNet", description="Long text")
+        urls = [
+            reverse("application_round-detail", kwargs={"pk": app_round.id}),
+            reverse("application_round-applications", kwargs={"pk": app_round.id}),
+            reverse("application-detail", kwargs={"pk": app.id}),
+            reverse("application-list"),
+            f"{reverse('application_round-export-summary', kwargs={'pk': app_round.id})}?application={app.id}",
+        ]
+
+        # When the round, its applications and its export are requested
+        with CaptureQueriesContext(connection) as queries:
+            for url in urls:
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                if response.streaming:
+                    b"".join(response.streaming_content)
+
+        # Then the search vectors of the applications are not loaded
+        self.assertFalse([q["sql"] for q in queries if "search_vector" in q["sql"]])
+
+    def test_sparse_fieldsets(self):
+        # Given a logged in user who is allocated as evaluator for an application round with a scored application
+        evaluator = User.objects.create(username="evaluator", first_name="Eve")
+        self.client.force_login(evaluator)
+        app_round = models.ApplicationRound.objects.create(name="AI4Cities", published=True)
+        app_round.evaluators.add(evaluator)
+        criterion = app_round.criteria.create(name="Goodness", weight=1)
+        app = app_round.applications.create(name="SkyNet", description="Long text", approved_by=evaluator)
+        app.scores.create(evaluator=evaluator, score=5, criterion=criterion)
+        group = app_round.criterion_groups.create(name="Impact")
+        app.comments.create(evaluator=evaluator, comment="Good", criterion_group=group)
+        url = reverse("application_round-applications", kwargs={"pk": app_round.id})
+        with CaptureQueriesContext(connection) as all_queries:
+            self.client.get(url)
+
+        # When requesting only some of the fields of the applications
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {"fields": "id,name,scores.score"})
+
+        # Then only those are received, and the omitted relations are not queried
+        self.assertEqual(response.data["results"], [{"id": app.id, "name": "SkyNet", "scores": [{"score": 5.0}]}])
+        self.assertLess(len(queries), len(all_queries))
+        omitted_tables = ['"application_evaluator_comment"."comment"', '"application_evaluator_applicationattachment"']
+        self.assertFalse([q for q in queries if any(table in q["sql"] for table in omitted_tables)])
+
+        # And fields can be omitted and related objects expanded
+        response = self.client.get(url, {"omit": "description,scores.evaluator,comments", "expand": "approved_by"})
+        application = response.data["results"][0]
+        self.assertNotIn("description", application)
+        self.assertNotIn("comments", application)
+        self.assertNotIn("evaluator", application["scores"][0])
+        self.assertEqual(application["approved_by"]["first_name"], "Eve")
+
+        # And the same applies to the other endpoints
+        response = self.client.get(reverse("score-list"), {"expand": "evaluator", "fields": "score,evaluator"})
+        self.assertEqual(response.data[0]["evaluator"]["first_name"], "Eve")
+        self.assertEqual(set(response.data[0]), {"score", "evaluator"})
+        response = self.client.get(
+            reverse("application_round-detail", kwargs={"pk": app_round.id}), {"fields": "applications.name"}
+        )
+        self.assertEqual(response.data, {"applications": [{"name": "SkyNet"}]})
+
+        # And the parameters do not apply to writes
+        criterion2 = app_round.criteria.create(name="Wellness", weight=1)
+        data = {"application": app.id, "criterion": criterion2.id, "score": 3}
+        response = self.client.post(f"{reverse('score-list')}?omit=evaluator&fields=score", data, format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["evaluator"], evaluator.id)
+        self.assertTrue(app.scores.filter(criterion=criterion2, evaluator=evaluator, score=3).exists())
+
+    def test_application_round_changes(self):
+        # Given a logged in user that belongs to an organization with allocated applications
+        evaluator = User.objects.create(username="evaluator")
+        self.client.force_login(evaluator)
+        organization = evaluator.organizations.create(name="Helsinki")
+        app_round = models.ApplicationRound.objects.create(name="AI4Cities", published=True)
+        group = app_round.criterion_groups.create(name="Impact")
+        criterion1 = app_round.criteria.create(name="Goodness", weight=1, group=group)
+        criterion2 = app_round.criteria.create(name="Wellness", weight=1, group=group)
+        app = app_round.applications.create(name="SkyNet")
+        app.evaluating_organizations.add(organization)
+
+        # And given scores by the user and by another organization
+        score1 = app.scores.create(evaluator=evaluator, score=5, criterion=criterion1)
+        score2 = app.scores.create(evaluator=evaluator, score=5, criterion=criterion2)
+        evaluator2 = User.objects.create(username="evaluator2")
+        evaluator2.organizations.create(name="Tallinn")
+        other_score = app.scores.create(evaluator=evaluator2, score=1, criterion=criterion1)
+
+        # When the scores are changed after the user has loaded them
+        response = self.client.get(reverse("application_round-applications", kwargs={"pk": app_round.id}))
+        since = timezone.now()
+        self.assertLess(response.data["timestamp"], since)
+        score1.score = 3
+        score1.save()
+        score2_id = score2.id
+        score2.delete()
+        other_score.score = 2
+        other_score.save()
+        comment = app.comments.create(evaluator=evaluator, comment="Scary", criterion_group=group)
+
+        # Then the changes visible to the user since the load can be requested
+        url = reverse("application_round-changes", kwargs={"pk": app_round.id})
+        response = self.client.get(url, {"since": since.isoformat()})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([(s["id"], s["score"]) for s in response.data["scores"]], [(score1.id, 3.0)])
+        self.assertEqual([c["id"] for c in response.data["comments"]], [comment.id])
+        self.assertEqual(response.data["deleted_scores"], [score2_id])
+        self.assertEqual(response.data["deleted_comments"], [])
+
+        # And the same changes are available from the score endpoint
+        response = self.client.get(
+            reverse("score-list"), {"since": since.isoformat(), "application_round": app_round.id}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([s["id"] for s in response.data["results"]], [score1.id])
+        self.assertEqual(response.data["deleted"], [score2_id])
+
+        # And nothing has changed since the returned timestamp, apart from the overlap
+        response = self.client.get(url, {"since": (timezone.now() + rest.SYNC_OVERLAP).isoformat()})
+        self.assertEqual(response.data["scores"], [])
+
+        # And invalid or missing timestamps are rejected
+        self.assertEqual(self.client.get(url, {"since": "yesterday"}).status_code, 400)
+        self.assertEqual(self.client.get(url).status_code, 400)
+        self.assertEqual(self.client.get(reverse("score-list"), {"since": since.isoformat()}).status_code, 400)
+
+        # And rounds can still be deleted along with their scores
+        app_round.delete()
+        self.assertFalse(models.Tombstone.objects.exists())
+
+    @shared_cache
+    def test_conditional_get(self):
+        # Given a logged in user that belongs to an organization with allocated applications
+        evaluator = User.objects.create(username="evaluator")
+        self.client.force_login(evaluator)
+        organization = evaluator.organizations.create(name="Helsinki")
+        app_round = models.ApplicationRound.objects.create(name="AI4Cities", published=True)
+        criterion = app_round.criteria.create(name="Goodness", weight=1)
+        app = app_round.applications.create(name="SkyNet")
+        app.evaluating_organizations.add(organization)
+        score = app.scores.create(evaluator=evaluator, score=5, criterion=criterion)
+
+        urls = [
+            reverse("application_round-list"),
+            reverse("application_round-detail", kwargs={"pk": app_round.id}),
+            reverse("application_round-applications", kwargs={"pk": app_round.id}),
+            reverse("application-detail", kwargs={"pk": app.id}),
+        ]
+
+        def etags():
+            return [self.client.get(url).get("ETag") for url in urls]
+
+        # When requesting the rounds and applications with the ETags of earlier responses
+        tags = etags()
+        # The round payloads are answered from the payload cache:
+        for url, etag, query_count in zip(urls, tags, [6, 4, 4, 6], strict=True):
+            with self.assertNumQueries(query_count):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+            # Then 304 Not Modified responses are received without serializing anything
+            self.assertEqual(response.status_code, 304)
+
+        # And when scores, criteria, applications or submittals change, so do the ETags
+        changes = [
+            lambda: models.Score.objects.get(id=score.id).save(),
+            lambda: score.delete(),
+            lambda: app_round.criteria.create(name="Wellness", weight=1),
+            lambda: app_round.applications.create(name="HAL"),
+            lambda: app_round.submittals.create(organization=organization, user=evaluator),
+            lambda: app.evaluating_organizations.add(evaluator.organizations.create(name="Tallinn")),
+        ]
+        for change in changes:
+            change()
+            new_tags = etags()
+            for etag, new_etag in zip(tags, new_tags, strict=True):
+                self.assertNotEqual(etag, new_etag)
+            tags = new_tags
+
+    @shared_cache
+    def test_cached_round_payloads(self):
+        # Given two users of an organization and one of another, evaluating an application round
+        evaluator = User.objects.create(username="evaluator")
+        colleague = User.objects.create(username="colleague")
+        outsider = User.objects.create(username="outsider")
+        organization = models.Organization.objects.create(name="Helsinki")
+        organization.users.add(evaluator, colleague)
+        outsider.organizations.create(name="Espoo")
+        app_round = models.ApplicationRound.objects.create(name="AI4Cities", published=True)
+        criterion = app_round.criteria.create(name="Goodness", weight=1, public=True)
+        app = app_round.applications.create(name="SkyNet")
+        app.evaluating_organizations.add(*models.Organization.objects.all())
+        app.scores.create(evaluator=evaluator, score=5, criterion=criterion)
+        url = reverse("application_round-detail", kwargs={"pk": app_round.id})
+
+        def get(user):
+            self.client.force_login(user)
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip, deflate")
+            return response, len(queries)
+
+        # When the round is loaded by one user and then by users of the same and another organization
+        response, first_queries = get(evaluator)
+        colleague_response, colleague_queries = get(colleague)
+        outsider_response, _ = get(outsider)
+
+        # Then the user of the same organization is served the compressed payload from the cache
+        self.assertEqual(colleague_response["Content-Encoding"], "gzip")
+        self.assertEqual(json.loads(gzip.decompress(colleague_response.content)), json.loads(response.content))
+        self.assertLess(colleague_queries, first_queries / 2)
+
+        # And the user of the other organization is not
+        self.assertNotIn("Content-Encoding", outsider_response)
+        self.assertEqual(outsider_response.data["applications"][0]["scores"], [])
+
+        # And after a score changes, the payload is not served from the cache
+        app.scores.create(evaluator=colleague, score=3, criterion=criterion)
+        colleague_response, colleague_queries = get(colleague)
+        self.assertNotIn("Content-Encoding", colleague_response)
+        self.assertEqual(len(colleague_response.data["applications"][0]["scores"]), 2)
+
+    def test_cached_round_payloads_across_processes(self):
+        # Given an evaluator of an application round, and the cache of another server process
+        evaluator = User.objects.create(username="evaluator")
+        organization = evaluator.organizations.create(name="Helsinki")
+        app_round = models.ApplicationRound.objects.create(name="AI4Cities", published=True)
+        criterion = app_round.criteria.create(name="Goodness", weight=1)
+        app = app_round.applications.create(name="SkyNet")
+        app.evaluating_organizations.add(organization)
+        score = app.scores.create(evaluator=evaluator, score=5, criterion=criterion)
+        url = reverse("application_round-detail", kwargs={"pk": app_round.id})
+        self.client.force_login(evaluator)
+
+        def load_after_change_in(other_process_cache):
+            self.client.get(url)
+            with mock.patch.object(payloads, "cache", other_process_cache):
+                score.score += 1
+                score.save()
+            return self.client.get(url)
+
+        # When the payload is cached and then invalidated in the other process, with a cache shared between them
+        with tempfile.TemporaryDirectory() as location, override_settings(CACHES=shared_caches(location)):
+            response = load_after_change_in(FileBasedCache(location, {}))
+            cached_response = self.client.get(url)
+
+        # Then the changed score is served, and cached again
+        self.assertEqual(response.data["applications"][0]["scores"][0]["score"], 6.0)
+        self.assertFalse(hasattr(cached_response, "data"))
+        self.assertEqual(json.loads(cached_response.content), json.loads(response.content))
+
+        # And with caches local to each process, payloads are not cached at all, to not serve ones invalidated elsewhere
+        response = load_after_change_in(LocMemCache("other-process", {}))
+        self.assertEqual(response.data["applications"][0]["scores"][0]["score"], 7.0)
+        self.assertTrue(hasattr(self.client.get(url), "data"))
+
+    @shared_cache
+    async def test_async_read_endpoints(self):
+        # Given an evaluator with an API token, allocated a scored application in a published round
+        def create():
+            evaluator = User.objects.create(username="evaluator")
+            organization = evaluator.organizations.create(name="Helsinki")
+            app_round = models.ApplicationRound.objects.create(name="AI4Cities", published=True)
+            criterion = app_round.criteria.create(name="Goodness", weight=1)
+            app = app_round.applications.create(name="SkyNet")
+            app.evaluating_organizations.add(organization)
+            app.scores.create(evaluator=evaluator, score=5, criterion=criterion)
+            return Token.objects.create(user=evaluator), app_round, app
+
+        token, app_round, app = await sync_to_async(create)()
+        client = AsyncClient()
+        auth = {"Authorization": f"Token {token.key}"}
+        urls = [
+            reverse("application_round-list"),
+            reverse("application_round-detail", kwargs={"pk": app_round.id}),
+            reverse("application_round-results", kwargs={"pk": app_round.id}),
+            reverse("application-detail", kwargs={"pk": app.id}),
+        ]
+
+        # When requesting the read endpoints under ASGI, and again with the ETags received
+        responses = [await client.get(url, headers=auth) for url in urls]
+        conditional_responses = [
+            await client.get(url, headers={**auth, "If-None-Match": response["ETag"]})
+            for url, response in zip(urls, responses, strict=True)
+        ]
+        cached_response = await client.get(urls[1], headers=auth)
+
+        # Then the data is received as from the DRF views, and then 304 Not Modified responses
+        self.assertEqual([r.status_code for r in responses], [200, 200, 200, 200])
+        self.assertEqual(responses[1].data["applications"][0]["scores"][0]["score"], 5.0)
+        self.assertEqual(responses[2].data["results"][0]["name"], "SkyNet")
+        self.assertEqual([r.status_code for r in conditional_responses], [304, 304, 304, 304])
+
+        # And the round is served from the payload cache on the next request
+        self.assertEqual(json.loads(cached_response.content), json.loads(responses[1].content))
+        self.assertFalse(hasattr(cached_response, "data"))
+
+        # And requests that are not authenticated or not reads are handled by the DRF views
+        self.assertEqual((await client.get(urls[1])).status_code, 401)
+        self.assertEqual((await client.post(urls[3], headers=auth)).status_code, 405)
+
+    async def test_round_events(self):
+        # Given an evaluator following the events of a round, evaluated by their organization and another one
+        def create():
+            evaluator = User.objects.create(username="evaluator")
+            colleague = User.objects.create(username="colleague")
+            outsider = User.objects.create(username="outsider")
+            organization = models.Organization.objects.create(name="Helsinki")
+            organization.users.add(evaluator, colleague)
+            outsider.organizations.create(name="Espoo")
+            app_round = models.ApplicationRound.objects.create(name="AI4Cities", published=True)
+            criterion = app_round.criteria.create(name="Goodness", weight=1)
+            app = app_round.applications.create(name="SkyNet")
+            app.evaluating_organizations.add(*models.Organization.objects.all())
+            return Token.objects.create(user=evaluator), colleague, outsider, app_round, criterion, app
+
+        token, colleague, outsider, app_round, criterion, app = await sync_to_async(create)()
+        client = AsyncClient()
+        auth = {"Authorization": f"Token {token.key}"}
+        url = reverse("application_round-events", kwargs={"pk": app_round.id})
+        # Served by a single process:
+        broker = mock.patch.object(events, "_broker", events.LocalBroker(single_process=True))
+        broker.start()
+        self.addCleanup(broker.stop)
+        response = await client.get(url, headers=auth)
+        stream = response.streaming_content
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        self.assertEqual(await stream.__anext__(), b"retry: 5000\n\n")
+
+        # When evaluators of both organizations score the application and it is approved
+        def change():
+            for evaluator in [outsider, colleague]:
+                with self.captureOnCommitCallbacks(execute=True):
+                    app.scores.create(evaluator=evaluator, score=5, criterion=criterion)
+            with self.captureOnCommitCallbacks(execute=True):
+                app.approve_by_user(colleague)
+
+        await sync_to_async(change)()
+        chunks = [(await asyncio.wait_for(stream.__anext__(), 5)).decode() for i in range(2)]
+        await stream.aclose()
+
+        # Then the score of the colleague and the approval are streamed, but not the score of the other organization
+        score_event, approval_event = [chunk.split("\n") for chunk in chunks]
+        self.assertEqual(score_event[0], "event: score")
+        score = json.loads(score_event[1].removeprefix("data: "))
+        self.assertEqual((score["evaluator"]["username"], score["score"]), ("colleague", 5.0))
+        self.assertEqual(approval_event[0], "event: approval")
+        self.assertEqual(
+            json.loads(approval_event[1].removeprefix("data: ")),
+            {"id": app.id, "approved": True, "approved_by": colleague.id},
+        )
+
+        # And users who may not see the round cannot follow its events
+        self.assertEqual((await client.get(url)).status_code, 401)
+        outsider_token = await Token.objects.acreate(user=outsider)
+        other_round = await models.ApplicationRound.objects.acreate(name="Other", published=True)
+        other_url = reverse("application_round-events", kwargs={"pk": other_round.id})
+        response = await client.get(other_url, headers={"Authorization": f"Token {outsider_token.key}"})
+        self.assertEqual(response.status_code, 404)
+
+        # And events are not streamed when the broker does not reach all server processes
+        with mock.patch.object(events, "_broker", events.LocalBroker()), self.assertLogs(async_views.logger, "ERROR"):
+            self.assertEqual((await client.get(url, headers=auth)).status_code, 501)
+
+    def test_round_events_under_wsgi(self):
+        # Given an evaluator of a round, with an event broker reaching all server processes
+        evaluator = User.objects.create(username="evaluator")
+        self.client.force_login(evaluator)
+        app_round = models.ApplicationRound.objects.create(name="AI4Cities", published=True)
+        app_round.evaluators.add(evaluator)
+        broker = mock.patch.object(events, "_broker", events.LocalBroker(single_process=True))
+        broker.start()
+        self.addCleanup(broker.stop)
+
+        # When following the events of the round through the WSGI handler
+        url = reverse("application_round-events", kwargs={"pk": app_round.id})
+        with self.assertLogs(async_views.logger, "WARNING"):
+            response = self.client.get(url)
+
+        # Then they are refused rather than read in full before being sent
+        self.assertEqual(response.status_code, 501)
+        self.assertFalse(response.streaming)
+
+    def test_round_event_visibility(self):
+        # Given an evaluator of an organization allocated an application of a round, following the events of the round
+        evaluator = User.objects.create(username="evaluator")
+        colleague = User.objects.create(username="colleague")
+        outsider = User.objects.create(username="outsider")
+        organization = models.Organization.objects.create(name="Helsinki")
+        organization.users.add(evaluator, colleague)
+        other_organization = outsider.organizations.create(name="Espoo")
+        app_round = models.ApplicationRound.objects.create(name="AI4Cities", published=True)
+        app, other_app = [app_round.applications.create(name=name) for name in ["SkyNet", "HAL"]]
+        app.evaluating_organizations.add(organization, other_organization)
+        other_app.evaluating_organizations.add(other_organization)
+        visible = events.EventVisibility(evaluator, app_round.id)
+
+        def event(application, evaluator=None, event_type="score"):
+            return {"type": event_type, "application": application.id, "evaluator": evaluator and evaluator.id}
+
+        # When events of the applications are streamed
+        self.assertTrue(visible(event(app, colleague)))
+        # Then the access to the round and the applications is looked up once per stream and application, and the
+        # organizations of the evaluators once (see models.evaluator_organizations)
+        with self.assertNumQueries(2):
+            self.assertEqual(
+                [visible(event(app, colleague)), visible(event(app, outsider)), visible(event(other_app, outsider))],
+                [True, False, False],
+            )
+        with self.assertNumQueries(0):
+            self.assertFalse(visible(event(other_app, outsider, "comment")))
+
+        # And when the user loses access to the round, it is noticed once the access is checked again
+        app.evaluating_organizations.remove(organization)
+        self.assertTrue(visible(event(app)))
+        with override_settings(EVENT_STREAM_ACCESS_CHECK=0):
+            self.assertIsNone(visible(event(app)))
+
+    def test_bulk_scores(self):
+        # Given a logged in user that belongs to an organization with allocated applications
+        evaluator = User.objects.create(username="evaluator")
+        self.client.force_login(evaluator)
+        organization = evaluator.organizations.create(name="Helsinki")
+        app_round = models.ApplicationRound.objects.create(name="AI4Cities", published=True)
+        criteria = [app_round.criteria.create(name=f"Criterion {i}", weight=1) for i in range(3)]
+        apps = [app_round.applications.create(name=name) for name in ["SkyNet", "HAL"]]
+        for app in apps:
+            app.evaluating_organizations.add(organization)
+        existing = apps[0].scores.create(evaluator=evaluator, score=1, criterion=criteria[0])
+
+        # When posting scores for several applications and criteria at once, including an existing one
+        url = reverse("score-bulk")
+        data = [{"application": app.id, "criterion": c.id, "score": 4} for app in apps for c in criteria]
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url, data, format="json")
+
+        # Then the scores are created or updated and returned
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 6)
+        self.assertEqual(models.Score.objects.filter(evaluator=evaluator).count(), 6)
+        existing.refresh_from_db()
+        self.assertEqual(existing.score, 4)
+        self.assertEqual(response.data[0]["evaluator"]["organization"], "Helsinki")
+
+        # And the score summaries and round counters are updated
+        self.assertEqual(models.Application.objects.get(id=apps[0].id).score(), 4)
+        self.assertEqual(summaries.find_drift(), [])
+        self.assertEqual(counters.find_drift(models.ApplicationRound.objects.all()), [])
+
+        # And when one of the scores being created is created concurrently by another request of the user
+        criterion = app_round.criteria.create(name="Criterion 3", weight=1)
+        bulk_create = models.Score.objects.bulk_create
+        concurrent = []
+
+        def create_concurrently(scores, **kwargs):
+            if not concurrent:
+                concurrent.append(apps[1].scores.create(evaluator=evaluator, score=1, criterion=criterion))
+            return bulk_create(scores, **kwargs)
+
+        data = [{"application": app.id, "criterion": criterion.id, "score": 5} for app in apps]
+        with (
+            mock.patch.object(models.Score.objects, "bulk_create", side_effect=create_concurrently),
+            self.captureOnCommitCallbacks(execute=True),
+        ):
+            response = self.client.post(url, data, format="json")
+
+        # Then it is updated instead, and counted once
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([score["score"] for score in response.data], [5, 5])
+        self.assertEqual(models.Score.objects.filter(evaluator=evaluator).count(), 8)
+        self.assertEqual(counters.find_drift(models.ApplicationRound.objects.all()), [])
+
+        # And scores for criteria of other rounds are rejected
+        other_round = models.ApplicationRound.objects.create(name="Other")
+        other_criterion = other_round.criteria.create(name="Goodness", weight=1)
+        data = [{"application": apps[0].id, "criterion": other_criterion.id, "score": 4}]
+        self.assertEqual(self.client.post(url, data, format="json").status_code, 400)
+
+        # And nothing is saved for applications the user can no longer score
+        app_round.submittals.create(organization=organization, user=evaluator)
+        data = [{"application": apps[0].id, "criterion": criteria[0].id, "score": 2}]
+        self.assertEqual(self.client.post(url, data, format="json").status_code, 404)
+        existing.refresh_from_db()
+        self.assertEqual(existing.score, 4)
+
+    def test_round_counts(self):
+        # Given an application round with scored applications, administered by a user
+        admin = User.objects.create(username="admin")
+        evaluator = User.objects.create(username="evaluator")
+        app_round = models.ApplicationRound.objects.create(name="AI4Cities", published=True, admin=admin)
+        app_round.evaluators.add(evaluator)
+        criterion = app_round.criteria.create(name="Goodness", weight=1)
+        for name in ["SkyNet", "HAL"]:
+            app_round.applications.create(name=name)
+        app_round.applications.first().scores.create(evaluator=evaluator, score=4, criterion=criterion)
+        url = reverse("application_round-counts", kwargs={"pk": app_round.id})
+
+        # When the admin requests the counts of the round
+        self.client.force_login(admin)
+        response = self.client.get(url)
+
+        # Then the stored counters of the round are received
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.data,
+            {
+                "id": app_round.id,
+                "application_count": 2,
+                "score_count": 1,
+                "comment_count": 0,
+                "submittal_count": 0,
+                "scored_application_count": 1,
+            },
+        )
+
+        # And evaluators are not allowed to see them
+        self.client.force_login(evaluator)
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+    def test_duplicate_scores_rejected(self):
+        # Given a logged in user that has scored an application
+        evaluator = User.objects.create(username="evaluator")
+        self.client.force_login(evaluator)
+        app_round = models.ApplicationRound.objects.create(name="AI4Cities", published=True)
+        criterion = app_round.criteria.create(name="Goodness", weight=1)
+        app = app_round.applications.create(name="SkyNet")
+        app_round.evaluators.add(evaluator)
+        app.scores.create(evaluator=evaluator, score=1, criterion=criterion)
+
+        # When posting a score for an application the user does not evaluate
+        other_app = models.ApplicationRound.objects.create(name="Other", published=True).applications.create(name="HAL")
+        data = {"application": other_app.id, "criterion": criterion.id, "score": 2}
+        response = self.client.post(reverse("score-list"), data, format="json")
+
+        # Then it is not found
+        self.assertEqual(response.status_code, 404)
+
+        # And when posting another score for the same criterion
+        data = {"application": app.id, "criterion": criterion.id, "score": 2}
+        response = self.client.post(reverse("score-list"), data, format="json")
+
+        # Then the request is rejected
+        self.assertEqual(response.status_code, 400)
+
+    def test_response_formats(self):
+        # Given a logged in user who is allocated as evaluator for an application round
+        evaluator = User.objects.create(username="evaluator")
+        self.client.force_login(evaluator)
+        app_round = models.ApplicationRound.objects.create(name="AI4Cities", published=True)
+        app_round.evaluators.add(evaluator)
+        criterion = app_round.criteria.create(name="Goodness", weight=1)
+        app = app_round.applications.create(name="SkyNet")
+        app.scores.create(evaluator=evaluator, score=5, criterion=criterion)
+        url = reverse("application_round-applications", kwargs={"pk": app_round.id})
+
+        # When requesting the applications as JSON and as MessagePack
+        json_response = self.client.get(url)
+        msgpack_response = self.client.get(url, HTTP_ACCEPT="application/msgpack")
+
+        # Then the same data is received in both formats
+        self.assertEqual(json_response["Content-Type"], "application/json")
+        self.assertEqual(msgpack_response["Content-Type"], "application/msgpack")
+        self.assertEqual(
+            msgpack.unpackb(msgpack_response.content)["results"], json.loads(json_response.content)["results"]
+        )
+        self.assertEqual(json.loads(json_response.content)["results"][0]["scores"][0]["score"], 5.0)
+
+        # And the formats have different ETags
+        self.assertNotEqual(json_response["ETag"], msgpack_response["ETag"])
+        self.assertIn("Accept", msgpack_response["Vary"])
+
+    def test_request_metrics(self):
+        # Given a logged in admin user and an application round they evaluate
+        admin = User.objects.create(username="admin", is_staff=True, is_superuser=True)
+        self.client.force_login(admin)
+        app_round = models.ApplicationRound.objects.create(name="AI4Cities", published=True)
+        app_round.criteria.create(name="Goodness", weight=1)
+        app_round.applications.create(name="SkyNet")
+        app_round.evaluators.add(admin)
+        middleware.reset_view_metrics()
+
+        # When requesting the application round list and an admin changelist
+        response = self.client.get(reverse("application_round-list"))
+        self.client.get(reverse("admin:application_evaluator_application_changelist"))
+
+        # Then the query count and timings are returned in the Server-Timing header
+        self.assertEqual(response.status_code, 200)
+        self.assertRegex(response["Server-Timing"], r'^db;dur=[0-9.]+;desc="\d+ queries", serialize;dur=[0-9.]+, ')
+
+        # And they are aggregated per view
+        response = self.client.get(reverse("request_metrics-list"))
+        self.assertEqual(response.data["ApplicationRoundViewSet.list"]["requests"], 1)
+        self.assertGreater(response.data["ApplicationRoundViewSet.list"]["queries"], 0)
+        self.assertEqual(response.data["admin:application_evaluator_application_changelist"]["requests"], 1)
+
+        # And requests over the query budget are logged
+        with override_settings(REQUEST_QUERY_BUDGET=1), self.assertLogs(middleware.logger, "WARNING") as logs:
+            self.client.get(reverse("application_round-list"))
+        self.assertIn("(ApplicationRoundViewSet.list) made", logs.output[0])
+
+    def test_request_metrics_not_staff(self):
+        # Given a logged in user that is not staff
+        self.client.force_login(User.objects.create(username="evaluator"))
+
+        # When requesting the request metrics
+        response = self.client.get(reverse("request_metrics-list"))
+
+        # Then a 403 Forbidden response is received
+        self.assertEqual(response.status_code, 403)
+
+        # And no timings are sent to the user, unless in DEBUG mode
+        self.assertNotIn("Server-Timing", self.client.get(reverse("application_round-list")))
+        with override_settings(DEBUG=True):
+            self.assertIn("Server-Timing", self.client.get(reverse("application_round-list")))
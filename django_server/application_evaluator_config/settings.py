@@ -59,12 +59,14 @@ if os.environ.get("ELASTIC_SERVICE", False):
     INSTALLED_APPS.append("elasticapm.contrib.django")
 
 MIDDLEWARE = [
+    "application_evaluator.middleware.RequestMetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "application_evaluator.replicas.ReplicaMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -105,6 +107,84 @@ DATABASES = {
     }
 }
 
+# Optional read replica of the database, e.g. REPLICA_SQL_HOST=<host> for a streaming replica of the primary, or
+# REPLICA_POSTGRES_DB=<name> for another local database. Only used with a shared cache (REDIS_URL), which holds the pins
+# of users to the primary after they write. See application_evaluator/replicas.py.
+if os.environ.get("REPLICA_SQL_HOST") or os.environ.get("REPLICA_POSTGRES_DB"):
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        "NAME": os.environ.get("REPLICA_POSTGRES_DB", DATABASES["default"]["NAME"]),
+        "HOST": os.environ.get("REPLICA_SQL_HOST", DATABASES["default"]["HOST"]),
+        "PORT": os.environ.get("REPLICA_SQL_PORT", DATABASES["default"]["PORT"]),
+        "TEST": {"MIRROR": "default"},
+    }
+    READ_REPLICA_DATABASE = "replica"
+else:
+    READ_REPLICA_DATABASE = None
+
+# Text search configuration of the application search on PostgreSQL, e.g. "english" or "finnish":
+SEARCH_CONFIG = os.environ.get("SEARCH_CONFIG", "english")
+
+# Number of CSV rows inserted per batch, and per transaction, when importing applications:
+APPLICATION_IMPORT_BATCH_SIZE = int(os.environ.get("APPLICATION_IMPORT_BATCH_SIZE", 500))
+# Files per batch, and threads streaming the files to storage, when importing attachments from a zip:
+ATTACHMENT_IMPORT_BATCH_SIZE = int(os.environ.get("ATTACHMENT_IMPORT_BATCH_SIZE", 100))
+ATTACHMENT_IMPORT_THREADS = int(os.environ.get("ATTACHMENT_IMPORT_THREADS", min(8, os.cpu_count() or 1)))
+
+# Imports are processed in the background by `manage.py run_import_worker` (see jobs.py), or right after they are
+# saved when RUN_IMPORTS_IN_REQUEST is set, e.g. when no worker is deployed:
+RUN_IMPORTS_IN_REQUEST = os.environ.get("RUN_IMPORTS_IN_REQUEST", "False").lower() == "true"
+IMPORT_JOB_MAX_ATTEMPTS = int(os.environ.get("IMPORT_JOB_MAX_ATTEMPTS", 3))
+# Seconds before retrying a failed import, doubled for each further attempt:
+IMPORT_JOB_RETRY_DELAY = int(os.environ.get("IMPORT_JOB_RETRY_DELAY", 60))
+# Seconds between heartbeats of imports being processed, and without one after which an import is claimed again:
+IMPORT_JOB_HEARTBEAT = int(os.environ.get("IMPORT_JOB_HEARTBEAT", 30))
+IMPORT_JOB_TIMEOUT = int(os.environ.get("IMPORT_JOB_TIMEOUT", 300))
+
+# The covering unique constraint of scores (see Score.Meta) is a plain one on SQLite, e.g. when testing:
+SILENCED_SYSTEM_CHECKS = ["models.W039"]
+
+DATABASE_ROUTERS = ["application_evaluator.replicas.ReplicaRouter"]
+# Views whose safe method requests are read from the replica, as matched by middleware.view_name:
+READ_REPLICA_VIEWS = ["ApplicationRoundViewSet.*", "ApplicationViewSet.*", "admin:*_changelist"]
+# Seconds that users are read from the primary after they write, covering the replication lag:
+READ_REPLICA_PIN_SECONDS = int(os.environ.get("READ_REPLICA_PIN_SECONDS", 10))
+
+# Cache and live event broker
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# Shared between the server processes when REDIS_URL (e.g. redis://redis:6379/0) is given, local memory otherwise.
+
+if os.environ.get("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ["REDIS_URL"],
+        }
+    }
+    EVENT_BROKER = {
+        "BACKEND": "application_evaluator.events.RedisBroker",
+        "OPTIONS": {"url": os.environ["REDIS_URL"]},
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+    EVENT_BROKER = {
+        "BACKEND": "application_evaluator.events.LocalBroker",
+        # Events only reach the subscribers in the process publishing them, so they are only streamed when the server
+        # runs in a single process (SINGLE_PROCESS=True), e.g. the development server:
+        "OPTIONS": {"single_process": DEBUG or os.environ.get("SINGLE_PROCESS", "False").lower() == "true"},
+    }
+
+# Live round event streams (see events.py) send a keepalive comment after this many seconds without events, and are
+# closed after this many seconds, for the clients to reconnect:
+EVENT_STREAM_KEEPALIVE = 15
+EVENT_STREAM_DURATION = 10 * 60
+# The access of the user of a stream to its round is checked again after this many seconds:
+EVENT_STREAM_ACCESS_CHECK = 15
+
 # Password validation
 # https://docs.djangoproject.com/en/3.0/ref/settings/#auth-password-validators
 
@@ -147,6 +227,12 @@ MEDIA_URL = os.environ.get("MEDIA_URL", "/media/")
 MEDIA_ROOT = os.environ.get("MEDIA_ROOT", str(BASE_DIR / "media"))
 
 REST_FRAMEWORK = {
+    # JSON by default; MessagePack for clients sending Accept: application/msgpack
+    "DEFAULT_RENDERER_CLASSES": [
+        "application_evaluator.renderers.ORJSONRenderer",
+        "application_evaluator.renderers.MessagePackRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
     "DEFAULT_AUTHENTICATION_CLASSES": [
         "rest_framework.authentication.TokenAuthentication",
         "rest_framework.authentication.SessionAuthentication",
@@ -166,6 +252,9 @@ REST_AUTH_SERIALIZERS = {"USER_DETAILS_SERIALIZER": "application_evaluator.rest.
 
 LOG_DB_QUERIES = False
 
+# Requests making more database queries than this are logged as warnings by RequestMetricsMiddleware:
+REQUEST_QUERY_BUDGET = int(os.environ.get("REQUEST_QUERY_BUDGET", 50))
+
 if LOG_DB_QUERIES:
     LOGGING = {
         "version": 1,
@@ -255,5 +344,6 @@ if "test" in sys.argv:
             "NAME": ":memory:",
         }
     }
+    READ_REPLICA_DATABASE = None
 else:
     TEST = False
@@ -22,7 +22,7 @@ from django.urls import include, path
 from django.views.generic import TemplateView
 from rest_framework.schemas import get_schema_view
 
-from application_evaluator import rest
+from application_evaluator import async_views, rest
 from application_evaluator.views import health_check
 
 schema_view = get_schema_view(
@@ -53,6 +53,7 @@ urlpatterns = [
     path("rest-auth/logout/", LogoutView.as_view()),
     path("rest-auth/", include("dj_rest_auth.urls")),
     path("rest/error_test/", error_view, name="error-view"),
+    path("rest/", include(async_views.urlpatterns)),
     path("rest/", include(rest.router.urls)),
     path("openapi/", schema_view, name="openapi-schema"),
     path(
@@ -14,4 +14,10 @@ fi
 python manage.py migrate
 python manage.py collectstatic --no-input --clear
 
+if [ "$RUN_IMPORT_WORKER" = "true" ]
+then
+    # Process imports in the background, alongside the server, restarting the worker if it exits:
+    (while true; do python manage.py run_import_worker; sleep 5; done) &
+fi
+
 exec "$@"
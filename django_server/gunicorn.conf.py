@@ -0,0 +1,17 @@
+"""
+Gunicorn settings of the production server (see docker-compose.prod.yml and Dockerfile.backend).
+
+The WSGI application is served by default. With ASGI=True, the ASGI application, with the async views of
+application_evaluator/async_views.py, is served by uvicorn workers (-k uvicorn.workers.UvicornWorker) instead. The live
+events of application rounds are only streamed under ASGI.
+Only switch to it once the benchmark_load management command shows it to serve more requests on the production
+hardware, with the production database.
+"""
+
+import os
+
+if os.environ.get("ASGI", "False").lower() == "true":
+    wsgi_app = "application_evaluator_config.asgi:application"
+    worker_class = "uvicorn.workers.UvicornWorker"
+else:
+    wsgi_app = "application_evaluator_config.wsgi:application"
@@ -41,9 +41,17 @@ export default class ApplicationRoundCard extends React.Component<
     const { applicationRound } = this.props;
     const { user } = this.context;
     const { showEvaluators, expanded } = this.state;
-    const scoredApps = applicationRound.applications.filter((a) => a.scored);
-    const partialApps = applicationRound.applications.filter((a) => a.scores.length > 0);
-    const submitted = applicationRound.submitted_organizations.includes(user.organization);
+    const { applications, applicationsLoaded, submitted } = applicationRound;
+    // Until the applications are loaded, use the evaluation progress of the round listing:
+    const applicationCount = applicationsLoaded
+      ? applications.length
+      : applicationRound.application_count;
+    const scoredCount = applicationsLoaded
+      ? applications.filter((a) => a.scored).length
+      : applicationRound.scored_application_count;
+    const partialCount = applicationsLoaded
+      ? applications.filter((a) => a.scores.length > 0).length
+      : applicationRound.evaluated_application_count;
 
     // When scoring model is based on single evaluators, showing the evaluators in itself will show the scores so combine these:
     const showScores =
@@ -52,7 +60,7 @@ export default class ApplicationRoundCard extends React.Component<
         : this.state.showScores;
 
     const uniqueEvaluators = _.uniq(
-      _.flatten(applicationRound.applications.map((a) => a.scores.map((s) => s.evaluator))),
+      _.flatten(applications.map((a) => a.scores.map((s) => s.evaluator))),
     );
 
     const OrderBtn = ({ order, label }: { order: AppOrder; label: string }) => (
@@ -73,7 +81,7 @@ export default class ApplicationRoundCard extends React.Component<
           <div>
             <h3
               className="clickable text-primary mb-4"
-              onClick={() => this.setState({ expanded: !expanded })}
+              onClick={this.toggleExpanded}
             >
               {applicationRound.name}
             </h3>
@@ -112,12 +120,12 @@ export default class ApplicationRoundCard extends React.Component<
               ))}
             </div>
           )}
-          {scoredApps.length}/{applicationRound.applications.length} applications evaluated
-          {scoredApps.length > 0 && <ExportScoresWidget {...{ applicationRound }} />}
+          {scoredCount}/{applicationCount} applications evaluated
+          {scoredCount > 0 && <ExportScoresWidget {...{ applicationRound }} />}
           {expanded &&
             settings.allowSubmit &&
             !submitted &&
-            partialApps.length === applicationRound.applications.length && (
+            partialCount === applicationCount && (
               <ConfirmButton
                 onClick={this.submitScores}
                 className="btn btn-outline-success btn-block mt-2 mb-3"
@@ -126,10 +134,9 @@ export default class ApplicationRoundCard extends React.Component<
                     Submit all {applicationRound.name} scores for {user.organization}? Scores cannot
                     be changed after submitting.
                     <div className="mt-2">
-                      {scoredApps.length}/{applicationRound.applications.length} applications
-                      completely evaluated
-                      {scoredApps.length < applicationRound.applications.length && (
-                        <>, {partialApps.length - scoredApps.length} partially.</>
+                      {scoredCount}/{applicationCount} applications completely evaluated
+                      {scoredCount < applicationCount && (
+                        <>, {partialCount - scoredCount} partially.</>
                       )}
                     </div>
                   </>
@@ -141,7 +148,7 @@ export default class ApplicationRoundCard extends React.Component<
           <div className="mt-2 mb-3">
             <button
               className="btn btn-outline-primary btn-sm"
-              onClick={() => this.setState({ expanded: !expanded })}
+              onClick={this.toggleExpanded}
             >
               {expanded ? 'Hide' : 'Show'} applications
             </button>
@@ -186,6 +193,7 @@ export default class ApplicationRoundCard extends React.Component<
             </div>
           )}
         </div>
+        {expanded && !applicationsLoaded && <p className="pl-4 pr-4">Loading applications...</p>}
         {expanded &&
           this.getApplications().map((app) => (
             <ApplicationScores
@@ -200,6 +208,14 @@ export default class ApplicationRoundCard extends React.Component<
     );
   }
 
+  toggleExpanded = () => {
+    const { applicationRound } = this.props;
+    const { loadApplications } = this.context;
+    const expanded = !this.state.expanded;
+    if (expanded && !applicationRound.applicationsLoaded) loadApplications(applicationRound.id);
+    this.setState({ expanded });
+  };
+
   getApplications() {
     const { order } = this.state;
     const { applicationRound } = this.props;
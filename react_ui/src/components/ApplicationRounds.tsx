@@ -1,9 +1,31 @@
 import React from 'react';
 import ApplicationRoundCard from '/components/ApplicationRoundCard';
-import type { Application } from '/components/types';
+import type {
+  Application,
+  ApplicationsPage,
+  Page,
+  RoundChanges,
+  Score,
+  ScoreData,
+} from '/components/types';
 import { AppContext, type ApplicationRound, type User } from '/components/types';
-import { addApplicationScores, addScores } from '/components/utils';
-import { applicationRoundsUrl, applicationUrl } from '/urls';
+import { addApplicationScores, applyChanges } from '/components/utils';
+import { followEvents, type ServerEvent } from '/eventStream';
+import {
+  applicationRoundApplicationsUrl,
+  applicationRoundChangesUrl,
+  applicationRoundEventsUrl,
+  applicationRoundsUrl,
+  applicationUrl,
+  bulkScoresUrl,
+} from '/urls';
+
+// How often the scores and comments of opened rounds are synced with the server, when their live events are not
+// being received:
+const syncInterval = 60 * 1000;
+
+// Scores saved within this time of each other are sent to the server in one request:
+const scoreBatchDelay = 300;
 
 type ApplicationRoundsProps = {
   user: User;
@@ -29,22 +51,172 @@ export default class ApplicationRounds extends React.Component<
   ApplicationRoundsState
 > {
   state = initialState;
+  // Server timestamps of the last sync of each opened round:
+  syncTimestamps: Record<number, string> = {};
+  syncTimer?: ReturnType<typeof setInterval>;
+  pendingScores: { data: ScoreData; resolve: (saved: boolean) => void }[] = [];
+  scoreBatchTimer?: ReturnType<typeof setTimeout>;
+  // Live event streams of opened rounds, and the rounds whose streams are connected:
+  eventStreams: Record<number, AbortController> = {};
+  liveRounds = new Set<number>();
 
   componentDidMount() {
     this.loadRounds();
+    this.syncTimer = setInterval(this.syncRounds, syncInterval);
+  }
+
+  componentWillUnmount() {
+    clearInterval(this.syncTimer);
+    clearTimeout(this.scoreBatchTimer);
+    Object.values(this.eventStreams).forEach((controller) => controller.abort());
   }
 
-  loadRounds = () => {
+  loadRounds = async () => {
     const { request } = this.props;
-    request(applicationRoundsUrl).then((response) => {
-      if (response.status === 200)
-        response
-          .json()
-          .then((applicationRounds) =>
-            this.setState({ applicationRounds: addScores(applicationRounds) }),
-          );
-      else this.setState({ error: true });
+    // Reload the applications of rounds that have been opened:
+    const loadedRounds = (this.state.applicationRounds || [])
+      .filter((r) => r.applicationsLoaded)
+      .map((r) => r.id);
+    const applicationRounds: ApplicationRound[] = [];
+    for (let page = 1; ; page++) {
+      const response = await request(`${applicationRoundsUrl}?page=${page}`);
+      if (response.status !== 200) {
+        this.setState({ error: true });
+        return;
+      }
+      const data: Page<ApplicationRound> = await response.json();
+      applicationRounds.push(...data.results);
+      if (!data.next) break;
+    }
+    applicationRounds.forEach((r) => (r.applications = []));
+    this.setState({ applicationRounds }, () =>
+      loadedRounds.forEach((id) => this.loadApplications(id)),
+    );
+  };
+
+  loadApplications = async (roundId: number) => {
+    const { request } = this.props;
+    const applications: Application[] = [];
+    let timestamp = '';
+    for (let page = 1; ; page++) {
+      const response = await request(`${applicationRoundApplicationsUrl(roundId)}?page=${page}`);
+      if (response.status !== 200) {
+        this.setState({ error: true });
+        return;
+      }
+      const data: ApplicationsPage = await response.json();
+      applications.push(...data.results);
+      if (page === 1) timestamp = data.timestamp;
+      if (!data.next) break;
+    }
+    this.syncTimestamps[roundId] = timestamp;
+    const applicationRounds = (this.state.applicationRounds || []).map((r) =>
+      r.id === roundId
+        ? addApplicationScores({ ...r, applications, applicationsLoaded: true }, applications)
+        : r,
+    );
+    this.setState({ applicationRounds });
+    this.followRound(roundId);
+  };
+
+  // Fetch only the scores and comments changed since the last sync, instead of reloading the rounds:
+  syncRounds = async () => {
+    for (const roundId of Object.keys(this.syncTimestamps).map(Number)) {
+      if (!this.liveRounds.has(roundId)) await this.syncRound(roundId);
+    }
+  };
+
+  syncRound = async (roundId: number) => {
+    const { request } = this.props;
+    const since = this.syncTimestamps[roundId];
+    const url = `${applicationRoundChangesUrl(roundId)}?since=${encodeURIComponent(since)}`;
+    const response = await request(url);
+    if (response.status !== 200) return;
+    const changes: RoundChanges = await response.json();
+    this.syncTimestamps[roundId] = changes.timestamp;
+    this.patchRound(roundId, (r) => applyChanges(r, changes));
+  };
+
+  // Receive the changes to the round made by others as they happen, instead of polling for them:
+  followRound = (roundId: number) => {
+    if (this.eventStreams[roundId]) return;
+    const controller = new AbortController();
+    this.eventStreams[roundId] = controller;
+    let connections = 0;
+    followEvents(this.props.request, applicationRoundEventsUrl(roundId), {
+      onEvent: (event) => this.applyEvent(roundId, event),
+      onConnect: () => {
+        this.liveRounds.add(roundId);
+        // Catch up with the changes made while reconnecting:
+        if (connections++) this.syncRound(roundId);
+      },
+      onDisconnect: () => this.liveRounds.delete(roundId),
+      signal: controller.signal,
+    }).finally(() => this.liveRounds.delete(roundId));
+  };
+
+  applyEvent = (roundId: number, { type, data }: ServerEvent) => {
+    const changes: RoundChanges = {
+      timestamp: '',
+      scores: type === 'score' ? [data] : [],
+      comments: type === 'comment' ? [data] : [],
+      deleted_scores: type === 'score_deleted' ? [data.id] : [],
+      deleted_comments: type === 'comment_deleted' ? [data.id] : [],
+    };
+    if (type === 'approval')
+      this.patchRound(roundId, (r) => ({
+        ...r,
+        applications: r.applications.map((a) =>
+          a.id === data.id ? { ...a, approved: data.approved } : a,
+        ),
+      }));
+    else if (type === 'submittal')
+      this.patchRound(roundId, (r) =>
+        r.submitted_organizations.includes(data.organization)
+          ? r
+          : { ...r, submitted_organizations: [...r.submitted_organizations, data.organization] },
+      );
+    else this.patchRound(roundId, (r) => applyChanges(r, changes));
+  };
+
+  // Events may arrive faster than the state is updated, so each patch is applied to the state left by the previous:
+  patchRound = (roundId: number, patch: (round: ApplicationRound) => ApplicationRound) => {
+    this.setState((state) => ({
+      applicationRounds: (state.applicationRounds || []).map((r) =>
+        r.id === roundId && r.applicationsLoaded ? patch(r) : r,
+      ),
+    }));
+  };
+
+  saveScore = (data: ScoreData) =>
+    new Promise<boolean>((resolve) => {
+      this.pendingScores.push({ data, resolve });
+      clearTimeout(this.scoreBatchTimer);
+      this.scoreBatchTimer = setTimeout(this.saveScores, scoreBatchDelay);
     });
+
+  saveScores = async () => {
+    const { request } = this.props;
+    const pending = this.pendingScores;
+    this.pendingScores = [];
+    const data = pending.map((p) => p.data);
+    const response = await request(bulkScoresUrl, { method: 'POST', data });
+    const saved = response.status < 300;
+    if (saved) {
+      const scores: Score[] = await response.json();
+      const changes: RoundChanges = {
+        timestamp: '',
+        scores,
+        comments: [],
+        deleted_scores: [],
+        deleted_comments: [],
+      };
+      const applicationRounds = (this.state.applicationRounds || []).map((r) =>
+        r.applicationsLoaded ? applyChanges(r, changes) : r,
+      );
+      this.setState({ applicationRounds });
+    }
+    pending.forEach((p) => p.resolve(saved));
   };
 
   reloadApplication = (appId: number) => {
@@ -77,6 +249,8 @@ export default class ApplicationRounds extends React.Component<
       reloadApplication: this.reloadApplication,
       updateApplication: this.updateApplication,
       loadRounds: this.loadRounds,
+      loadApplications: this.loadApplications,
+      saveScore: this.saveScore,
     };
 
     return applicationRounds ? (
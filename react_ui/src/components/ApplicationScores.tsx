@@ -54,12 +54,6 @@ export default class ApplicationScores extends React.Component<
     const showOrganizations = showEvaluators && organizations.length > 1;
     const showPlot = showOrganizations && thresholdGroups.length > 1;
 
-    const applicationAsRound = {
-      ...applicationRound,
-      name: application.name,
-      applications: [application],
-    };
-
     const totalScore = getTotalScore(application);
     const maxScore = settings.maxScore * settings.finalScoreMultiplier;
 
@@ -208,7 +202,7 @@ export default class ApplicationScores extends React.Component<
             <h3 className="mt-3 p-2 bg-primary text-white">Application evaluation</h3>
             {application.scores.length > 0 && (
               <div className="m-2">
-                <ExportScoresWidget applicationRound={applicationAsRound} />
+                <ExportScoresWidget applicationRound={applicationRound} application={application} />
               </div>
             )}
             {rootGroups.map((group) => (
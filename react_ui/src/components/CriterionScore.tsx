@@ -9,7 +9,7 @@ import {
 } from '/components/types';
 import { username } from '/components/utils';
 import settings from '/settings';
-import { scoresUrl, scoreUrl } from '/urls';
+import { scoreUrl } from '/urls';
 import ConfirmButton from '/util_components/bootstrap/ConfirmButton';
 import Icon from '/util_components/bootstrap/Icon';
 
@@ -99,7 +99,7 @@ export default class CriterionScore extends React.Component<
 
   saveScore = (e: FocusEvent<HTMLInputElement>) => {
     const { application, criterion } = this.props;
-    const { reloadApplication, request } = this.context;
+    const { saveScore } = this.context;
     const value = Number(e.target.value);
     if (!e.target.value || value > settings.maxScore || value < 0)
       return this.setState({ error: true });
@@ -109,11 +109,8 @@ export default class CriterionScore extends React.Component<
       criterion: criterion.id,
       score: value,
     };
-    request(scoresUrl, { method: 'POST', data }).then((response: Response) => {
-      if (response.status < 300) {
-        this.setState({ changed: false, addScore: false });
-        reloadApplication(application.id);
-      }
+    saveScore(data).then((saved) => {
+      if (saved) this.setState({ changed: false, addScore: false });
     });
   };
 
@@ -1,25 +1,27 @@
-import ExcelJS from 'exceljs';
 import { saveAs } from 'file-saver';
 import React from 'react';
-import type {
-  Application,
-  ApplicationRound,
-  Comment,
-  CriterionGroup,
-  Score,
-} from '/components/types';
-import { getTotalScore } from '/components/utils';
+import type { Application, ApplicationRound } from '/components/types';
+import sessionRequest from '/sessionRequest';
+import settings from '/settings';
+import { exportScoresUrl, exportSummaryUrl } from '/urls';
 
 type ExportScoresWidgetProps = {
   applicationRound: ApplicationRound;
+  // Only export the scores of this application:
+  application?: Application;
 };
 
 type ExportScoresWidgetState = {
   expanded?: boolean;
+  error?: boolean;
 };
 
 const initialState: ExportScoresWidgetState = {};
 
+type SaveFilePicker = (options: {
+  suggestedName: string;
+}) => Promise<{ createWritable: () => Promise<WritableStream> }>;
+
 export default class ExportScoresWidget extends React.Component<
   ExportScoresWidgetProps,
   ExportScoresWidgetState
@@ -27,8 +29,7 @@ export default class ExportScoresWidget extends React.Component<
   state = initialState;
 
   render() {
-    const {} = this.props;
-    const { expanded } = this.state;
+    const { expanded, error } = this.state;
     return (
       <div className="dropdown mt-2">
         <button
@@ -37,18 +38,19 @@ export default class ExportScoresWidget extends React.Component<
         >
           Export scores
         </button>
+        {error && <span className="text-danger ml-2">Export failed.</span>}
         {expanded && (
           <div className="dropdown-menu show">
-            <button className="dropdown-item" onClick={() => this.export('.xlsx')}>
+            <button className="dropdown-item" onClick={() => this.export(exportScoresUrl, 'xlsx')}>
               .xlsx
             </button>
-            <button className="dropdown-item" onClick={() => this.export('.csv')}>
+            <button className="dropdown-item" onClick={() => this.export(exportScoresUrl, 'csv')}>
               .csv
             </button>
-            <button className="dropdown-item" onClick={() => this.exportSummary('.xlsx')}>
+            <button className="dropdown-item" onClick={() => this.export(exportSummaryUrl, 'xlsx')}>
               .xlsx (summary)
             </button>
-            <button className="dropdown-item" onClick={() => this.exportSummary('.csv')}>
+            <button className="dropdown-item" onClick={() => this.export(exportSummaryUrl, 'csv')}>
               .csv (summary)
             </button>
           </div>
@@ -57,114 +59,46 @@ export default class ExportScoresWidget extends React.Component<
     );
   }
 
-  // Export individual scores, one score per row:
-  async export(format: string) {
-    const applicationRound = this.props.applicationRound;
-    const { applications, name } = applicationRound;
-    const criteria = Object.fromEntries(applicationRound.criteria.map((c) => [c.id, c]));
-    const groups = Object.fromEntries(applicationRound.criterion_groups.map((c) => [c.id, c.name]));
-
-    const columns = [
-      { name: 'Application', value: (_s: Score, a: Application) => a.name },
-      {
-        name: 'Criterion group',
-        value: (s: Score | Comment, _a: Application) =>
-          groups[(s as Comment).criterion_group || criteria[(s as Score).criterion].group],
-      },
-      {
-        name: 'Criterion',
-        value: (s: Score, _a: Application) => criteria[s.criterion]?.name,
-      },
-      {
-        name: 'Organization',
-        value: (s: Score, _a: Application) => s.evaluator.organization,
-      },
-      {
-        name: 'First name',
-        value: (s: Score, _a: Application) => s.evaluator.first_name,
-      },
-      {
-        name: 'Last name',
-        value: (s: Score, _a: Application) => s.evaluator.last_name,
-      },
-      { name: 'Score', value: (s: Score, _a: Application) => s.score },
-      { name: 'Comment', value: (s: Comment, _a: Application) => s.comment },
-    ];
-
-    const rows: (string | number | undefined)[][] = [columns.map((c) => c.name)];
-
-    for (const a of applications) {
-      for (const s of a.scores) {
-        rows.push(columns.map((c) => c.value(s as Score & Comment, a) as string));
-      }
-      for (const s of a.comments) {
-        rows.push(columns.map((c) => c.value(s as Score & Comment, a) as string));
-      }
+  // The exports are generated and streamed by the server:
+  async export(url: (roundId: number) => string, format: string) {
+    const { applicationRound, application } = this.props;
+    const params = new URLSearchParams({
+      file_format: format,
+      score_multiplier: String(settings.finalScoreMultiplier),
+    });
+    if (application) params.set('application', String(application.id));
+    const filename = `${(application || applicationRound).name}.${format}`;
+
+    this.setState({ expanded: false, error: false });
+    let file: WritableStream | undefined;
+    try {
+      file = await this.openFile(filename);
+    } catch (error) {
+      // The user cancelled choosing the file:
+      if ((error as DOMException).name !== 'AbortError') this.setState({ error: true });
+      return;
     }
 
-    await this.writeFile(rows, name + format, format);
-  }
-
-  // Export score summary, one application per row:
-  async exportSummary(format: string) {
-    const applicationRound = this.props.applicationRound;
-    const { applications, name } = applicationRound;
-    const groups = applicationRound.criterion_groups;
-    const groupIndex = Object.fromEntries(groups.map((g: CriterionGroup) => [g.id, g]));
-
-    const columns = [
-      { name: 'Application number', value: (a: Application) => a.name },
-      { name: 'Id', value: (a: Application) => a.application_id },
-      ...groups.map((g: CriterionGroup) => ({
-        name: g.name,
-        value: (a: Application) => a.groupScores[g.id],
-      })),
-      { name: 'Total score', value: (a: Application) => getTotalScore(a) },
-      { name: 'Approved', value: (a: Application) => a.approved },
-      {
-        name: 'Comments',
-        value: (a: Application) =>
-          a.comments
-            .map(
-              (c) =>
-                `${c.evaluator.first_name} ${c.evaluator.last_name} - ${groupIndex[c.criterion_group].name}: ${c.comment}`,
-            )
-            .join('\n'),
-      },
-    ];
-
-    const rows: (string | number | boolean | undefined)[][] = [columns.map((c) => c.name)];
-
-    for (const a of applications) {
-      rows.push(columns.map((c) => c.value(a) as string));
+    try {
+      const response = await sessionRequest(`${url(applicationRound.id)}?${params}`);
+      if (response.status !== 200 || !response.body) {
+        throw new Error(`Export failed: ${response.status}`);
+      }
+      if (file) await response.body.pipeTo(file);
+      else saveAs(await response.blob(), filename);
+    } catch {
+      this.setState({ error: true });
+      // Discard the chosen file rather than leave it empty or partly written:
+      await file?.abort();
     }
-
-    await this.writeFile(rows, name + format, format);
   }
 
-  private async writeFile(
-    rows: (string | number | boolean | undefined)[][],
-    filename: string,
-    format: string,
-  ) {
-    const workbook = new ExcelJS.Workbook();
-    const worksheet = workbook.addWorksheet('Scores');
-
-    // Add rows to worksheet
-    rows.forEach((row) => {
-      worksheet.addRow(row);
-    });
-
-    if (format === '.xlsx') {
-      const buffer = await workbook.xlsx.writeBuffer();
-      const blob = new Blob([buffer], {
-        type: 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-      });
-      saveAs(blob, filename);
-    } else if (format === '.csv') {
-      const buffer = await workbook.csv.writeBuffer();
-      const blob = new Blob([buffer], { type: 'text/csv;charset=utf-8' });
-      saveAs(blob, filename);
-    }
+  // Where the browser allows it, ask for the file to write the export to as it arrives. This is
+  // done before requesting the export, as the file picker may only be opened right after a click:
+  private async openFile(filename: string) {
+    const browser = window as unknown as { showSaveFilePicker?: SaveFilePicker };
+    if (!browser.showSaveFilePicker) return undefined;
+    const handle = await browser.showSaveFilePicker({ suggestedName: filename });
+    return handle.createWritable();
   }
 }
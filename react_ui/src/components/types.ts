@@ -18,6 +18,8 @@ export type AppContextType = {
   reloadApplication: (id: number) => void;
   updateApplication: (app: Application) => void;
   loadRounds: () => void;
+  loadApplications: (roundId: number) => void;
+  saveScore: (data: ScoreData) => Promise<boolean>;
   request: (url: string, options?: SessionRequestOptions) => Promise<Response>;
 };
 
@@ -26,6 +28,13 @@ export type Score = {
   score: number;
   evaluator: User;
   criterion: number;
+  application?: number;
+};
+
+export type ScoreData = {
+  application: number;
+  criterion: number;
+  score: number;
 };
 
 export type Comment = {
@@ -34,6 +43,7 @@ export type Comment = {
   comment: string;
   evaluator: User;
   criterion_group: number;
+  application?: number;
 };
 
 export type Attachment = {
@@ -100,6 +110,31 @@ export type ApplicationRound = {
   submitted_organizations: string[];
   scoring_completed?: boolean;
   scoring_model?: ScoringModel;
+  // The applications are loaded separately, page by page, when the round is opened:
+  applicationsLoaded?: boolean;
+  application_count: number;
+  scored_application_count: number;
+  evaluated_application_count: number;
+  submitted: boolean;
+};
+
+export type Page<T> = {
+  count: number;
+  next: string | null;
+  previous: string | null;
+  results: T[];
+};
+
+export type ApplicationsPage = Page<Application> & {
+  timestamp: string;
+};
+
+export type RoundChanges = {
+  timestamp: string;
+  scores: Score[];
+  comments: Comment[];
+  deleted_scores: number[];
+  deleted_comments: number[];
 };
 
 export const AppContext = React.createContext<AppContextType>({
@@ -107,5 +142,7 @@ export const AppContext = React.createContext<AppContextType>({
   reloadApplication: () => {},
   updateApplication: () => {},
   loadRounds: () => {},
+  loadApplications: () => {},
+  saveScore: () => Promise.resolve(false),
   request: () => Promise.resolve(new Response()),
 });
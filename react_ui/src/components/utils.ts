@@ -3,8 +3,10 @@ import settings from '/settings';
 import type {
   Application,
   ApplicationRound,
+  Comment,
   Criterion,
   CriterionGroup,
+  RoundChanges,
   Score,
   User,
 } from '../components/types';
@@ -96,6 +98,22 @@ export const addScores = (rounds: ApplicationRound[]) => {
   return rounds;
 };
 
+// Merge the changed and deleted scores and comments into the applications of the round:
+export const applyChanges = (round: ApplicationRound, changes: RoundChanges) => {
+  const merge = <T extends Score | Comment>(items: T[], changed: T[], deleted: number[]) => {
+    const removed = new Set([...deleted, ...changed.map((i) => i.id)]);
+    return [...items.filter((i) => !removed.has(i.id)), ...changed];
+  };
+  const scores = _.groupBy(changes.scores, 'application');
+  const comments = _.groupBy(changes.comments, 'application');
+  const applications = round.applications.map((app) => ({
+    ...app,
+    scores: merge(app.scores, scores[app.id] || [], changes.deleted_scores),
+    comments: merge(app.comments, comments[app.id] || [], changes.deleted_comments),
+  }));
+  return addApplicationScores({ ...round, applications }, applications);
+};
+
 export const username = (user: User) => {
   return user.first_name && user.last_name ? `${user.first_name} ${user.last_name}` : user.username;
 };
@@ -0,0 +1,83 @@
+export type ServerEvent = {
+  type: string;
+  data: any;
+};
+
+type FollowOptions = {
+  onEvent: (event: ServerEvent) => void;
+  // Called when the stream is (re)connected, e.g. for catching up with the changes made while disconnected:
+  onConnect?: () => void;
+  onDisconnect?: () => void;
+  signal: AbortSignal;
+};
+
+const defaultRetry = 5000;
+
+// Parse the complete Server-Sent Events in the buffer, returning them, the rest of the buffer and the retry time:
+export function parseEvents(buffer: string): [ServerEvent[], string, number | undefined] {
+  const events: ServerEvent[] = [];
+  const blocks = buffer.replace(/\r\n?/g, '\n').split('\n\n');
+  const rest = blocks.pop() || '';
+  let retry: number | undefined;
+  for (const block of blocks) {
+    let type = 'message';
+    const data: string[] = [];
+    for (const line of block.split('\n')) {
+      if (line.startsWith(':')) continue;
+      const i = line.indexOf(':');
+      const field = i > -1 ? line.slice(0, i) : line;
+      const value = i > -1 ? line.slice(i + 1).replace(/^ /, '') : '';
+      if (field === 'event') type = value;
+      else if (field === 'data') data.push(value);
+      else if (field === 'retry' && /^\d+$/.test(value)) retry = Number(value);
+    }
+    if (data.length) events.push({ type, data: JSON.parse(data.join('\n')) });
+  }
+  return [events, rest, retry];
+}
+
+const sleep = (ms: number, signal: AbortSignal) =>
+  new Promise<void>((resolve) => {
+    const timer = setTimeout(resolve, ms);
+    signal.addEventListener('abort', () => {
+      clearTimeout(timer);
+      resolve();
+    });
+  });
+
+// Follow the Server-Sent Events stream at the url until aborted, reconnecting whenever it ends. Uses fetch rather
+// than EventSource, to authenticate as the other requests do:
+export async function followEvents(
+  request: (url: string, options?: any) => Promise<Response>,
+  url: string,
+  { onEvent, onConnect, onDisconnect, signal }: FollowOptions,
+) {
+  let retry = defaultRetry;
+  while (!signal.aborted) {
+    try {
+      const response = await request(url, { headers: { Accept: 'text/event-stream' }, signal });
+      // Streams of rounds that are not found or not allowed, or of servers not streaming events, are not retried:
+      const notRetried = response.status >= 400 && response.status < 500 && response.status !== 429;
+      if (notRetried || response.status === 501) return;
+      if (response.status === 200 && response.body) {
+        onConnect?.();
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        for (;;) {
+          const { done, value } = await reader.read();
+          if (done) break;
+          const [events, rest, newRetry] = parseEvents(buffer + decoder.decode(value, { stream: true }));
+          buffer = rest;
+          retry = newRetry ?? retry;
+          events.forEach(onEvent);
+        }
+      }
+    } catch {
+      // Reconnect after network errors, unless aborted
+    }
+    if (signal.aborted) return;
+    onDisconnect?.();
+    await sleep(retry, signal);
+  }
+}
@@ -1,5 +1,8 @@
+import { decode } from '@msgpack/msgpack';
 import settings from './settings';
 
+const MSGPACK = 'application/msgpack';
+
 export function login(token) {
   localStorage.setItem('token', token);
 }
@@ -23,6 +26,15 @@ export function logout() {
   });
 }
 
+// Responses are JSON unless the caller asks for MessagePack with Accept: application/msgpack; decode those in
+// response.json(), so that callers need not care which format they got:
+function decodeMsgpack(response) {
+  if ((response.headers.get('Content-Type') || '').startsWith(MSGPACK)) {
+    response.json = async () => decode(await response.arrayBuffer());
+  }
+  return response;
+}
+
 export function sessionRequest(url, options = {}) {
   options.headers = options.headers || {};
   if (options?.data && typeof options.data === 'object') {
@@ -33,7 +45,7 @@ export function sessionRequest(url, options = {}) {
   if (token) {
     options.headers.Authorization = `Token ${token}`;
   }
-  return fetch(settings.serverRoot + url, options);
+  return fetch(settings.serverRoot + url, options).then(decodeMsgpack);
 }
 
 export default sessionRequest;
@@ -6,7 +6,20 @@ export const changePasswordUrl = '/rest-auth/password/reset/confirm/';
 export const applicationRoundsUrl = '/rest/application_rounds/';
 export const submitApplicationRoundUrl = (roundId: number) =>
   `/rest/application_rounds/${roundId}/submit/`;
+export const applicationRoundApplicationsUrl = (roundId: number) =>
+  `/rest/application_rounds/${roundId}/applications/`;
+export const applicationRoundChangesUrl = (roundId: number) =>
+  `/rest/application_rounds/${roundId}/changes/`;
+export const applicationRoundEventsUrl = (roundId: number) =>
+  `/rest/application_rounds/${roundId}/events/`;
+export const applicationRoundResultsUrl = (roundId: number) =>
+  `/rest/application_rounds/${roundId}/results/`;
+export const exportScoresUrl = (roundId: number) =>
+  `/rest/application_rounds/${roundId}/export_scores/`;
+export const exportSummaryUrl = (roundId: number) =>
+  `/rest/application_rounds/${roundId}/export_summary/`;
 export const scoresUrl = '/rest/scores/';
+export const bulkScoresUrl = '/rest/scores/bulk/';
 export const scoreUrl = (scoreId: number) => `/rest/scores/${scoreId}/`;
 export const commentsUrl = '/rest/comments/';
 export const commentUrl = (commentId: number) => `/rest/comments/${commentId}/`;
@@ -3,7 +3,7 @@
  * Tests loading states, error handling, and application round display
  */
 import { describe, it, expect, vi, beforeEach } from 'vitest';
-import { render, screen, waitFor } from '@testing-library/react';
+import { fireEvent, render, screen, waitFor } from '@testing-library/react';
 import ApplicationRounds from '../../src/components/ApplicationRounds';
 import { User, ApplicationRound } from '../../src/components/types';
 
@@ -24,7 +24,11 @@ describe('ApplicationRounds', () => {
     criteria: [],
     criterion_groups: [],
     attachments: [],
-    submitted_organizations: []
+    submitted_organizations: [],
+    application_count: 1,
+    scored_application_count: 0,
+    evaluated_application_count: 0,
+    submitted: false
   };
 
   beforeEach(() => {
@@ -71,23 +75,7 @@ describe('ApplicationRounds', () => {
   it('renders application rounds when data is loaded', async () => {
     const mockRequest = vi.fn().mockResolvedValue({
       status: 200,
-      json: async () => [{
-        ...mockApplicationRound,
-        applications: [{
-          id: 1,
-          name: 'Test Application',
-          description: '',
-          scores: [],
-          comments: [],
-          attachments: [],
-          score: 0,
-          scored: false,
-          groupScores: {},
-          scoresByOrganization: {},
-          scoresByEvaluator: {},
-          evaluating_organizations: []
-        }]
-      }]
+      json: async () => [mockApplicationRound]
     });
 
     render(<ApplicationRounds user={mockUser} request={mockRequest} />);
@@ -95,6 +83,27 @@ describe('ApplicationRounds', () => {
     await waitFor(() => {
       expect(screen.getByText('Test Round')).toBeInTheDocument();
     });
+    expect(screen.getByText(/0\/1 applications evaluated/)).toBeInTheDocument();
+  });
+
+  it('loads the applications of a round when it is opened', async () => {
+    const mockRequest = vi.fn().mockImplementation(async (url: string) => ({
+      status: 200,
+      json: async () =>
+        url === '/rest/application_rounds/'
+          ? [mockApplicationRound]
+          : { count: 0, next: null, previous: null, results: [] }
+    }));
+
+    render(<ApplicationRounds user={mockUser} request={mockRequest} />);
+    await waitFor(() => {
+      expect(screen.getByText('Show applications')).toBeInTheDocument();
+    });
+    fireEvent.click(screen.getByText('Show applications'));
+
+    await waitFor(() => {
+      expect(mockRequest).toHaveBeenCalledWith('/rest/application_rounds/1/applications/?page=1');
+    });
   });
 
   it('returns null while loading (before data arrives)', () => {
@@ -44,7 +44,9 @@ describe('CriterionScore', () => {
     reloadApplication: vi.fn(),
     request: vi.fn().mockResolvedValue({ status: 200 }),
     updateApplication: vi.fn(),
-    loadRounds: vi.fn()
+    loadRounds: vi.fn(),
+    loadApplications: vi.fn(),
+    saveScore: vi.fn().mockResolvedValue(true)
   };
 
   beforeEach(() => {
@@ -120,6 +122,20 @@ describe('CriterionScore', () => {
     expect(screen.getByText('Save')).toBeInTheDocument();
   });
 
+  it('saves the score when the input loses focus', async () => {
+    render(
+      <AppContext.Provider value={mockContext}>
+        <CriterionScore criterion={mockCriterion} application={mockApplication} />
+      </AppContext.Provider>
+    );
+
+    const input = screen.getByRole('spinbutton');
+    await userEvent.type(input, '3.5');
+    await userEvent.tab();
+
+    expect(mockContext.saveScore).toHaveBeenCalledWith({ application: 1, criterion: 1, score: 3.5 });
+  });
+
   it('hides scores from other evaluators when showScores is false', () => {
     const otherUser: User = {
       id: 2,
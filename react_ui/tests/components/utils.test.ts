@@ -3,8 +3,14 @@
  * Tests pure functions for data transformation and formatting
  */
 import { describe, it, expect } from 'vitest';
-import { username, slug, getTotalScore, organizationColor } from '../../src/components/utils';
-import { User, Application } from '../../src/components/types';
+import {
+  username,
+  slug,
+  getTotalScore,
+  organizationColor,
+  applyChanges
+} from '../../src/components/utils';
+import { User, Application, ApplicationRound } from '../../src/components/types';
 
 describe('Utility Functions', () => {
   describe('username', () => {
@@ -153,4 +159,86 @@ describe('Utility Functions', () => {
       expect(color1).not.toBe(color2);
     });
   });
+
+  describe('applyChanges', () => {
+    const evaluator: User = {
+      id: 1,
+      username: 'evaluator',
+      first_name: '',
+      last_name: '',
+      organization: 'Test Org'
+    };
+
+    const round = (): ApplicationRound => ({
+      id: 1,
+      name: 'Test Round',
+      description: '',
+      criteria: [
+        { id: 1, name: 'Goodness', group: 1, weight: 1 },
+        { id: 2, name: 'Wellness', group: 1, weight: 1 }
+      ],
+      criterion_groups: [],
+      attachments: [],
+      submitted_organizations: [],
+      application_count: 1,
+      scored_application_count: 1,
+      evaluated_application_count: 1,
+      submitted: false,
+      applicationsLoaded: true,
+      applications: [
+        {
+          id: 1,
+          name: 'Test Application',
+          description: '',
+          scores: [
+            { id: 1, score: 5, evaluator, criterion: 1, application: 1 },
+            { id: 2, score: 5, evaluator, criterion: 2, application: 1 }
+          ],
+          comments: [],
+          attachments: [],
+          score: 5,
+          scored: true,
+          groupScores: {},
+          scoresByOrganization: {},
+          scoresByEvaluator: {},
+          evaluating_organizations: []
+        }
+      ]
+    });
+
+    it('replaces changed scores, removes deleted ones and recomputes the scores', () => {
+      const updated = applyChanges(round(), {
+        timestamp: '',
+        scores: [{ id: 1, score: 3, evaluator, criterion: 1, application: 1 }],
+        comments: [],
+        deleted_scores: [2],
+        deleted_comments: []
+      });
+
+      const app = updated.applications[0];
+      expect(app.scores.map((s) => [s.id, s.score])).toEqual([[1, 3]]);
+      expect(app.score).toBe(3);
+      expect(app.scored).toBe(false);
+    });
+
+    it('adds new comments', () => {
+      const comment = {
+        id: 1,
+        comment: 'Scary',
+        created_at: '',
+        evaluator,
+        criterion_group: 1,
+        application: 1
+      };
+      const updated = applyChanges(round(), {
+        timestamp: '',
+        scores: [],
+        comments: [comment],
+        deleted_scores: [],
+        deleted_comments: []
+      });
+
+      expect(updated.applications[0].comments).toEqual([comment]);
+    });
+  });
 });
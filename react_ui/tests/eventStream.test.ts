@@ -0,0 +1,60 @@
+import { afterEach, describe, expect, it, vi } from 'vitest';
+import { followEvents, parseEvents } from '../src/eventStream';
+
+describe('parseEvents', () => {
+  it('parses complete events and keeps the rest of the buffer', () => {
+    const buffer =
+      'retry: 5000\n\n: keepalive\n\nevent: score\ndata: {"id": 1, "score": 5}\n\nevent: appro';
+
+    const [events, rest, retry] = parseEvents(buffer);
+
+    expect(events).toEqual([{ type: 'score', data: { id: 1, score: 5 } }]);
+    expect(rest).toBe('event: appro');
+    expect(retry).toBe(5000);
+  });
+});
+
+describe('followEvents', () => {
+  afterEach(() => {
+    vi.restoreAllMocks();
+  });
+
+  it('passes the streamed events on until aborted', async () => {
+    const controller = new AbortController();
+    const chunks = ['retry: 5000\n\nevent: score\ndata: {"id"', ': 1}\n\nevent: submittal\ndata: {}\n\n'];
+    const body = new ReadableStream({
+      start(streamController) {
+        const encoder = new TextEncoder();
+        chunks.forEach((chunk) => streamController.enqueue(encoder.encode(chunk)));
+        streamController.close();
+      },
+    });
+    const request = vi.fn().mockResolvedValue(new Response(body, { status: 200 }));
+    const events: any[] = [];
+    const onDisconnect = vi.fn(() => controller.abort());
+
+    await followEvents(request, '/rest/application_rounds/1/events/', {
+      onEvent: (event) => events.push(event),
+      onDisconnect,
+      signal: controller.signal,
+    });
+
+    expect(request.mock.calls[0][1].headers.Accept).toBe('text/event-stream');
+    expect(events).toEqual([
+      { type: 'score', data: { id: 1 } },
+      { type: 'submittal', data: {} },
+    ]);
+    expect(onDisconnect).toHaveBeenCalledOnce();
+  });
+
+  it.each([404, 501])('does not reconnect to streams answered with %i', async (status) => {
+    const request = vi.fn().mockResolvedValue(new Response('{}', { status }));
+
+    await followEvents(request, '/rest/application_rounds/2/events/', {
+      onEvent: () => {},
+      signal: new AbortController().signal,
+    });
+
+    expect(request).toHaveBeenCalledOnce();
+  });
+});
@@ -0,0 +1,36 @@
+import { encode } from '@msgpack/msgpack';
+import { afterEach, describe, expect, it, vi } from 'vitest';
+import { sessionRequest } from '../src/sessionRequest';
+
+describe('sessionRequest', () => {
+  afterEach(() => {
+    vi.unstubAllGlobals();
+  });
+
+  it('asks for JSON by default', async () => {
+    const fetchMock = vi.fn().mockResolvedValue(
+      new Response('{"detail": "Not found."}', { headers: { 'Content-Type': 'application/json' } })
+    );
+    vi.stubGlobal('fetch', fetchMock);
+
+    const response = await sessionRequest('/rest/application_rounds/2/');
+
+    expect(fetchMock.mock.calls[0][1].headers.Accept).toBeUndefined();
+    expect(await response.json()).toEqual({ detail: 'Not found.' });
+  });
+
+  it('decodes MessagePack in response.json() when asked for', async () => {
+    const data = { id: 1, name: 'AI4Cities', applications: [{ id: 2, scores: [] }] };
+    const fetchMock = vi.fn().mockResolvedValue(
+      new Response(encode(data), { headers: { 'Content-Type': 'application/msgpack' } })
+    );
+    vi.stubGlobal('fetch', fetchMock);
+
+    const response = await sessionRequest('/rest/application_rounds/1/', {
+      headers: { Accept: 'application/msgpack' },
+    });
+
+    expect(fetchMock.mock.calls[0][1].headers.Accept).toBe('application/msgpack');
+    expect(await response.json()).toEqual(data);
+  });
+});